@@ -0,0 +1,59 @@
+"""marketplace indexes
+
+Composite and partial indexes for the hot marketplace predicate
+(status = 'OPEN' AND expires_at > now() ORDER BY created_at DESC) and for
+the per-order / per-user bid and deal listings.
+
+Revision ID: 0001_marketplace_indexes
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001_marketplace_indexes"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+OPEN_ONLY = sa.text("status = 'OPEN'")
+
+# (name, table, columns, partial on OPEN orders)
+INDEXES = [
+    ("ix_orders_open_created", "orders", ["created_at", "id"], True),
+    ("ix_orders_open_crop_created", "orders", ["crop", "created_at", "id"], True),
+    ("ix_orders_open_min_price", "orders", ["min_price"], True),
+    ("ix_orders_farmer_created", "orders", ["farmer_id", "created_at"], False),
+    ("ix_bids_order_amount", "bids", ["order_id", sa.text("amount DESC")], False),
+    ("ix_bids_bidder_created", "bids", ["bidder_id", "created_at"], False),
+    ("ix_deals_seller_created", "deals", ["seller_id", "created_at"], False),
+    ("ix_deals_buyer_created", "deals", ["buyer_id", "created_at"], False),
+]
+
+
+def _existing_tables():
+    # Offline (--sql) runs cannot inspect, so assume every table is there
+    if op.get_context().as_sql:
+        return {table for _, table, _, _ in INDEXES}
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    # Fresh databases get these from Base.metadata.create_all at startup,
+    # so only touch tables that already exist.
+    tables = _existing_tables()
+    for name, table, columns, open_only in INDEXES:
+        if table not in tables:
+            continue
+        where = {"postgresql_where": OPEN_ONLY, "sqlite_where": OPEN_ONLY} if open_only else {}
+        op.create_index(name, table, columns, if_not_exists=True, **where)
+
+
+def downgrade():
+    tables = _existing_tables()
+    for name, table, _, _ in reversed(INDEXES):
+        if table in tables:
+            op.drop_index(name, table_name=table, if_exists=True)
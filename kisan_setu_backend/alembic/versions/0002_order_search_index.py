@@ -0,0 +1,52 @@
+"""order search index
+
+SQLite FTS5 (trigram) table plus sync triggers, or pg_trgm GIN indexes on
+Postgres, for location / variety / pincode search.
+
+Revision ID: 0002_order_search_index
+Revises: 0001_marketplace_indexes
+Create Date: 2026-10-17 11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.search import POSTGRES_DDL, SEARCH_COLUMNS, SQLITE_DDL, SQLITE_REBUILD
+
+
+# revision identifiers, used by Alembic.
+revision = "0002_order_search_index"
+down_revision = "0001_marketplace_indexes"
+branch_labels = None
+depends_on = None
+
+
+def _orders_exists():
+    if op.get_context().as_sql:
+        return True
+    return "orders" in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    # Fresh databases get the index from install_search_index at startup
+    if not _orders_exists():
+        return
+    dialect = op.get_context().dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        op.execute(SQLITE_REBUILD)
+    elif dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_context().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("orders_fts_ai", "orders_fts_ad", "orders_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS orders_fts")
+    elif dialect == "postgresql":
+        for column in SEARCH_COLUMNS:
+            op.execute(f"DROP INDEX IF EXISTS ix_orders_{column}_trgm")
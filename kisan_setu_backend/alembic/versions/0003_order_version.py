@@ -0,0 +1,43 @@
+"""order version column
+
+Per-order change counter bumped by every write; /orders/{id} derives its
+ETag from it.
+
+Revision ID: 0003_order_version
+Revises: 0002_order_search_index
+Create Date: 2026-10-17 13:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003_order_version"
+down_revision = "0002_order_search_index"
+branch_labels = None
+depends_on = None
+
+
+def _order_columns():
+    if op.get_context().as_sql:
+        return set()
+    inspector = sa.inspect(op.get_bind())
+    if "orders" not in inspector.get_table_names():
+        return None
+    return {column["name"] for column in inspector.get_columns("orders")}
+
+
+def upgrade():
+    columns = _order_columns()
+    if columns is None or "version" in columns:
+        return
+    op.add_column("orders", sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade():
+    columns = _order_columns()
+    if columns is None or "version" not in columns:
+        return
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.drop_column("version")
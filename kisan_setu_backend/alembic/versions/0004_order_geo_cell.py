@@ -0,0 +1,55 @@
+"""order coordinates and geo cell
+
+lat / lng on orders plus the app.geo grid cell, with a partial index on
+OPEN orders for near= radius searches.
+
+Revision ID: 0004_order_geo_cell
+Revises: 0003_order_version
+Create Date: 2026-10-17 15:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004_order_geo_cell"
+down_revision = "0003_order_version"
+branch_labels = None
+depends_on = None
+
+OPEN_ONLY = sa.text("status = 'OPEN'")
+NEW_COLUMNS = [("lat", sa.Float()), ("lng", sa.Float()), ("geo_cell", sa.Integer())]
+
+
+def _order_columns():
+    if op.get_context().as_sql:
+        return set()
+    inspector = sa.inspect(op.get_bind())
+    if "orders" not in inspector.get_table_names():
+        return None
+    return {column["name"] for column in inspector.get_columns("orders")}
+
+
+def upgrade():
+    columns = _order_columns()
+    if columns is None:
+        return
+    for name, type_ in NEW_COLUMNS:
+        if name not in columns:
+            op.add_column("orders", sa.Column(name, type_, nullable=True))
+    op.create_index(
+        "ix_orders_open_geo_cell", "orders", ["geo_cell"], if_not_exists=True,
+        postgresql_where=OPEN_ONLY, sqlite_where=OPEN_ONLY,
+    )
+
+
+def downgrade():
+    columns = _order_columns()
+    if columns is None:
+        return
+    op.drop_index("ix_orders_open_geo_cell", table_name="orders", if_exists=True)
+    with op.batch_alter_table("orders") as batch_op:
+        for name, _ in reversed(NEW_COLUMNS):
+            if name in columns:
+                batch_op.drop_column(name)
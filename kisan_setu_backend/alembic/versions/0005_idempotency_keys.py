@@ -0,0 +1,47 @@
+"""idempotency keys
+
+Stored responses for retried mutations carrying an Idempotency-Key header
+(app/idempotency.py).
+
+Revision ID: 0005_idempotency_keys
+Revises: 0004_order_geo_cell
+Create Date: 2026-10-17 17:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_idempotency_keys"
+down_revision = "0004_order_geo_cell"
+branch_labels = None
+depends_on = None
+
+
+def _has_table():
+    if op.get_context().as_sql:
+        return False
+    return "idempotency_keys" in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    if _has_table():
+        return
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("scope", sa.String(64), primary_key=True),
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column("fingerprint", sa.String(64), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("content_type", sa.String(), nullable=True),
+        sa.Column("body", sa.LargeBinary(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_idempotency_keys_created", "idempotency_keys", ["created_at"])
+
+
+def downgrade():
+    if op.get_context().as_sql or _has_table():
+        op.drop_index("ix_idempotency_keys_created", table_name="idempotency_keys")
+        op.drop_table("idempotency_keys")
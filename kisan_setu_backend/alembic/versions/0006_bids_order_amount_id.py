@@ -0,0 +1,40 @@
+"""covering index for paged order bids
+
+Replaces ix_bids_order_amount (order_id, amount DESC) with
+ix_bids_order_amount_id (order_id, amount, id), which serves the
+(amount, id) DESC keyset pages of GET /orders/{id}/bids by a backward scan.
+
+Revision ID: 0006_bids_order_amount_id
+Revises: 0005_idempotency_keys
+Create Date: 2026-10-17 18:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_bids_order_amount_id"
+down_revision = "0005_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def _has_bids():
+    if op.get_context().as_sql:
+        return True
+    return "bids" in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    if not _has_bids():
+        return
+    op.create_index("ix_bids_order_amount_id", "bids", ["order_id", "amount", "id"], if_not_exists=True)
+    op.drop_index("ix_bids_order_amount", table_name="bids", if_exists=True)
+
+
+def downgrade():
+    if not _has_bids():
+        return
+    op.create_index("ix_bids_order_amount", "bids", ["order_id", sa.text("amount DESC")], if_not_exists=True)
+    op.drop_index("ix_bids_order_amount_id", table_name="bids", if_exists=True)
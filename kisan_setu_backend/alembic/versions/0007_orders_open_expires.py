@@ -0,0 +1,45 @@
+"""partial index on open orders' expires_at
+
+Serves the expiry scheduler, which moves due OPEN orders to EXPIRED so the
+marketplace queries no longer compare expires_at per row. Orders that are
+already past due are expired by the scheduler on first start.
+
+Revision ID: 0007_orders_open_expires
+Revises: 0006_bids_order_amount_id
+Create Date: 2026-10-17 19:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007_orders_open_expires"
+down_revision = "0006_bids_order_amount_id"
+branch_labels = None
+depends_on = None
+
+OPEN_ONLY = sa.text("status = 'OPEN'")
+
+
+def _has_orders():
+    if op.get_context().as_sql:
+        return True
+    return "orders" in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    if not _has_orders():
+        return
+    op.create_index(
+        "ix_orders_open_expires", "orders", ["expires_at"], if_not_exists=True,
+        postgresql_where=OPEN_ONLY, sqlite_where=OPEN_ONLY,
+    )
+
+
+def downgrade():
+    if not _has_orders():
+        return
+    op.drop_index("ix_orders_open_expires", table_name="orders", if_exists=True)
+    # Older code keeps expired orders OPEN and filters on expires_at instead
+    op.execute("UPDATE orders SET status = 'OPEN' WHERE status = 'EXPIRED'")
@@ -0,0 +1,44 @@
+"""proxy bids
+
+A buyer's standing maximum per order, bid up automatically when someone
+outbids them (app/proxy_bidding.py).
+
+Revision ID: 0008_proxy_bids
+Revises: 0007_orders_open_expires
+Create Date: 2026-10-17 20:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0008_proxy_bids"
+down_revision = "0007_orders_open_expires"
+branch_labels = None
+depends_on = None
+
+
+def _has_table():
+    if op.get_context().as_sql:
+        return False
+    return "proxy_bids" in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    if _has_table():
+        return
+    op.create_table(
+        "proxy_bids",
+        sa.Column("order_id", sa.Integer(), sa.ForeignKey("orders.id"), primary_key=True),
+        sa.Column("bidder_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("max_amount", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_proxy_bids_order_max", "proxy_bids", ["order_id", "max_amount"])
+
+
+def downgrade():
+    if op.get_context().as_sql or _has_table():
+        op.drop_index("ix_proxy_bids_order_max", table_name="proxy_bids")
+        op.drop_table("proxy_bids")
@@ -0,0 +1,39 @@
+"""keyset index for a buyer's own bids
+
+Replaces ix_bids_bidder_created (bidder_id, created_at) with
+ix_bids_bidder_id (bidder_id, id): GET /bids/my now pages over id DESC.
+
+Revision ID: 0009_bids_bidder_id
+Revises: 0008_proxy_bids
+Create Date: 2026-10-17 21:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0009_bids_bidder_id"
+down_revision = "0008_proxy_bids"
+branch_labels = None
+depends_on = None
+
+
+def _has_bids():
+    if op.get_context().as_sql:
+        return True
+    return "bids" in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    if not _has_bids():
+        return
+    op.create_index("ix_bids_bidder_id", "bids", ["bidder_id", "id"], if_not_exists=True)
+    op.drop_index("ix_bids_bidder_created", table_name="bids", if_exists=True)
+
+
+def downgrade():
+    if not _has_bids():
+        return
+    op.create_index("ix_bids_bidder_created", "bids", ["bidder_id", "created_at"], if_not_exists=True)
+    op.drop_index("ix_bids_bidder_id", table_name="bids", if_exists=True)
@@ -1,19 +1,21 @@
 # app/auth.py
-from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, status
 from typing import Optional
 from app.config import settings
 from app.schemas import TokenData
+from app.hashing import PasswordHasher
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_hasher = PasswordHasher(
+    ["bcrypt"], workers=settings.PASSWORD_HASH_WORKERS, executor=settings.PASSWORD_HASH_EXECUTOR
+)
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    return await password_hasher.verify(plain_password, hashed_password)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    return await password_hasher.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -39,4 +41,4 @@ def decode_token(token: str) -> TokenData:
             raise credentials_exception
         return TokenData(user_id=int(user_id), role=role)
     except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception
\ No newline at end of file
@@ -0,0 +1,132 @@
+# app/bid_book.py
+import bisect
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.order_cache import as_utc
+
+# Loader contract: (highest bids, expires_at, total bid count, whether those are
+# all the bids) for an OPEN order, None otherwise (closed orders are paged
+# straight from the DB instead).
+BookLoader = Callable[[], Awaitable[Optional[Tuple[List[dict], datetime, int, bool]]]]
+
+class BidBook:
+    """Bids of one OPEN order, kept ascending by (amount, id).
+
+    An accepted bid always beats the current high bid, so new bids are
+    (nearly always) appended at the end: best() is the last element and a
+    page of n below a cursor is a bisect plus a reversed slice of n.
+
+    Only the highest bids are loaded; when ``complete`` is False a page that
+    reaches past them returns None and the caller reads that page from the DB.
+    """
+
+    def __init__(self, bids: List[dict], expires_at: datetime, total: int, complete: bool = True):
+        self.expires_at = as_utc(expires_at)
+        self.total = total
+        self.complete = complete
+        self.loaded_at = time.monotonic()
+        self._bids = sorted(bids, key=self._key)
+        self._keys = [self._key(bid) for bid in self._bids]
+        self._ids: Set[int] = {bid["id"] for bid in self._bids}
+
+    @staticmethod
+    def _key(bid: dict) -> Tuple[float, int]:
+        return bid["amount"], bid["id"]
+
+    def add(self, bid: dict):
+        if bid["id"] in self._ids:
+            return
+        key = self._key(bid)
+        index = bisect.bisect_right(self._keys, key)
+        self._keys.insert(index, key)
+        self._bids.insert(index, bid)
+        self._ids.add(bid["id"])
+        self.total += 1
+
+    def best(self) -> Optional[dict]:
+        return self._bids[-1] if self._bids else None
+
+    def page(self, after: Optional[Tuple[float, int]], limit: int) -> Optional[List[dict]]:
+        """Up to ``limit`` bids strictly below ``after`` in (amount, id) DESC order."""
+        end = len(self._bids) if after is None else bisect.bisect_left(self._keys, after)
+        if end < limit and not self.complete:
+            return None
+        return self._bids[max(0, end - limit):end][::-1]
+
+    def __len__(self):
+        return len(self._bids)
+
+class BidBooks:
+    """
+    Per-order bid books for GET /orders/{id}/bids, filled lazily from the DB
+    and patched by place_bid on this worker. A book is dropped when its order
+    locks or expires, and after ``ttl`` seconds it is reloaded so bids placed
+    on other workers show up. At most ``max_orders`` books are kept (LRU).
+    """
+
+    def __init__(self, max_orders: int = 5000, ttl: float = 5.0):
+        self.max_orders = max_orders
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._books: "OrderedDict[int, BidBook]" = OrderedDict()
+        # order_id -> bids added while a load for it was in flight
+        self._loading: Dict[int, int] = {}
+
+    def _live(self, order_id: int) -> Optional[BidBook]:
+        book = self._books.get(order_id)
+        if book is None:
+            return None
+        if book.expires_at <= datetime.now(timezone.utc) or time.monotonic() - book.loaded_at >= self.ttl:
+            del self._books[order_id]
+            return None
+        self._books.move_to_end(order_id)
+        return book
+
+    def peek(self, order_id: int) -> Optional[BidBook]:
+        return self._live(order_id)
+
+    async def get(self, order_id: int, loader: BookLoader) -> Optional[BidBook]:
+        """The order's book, loading it if needed; None when the order isn't open."""
+        book = self._live(order_id)
+        if book is not None:
+            self.hits += 1
+            return book
+        self.misses += 1
+
+        self._loading[order_id] = self._loading.get(order_id, 0)
+        loaded = await loader()
+        raced = self._loading.pop(order_id, None) != 0
+        if loaded is None:
+            return None
+        book = BidBook(*loaded)
+        # A bid that landed mid-load may be missing: use this book once, don't keep it
+        if not raced:
+            self._books[order_id] = book
+            while len(self._books) > self.max_orders:
+                self._books.popitem(last=False)
+        return book
+
+    def add(self, order_id: int, bid: dict):
+        if order_id in self._loading:
+            self._loading[order_id] += 1
+        book = self._books.get(order_id)
+        if book is not None:
+            book.add(bid)
+
+    def evict(self, order_id: int):
+        self._books.pop(order_id, None)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "orders": len(self._books),
+            "max_orders": self.max_orders,
+            "bids": sum(len(book) for book in self._books.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,53 @@
+# app/casing.py
+import re
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from fastapi import Header
+
+# Clients send "X-Key-Case: camel" to get camelCase keys instead of the default
+# snake_case. Only keys registered below are renamed (a dict lookup per key, no
+# regex at request time), so data-valued keys such as facet names pass through.
+KEY_CASE_HEADER = "X-Key-Case"
+CAMEL = "camel"
+SNAKE = "snake"
+
+CAMEL_ALIASES: Dict[str, str] = {}
+
+_key_case: ContextVar[str] = ContextVar("key_case", default=SNAKE)
+
+def to_camel(name: str) -> str:
+    return re.sub(r"_([a-z0-9])", lambda match: match.group(1).upper(), name)
+
+def register_camel_aliases(*sources) -> Dict[str, str]:
+    """Add the field names of Pydantic models (or plain key strings) to the alias map."""
+    for source in sources:
+        if isinstance(source, str):
+            names = [source]
+        else:
+            names = getattr(source, "model_fields", None) or source.__fields__
+        for name in names:
+            alias = to_camel(name)
+            if alias != name:
+                CAMEL_ALIASES[name] = alias
+    return CAMEL_ALIASES
+
+def camelize(content: Any) -> Any:
+    if isinstance(content, list):
+        return [camelize(item) for item in content]
+    if isinstance(content, dict):
+        aliases = CAMEL_ALIASES
+        return {aliases.get(key, key): camelize(value) for key, value in content.items()}
+    return content
+
+async def key_case(x_key_case: Optional[str] = Header(None, alias=KEY_CASE_HEADER)) -> str:
+    """
+    App-wide dependency. It runs in the same task as the endpoint, so the
+    response class sees the value when it renders the body.
+    """
+    case = CAMEL if x_key_case and x_key_case.strip().lower() == CAMEL else SNAKE
+    _key_case.set(case)
+    return case
+
+def current_key_case() -> str:
+    return _key_case.get()
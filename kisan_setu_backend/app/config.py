@@ -16,6 +16,29 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Marketplace pagination
+    ORDERS_PAGE_SIZE: int = 50
+    ORDERS_MAX_PAGE_SIZE: int = 100
+    BIDS_PAGE_SIZE: int = 20
+    BIDS_MAX_PAGE_SIZE: int = 100
+    
+    # Rate limits, "<requests>/<seconds>" ("off" disables)
+    RATE_LIMIT_BIDS: str = "10/10"  # Per buyer
+    RATE_LIMIT_LOGIN: str = "20/60"  # Per client IP
+    RATE_LIMIT_STORE: Optional[str] = None  # Shared-memory file, or "memory"
+    
+    # Failed-login lockouts, "<failures>/<seconds>"; the lockout doubles per repeat
+    LOGIN_FAILURES_PER_PHONE: str = "5/900"
+    LOGIN_FAILURES_PER_IP: str = "50/900"
+    LOGIN_LOCKOUT: float = 60
+    LOGIN_MAX_LOCKOUT: float = 3600
+    LOGIN_THROTTLE_STORE: Optional[str] = None  # Shared-memory file, or "memory"
+    TRUSTED_PROXIES: int = 0  # Reverse proxies appending to X-Forwarded-For (1 behind Render/nginx)
+    
+    # Password hashing pool; bcrypt releases the GIL, so threads are enough
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_EXECUTOR: str = "auto"  # "process", "thread", or by scheme (see app.hashing)
+    
     # CORS
     BACKEND_CORS_ORIGINS: list = ["*"]
     
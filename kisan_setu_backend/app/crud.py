@@ -1,17 +1,23 @@
 # app/crud.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, and_, or_
+from sqlalchemy import select, update, func, and_, or_, tuple_
 from sqlalchemy.orm import selectinload
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional
 from app import models, schemas
 from app.auth import get_password_hash
+from app.pagination import (
+    decode_amount_cursor, decode_cursor, decode_id_cursor, encode_amount_cursor, encode_id_cursor, split_page,
+)
+from app.search import text_search
+from app.sessions import LazySession
 
 class CRUD:
     # User operations
     @staticmethod
-    async def create_user(db: AsyncSession, user: schemas.UserCreate):
-        hashed_password = get_password_hash(user.password)
+    async def create_user(db: LazySession, user: schemas.UserCreate):
+        # Hashed before a connection is checked out for the INSERT
+        hashed_password = await get_password_hash(user.password)
         db_user = models.User(
             phone=user.phone,
             password_hash=hashed_password,
@@ -19,9 +25,10 @@ class CRUD:
             role=user.role.value,  # Convert Enum to string
             location=user.location
         )
-        db.add(db_user)
-        await db.commit()
-        await db.refresh(db_user)
+        # One INSERT ... RETURNING; a taken phone raises IntegrityError
+        async with db.transaction() as session:
+            session.add(db_user)
+            await session.flush()
         return db_user
 
     @staticmethod
@@ -60,8 +67,9 @@ class CRUD:
         crop: Optional[str] = None,
         min_price: Optional[float] = None,
         location: Optional[str] = None,
-        skip: int = 0,
-        limit: int = 100
+        q: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
     ):
         query = select(models.Order).where(
             and_(
@@ -74,13 +82,24 @@ class CRUD:
             query = query.where(models.Order.crop == crop)
         if min_price:
             query = query.where(models.Order.min_price >= min_price)
+        dialect = db.bind.dialect.name
         if location:
-            query = query.where(models.Order.location.ilike(f"%{location}%"))
+            query = query.where(text_search(models.Order, location, dialect, columns=("location",)))
+        if q:
+            query = query.where(text_search(models.Order, q, dialect))
+        if cursor:
+            created_at, order_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(models.Order.created_at, models.Order.id) < tuple_(created_at, order_id)
+            )
         
-        query = query.order_by(models.Order.created_at.desc()).offset(skip).limit(limit)
+        # Keyset instead of OFFSET: deep pages cost the same as the first one
+        query = query.order_by(
+            models.Order.created_at.desc(), models.Order.id.desc()
+        ).limit(limit + 1)
         
         result = await db.execute(query)
-        return result.scalars().all()
+        return split_page(result.scalars().all(), limit, lambda o: (o.created_at, o.id))
 
     @staticmethod
     async def get_order_by_id(db: AsyncSession, order_id: int):
@@ -106,16 +125,32 @@ class CRUD:
         order_id: int,
         bidder_id: int
     ):
-        # Check if order exists and is open
-        order = await CRUD.get_order_by_id(db, order_id)
-        if not order or order.status != models.OrderStatus.OPEN:
-            raise ValueError("Order not found or not open for bidding")
-        
-        # Check bid amount requirements
-        if bid.amount <= order.min_price or bid.amount <= order.current_high_bid:
+        # Check and raise the high bid in one conditional UPDATE so concurrent
+        # bidders can't lose updates or overwrite a higher bid
+        result = await db.execute(
+            update(models.Order)
+            .where(
+                models.Order.id == order_id,
+                models.Order.status == models.OrderStatus.OPEN,
+                models.Order.min_price < bid.amount,
+                func.coalesce(models.Order.current_high_bid, 0) < bid.amount
+            )
+            .values(
+                current_high_bid=bid.amount,
+                bids_count=models.Order.bids_count + 1,
+                version=models.Order.version + 1
+            )
+            .returning(models.Order.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() is None:
+            await db.rollback()
+            order = await CRUD.get_order_by_id(db, order_id)
+            if not order or order.status != models.OrderStatus.OPEN:
+                raise ValueError("Order not found or not open for bidding")
             raise ValueError("Bid amount must be greater than minimum price and current highest bid")
         
-        # Create bid
+        # Create bid in the same transaction
         db_bid = models.Bid(
             order_id=order_id,
             bidder_id=bidder_id,
@@ -123,31 +158,76 @@ class CRUD:
         )
         db.add(db_bid)
         
-        # Update order with new high bid
-        order.current_high_bid = bid.amount
-        order.bids_count += 1
-        
         await db.commit()
         await db.refresh(db_bid)
         return db_bid
 
     @staticmethod
-    async def get_order_bids(db: AsyncSession, order_id: int):
+    async def get_order_bids(
+        db: AsyncSession,
+        order_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ):
+        query = select(models.Bid).where(models.Bid.order_id == order_id)
+        if cursor:
+            amount, bid_id = decode_amount_cursor(cursor)
+            query = query.where(tuple_(models.Bid.amount, models.Bid.id) < tuple_(amount, bid_id))
+        
+        # Highest first; keyset over ix_bids_order_amount_id
+        query = query.order_by(
+            models.Bid.amount.desc(), models.Bid.id.desc()
+        ).limit(limit + 1)
+        
+        result = await db.execute(query)
+        return split_page(result.scalars().all(), limit, lambda b: (b.amount, b.id), encode=encode_amount_cursor)
+
+    @staticmethod
+    async def get_order_bid_summary(db: AsyncSession, order_id: int):
+        # Maintained on the order row by create_bid, so no scan of bids
         result = await db.execute(
-            select(models.Bid)
-            .where(models.Bid.order_id == order_id)
-            .order_by(models.Bid.amount.desc())
+            select(models.Order.bids_count, models.Order.current_high_bid)
+            .where(models.Order.id == order_id)
         )
-        return result.scalars().all()
+        row = result.first()
+        if row is None:
+            return None
+        return {"count": row.bids_count or 0, "max": row.current_high_bid or None}
 
     @staticmethod
-    async def get_user_bids(db: AsyncSession, user_id: int):
-        result = await db.execute(
-            select(models.Bid)
+    async def get_user_bids(
+        db: AsyncSession,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ):
+        # Each bid with its order in one JOIN, newest first (keyset over ix_bids_bidder_id)
+        query = (
+            select(models.Bid, models.Order)
+            .join(models.Order, models.Bid.order_id == models.Order.id)
             .where(models.Bid.bidder_id == user_id)
-            .order_by(models.Bid.created_at.desc())
         )
-        return result.scalars().all()
+        if cursor:
+            query = query.where(models.Bid.id < decode_id_cursor(cursor))
+        query = query.order_by(models.Bid.id.desc()).limit(limit + 1)
+        
+        result = await db.execute(query)
+        rows, next_cursor = split_page(result.all(), limit, lambda row: (row.Bid.id,), encode=encode_id_cursor)
+        # Built as response objects: assigning bid.order on the mapped rows would
+        # be a relationship write the session flushes when get_db commits
+        bids = [
+            schemas.MyBidResponse(
+                id=bid.id,
+                order_id=bid.order_id,
+                bidder_id=bid.bidder_id,
+                amount=bid.amount,
+                created_at=bid.created_at,
+                order=schemas.OrderSummary.from_orm(order),
+                is_winning=bid.amount >= (order.current_high_bid or 0),
+            )
+            for bid, order in rows
+        ]
+        return bids, next_cursor
 
     @staticmethod
     async def get_bid_by_id(db: AsyncSession, bid_id: int):
@@ -176,6 +256,7 @@ class CRUD:
         
         # Update order status
         order.status = models.OrderStatus.LOCKED
+        order.version += 1
         
         # Create deal
         total_amount = order.quantity * bid.amount
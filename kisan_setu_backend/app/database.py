@@ -2,6 +2,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.config import settings
+from app.sessions import LazySession
 
 # Create async engine
 engine = create_async_engine(
@@ -29,4 +30,9 @@ async def get_db():
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+# Dependency for handlers that hash or sign between queries: a connection per
+# statement, never held while they compute
+def get_lazy_db() -> LazySession:
+    return LazySession(AsyncSessionLocal)
\ No newline at end of file
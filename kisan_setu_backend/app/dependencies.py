@@ -1,9 +1,13 @@
 # app/dependencies.py
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
+from jose import JWTError, jwt
 from app.auth import decode_token
+from app.config import settings
 from app.database import get_db
+from app.ratelimit import ClientIP, RateLimit, create_bucket_store
+from app.login_throttle import LoginThrottle, create_throttle_store
 from app.schemas import TokenData
 
 security = HTTPBearer()
@@ -28,4 +32,29 @@ def require_role(required_role: str):
 # Role-specific dependencies
 require_farmer = require_role("FARMER")
 require_buyer = require_role("BUYER")
-require_admin = require_role("ADMIN")
\ No newline at end of file
+require_admin = require_role("ADMIN")
+
+# Rate limits, shared by all workers on the host (see app.ratelimit)
+rate_limit_store = create_bucket_store(settings.RATE_LIMIT_STORE)
+client_ip = ClientIP(settings.TRUSTED_PROXIES)
+
+def token_subject(request: Request) -> str:
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        try:
+            return f"user:{jwt.decode(authorization[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])['sub']}"
+        except (JWTError, KeyError):
+            pass
+    return f"ip:{client_ip(request)}"
+
+bid_rate_limit = RateLimit(rate_limit_store, "bids", settings.RATE_LIMIT_BIDS, key=token_subject)
+login_rate_limit = RateLimit(rate_limit_store, "login", settings.RATE_LIMIT_LOGIN, key=client_ip)
+
+# Failed logins per phone and per IP, with exponential lockout (see app.login_throttle)
+login_throttle = LoginThrottle(
+    create_throttle_store(settings.LOGIN_THROTTLE_STORE),
+    per_phone=settings.LOGIN_FAILURES_PER_PHONE,
+    per_ip=settings.LOGIN_FAILURES_PER_IP,
+    lockout=settings.LOGIN_LOCKOUT,
+    max_lockout=settings.LOGIN_MAX_LOCKOUT
+)
@@ -0,0 +1,37 @@
+# app/etag.py
+import hashlib
+from typing import Optional
+
+from fastapi import Response
+
+def make_etag(*parts) -> str:
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+def content_etag(kind: str, body: bytes, *parts) -> str:
+    """
+    Tag derived from the response body plus the request parts that shaped it
+    (filters, cursor, page size), so every worker mints the same tag for the
+    same data and two different pages never share one.
+    """
+    digest = hashlib.blake2b(body, digest_size=8)
+    for part in parts:
+        digest.update(b"\0" + str(part).encode())
+    return make_etag(kind, digest.hexdigest())
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" are the same validator
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
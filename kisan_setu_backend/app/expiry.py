@@ -0,0 +1,128 @@
+# app/expiry.py
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+from app.order_cache import as_utc
+
+logger = logging.getLogger(__name__)
+
+# (order id, expires_at) of OPEN orders due by the given time, soonest first, at most n
+DueLoader = Callable[[datetime, int], Awaitable[List[Tuple[int, datetime]]]]
+# Flip the given orders to EXPIRED (if still OPEN and due); returns how many it changed
+Expirer = Callable[[List[int]], Awaitable[int]]
+
+class ExpiryScheduler:
+    """
+    Moves OPEN orders to EXPIRED as their ``expires_at`` passes, so the
+    marketplace queries can filter on status alone.
+
+    Orders due within ``horizon`` seconds wait in a min-heap of
+    (expires_at, id). The heap is refilled from the DB every
+    ``refill_interval`` seconds (a range scan of the partial index on open
+    orders' expires_at), which also picks up orders created on other
+    workers; create_order on this worker schedules directly. The loop sleeps
+    until the earliest deadline, woken early when an earlier one arrives, and
+    expires everything due in UPDATEs of up to ``batch_size`` orders.
+
+    Every worker runs one. The UPDATE re-checks status and expires_at, so when
+    two workers race for the same order only one changes it (and emits its
+    change event); the other is a no-op.
+    """
+
+    def __init__(self, load_due: DueLoader, expire: Expirer, horizon: float = 600,
+                 refill_interval: float = 60, batch_size: int = 500, max_pending: int = 10000):
+        self.load_due = load_due
+        self.expire = expire
+        self.horizon = timedelta(seconds=horizon)
+        self.refill_interval = refill_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.expired = 0
+        self.batches = 0
+        self._heap: List[Tuple[datetime, int]] = []
+        self._scheduled: Set[int] = set()
+        self._next_refill = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def schedule(self, order_id: int, expires_at: datetime):
+        expires_at = as_utc(expires_at)
+        if order_id in self._scheduled or expires_at > datetime.now(timezone.utc) + self.horizon:
+            return  # Far off: the refill that covers it will load it
+        if len(self._heap) >= self.max_pending and expires_at >= self._heap[0][0]:
+            return
+        self._push(order_id, expires_at)
+
+    def _push(self, order_id: int, expires_at: datetime):
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (expires_at, order_id))
+        self._scheduled.add(order_id)
+        if earliest is None or expires_at < earliest:
+            self._wakeup.set()
+
+    # ----- loop -----
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Order expiry pass failed")
+            await self._sleep()
+
+    async def tick(self):
+        now = datetime.now(timezone.utc)
+        if time.monotonic() >= self._next_refill:
+            await self._refill(now)
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, order_id = heapq.heappop(self._heap)
+            self._scheduled.discard(order_id)
+            due.append(order_id)
+        for start in range(0, len(due), self.batch_size):
+            self.expired += await self.expire(due[start:start + self.batch_size])
+            self.batches += 1
+
+    async def _refill(self, now: datetime):
+        rows = await self.load_due(now + self.horizon, self.max_pending)
+        for order_id, expires_at in rows:
+            if order_id not in self._scheduled:
+                self._push(order_id, as_utc(expires_at))
+        # A full page of overdue orders is a backlog (e.g. first start): come back right after this pass
+        backlog = len(rows) >= self.max_pending and as_utc(rows[-1][1]) <= now
+        self._next_refill = 0.0 if backlog else time.monotonic() + self.refill_interval
+
+    async def _sleep(self):
+        timeout = max(0.0, self._next_refill - time.monotonic())
+        if self._heap:
+            until_due = (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds()
+            timeout = min(timeout, max(0.0, until_due))
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._heap),
+            "next_due": self._heap[0][0] if self._heap else None,
+            "expired": self.expired,
+            "batches": self.batches,
+        }
@@ -0,0 +1,60 @@
+# app/geo.py
+import math
+from typing import Iterable, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+MAX_RADIUS_KM = 500
+
+# Fixed lat/lng grid. 0.5 degrees is ~55 km north-south, so a typical 50 km
+# radius search touches at most 3x3 cells.
+CELL_DEGREES = 0.5
+ROWS = int(180 / CELL_DEGREES)
+COLS = int(360 / CELL_DEGREES)
+
+def _row(lat: float) -> int:
+    return min(ROWS - 1, max(0, int(math.floor((lat + 90) / CELL_DEGREES))))
+
+def _col(lng: float) -> int:
+    return int(math.floor((lng + 180) / CELL_DEGREES)) % COLS
+
+def geo_cell(lat: Optional[float], lng: Optional[float]) -> Optional[int]:
+    if lat is None or lng is None:
+        return None
+    return _row(lat) * COLS + _col(lng)
+
+def cells_within(lat: float, lng: float, radius_km: float) -> List[int]:
+    """Every grid cell that intersects the bounding box of the search circle."""
+    dlat = radius_km / KM_PER_DEGREE
+    first_row, last_row = _row(lat - dlat), _row(lat + dlat)
+    # Longitude degrees shrink towards the poles; use the widest latitude in the box
+    widest = min(89.9, max(abs(lat - dlat), abs(lat + dlat)))
+    dlng = radius_km / (KM_PER_DEGREE * math.cos(math.radians(widest)))
+    if dlng >= 180 or last_row == ROWS - 1 or first_row == 0:
+        cols = range(COLS)
+    else:
+        span = int(math.floor((lng + dlng + 180) / CELL_DEGREES)) - int(math.floor((lng - dlng + 180) / CELL_DEGREES))
+        cols = [(_col(lng - dlng) + step) % COLS for step in range(span + 1)]
+    return [row * COLS + col for row in range(first_row, last_row + 1) for col in cols]
+
+def distances_km(lat: float, lng: float, points: Iterable[Tuple[float, float]]) -> List[float]:
+    """Haversine distance from (lat, lng) to each point, sharing the per-origin terms."""
+    lat0 = math.radians(lat)
+    lng0 = math.radians(lng)
+    cos_lat0 = math.cos(lat0)
+    sin, cos, asin, sqrt, radians = math.sin, math.cos, math.asin, math.sqrt, math.radians
+    out = []
+    for plat, plng in points:
+        plat = radians(plat)
+        a = sin((plat - lat0) / 2) ** 2 + cos_lat0 * cos(plat) * sin((radians(plng) - lng0) / 2) ** 2
+        out.append(2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a))))
+    return out
+
+def parse_near(near: str) -> Tuple[float, float]:
+    try:
+        lat, lng = (float(part) for part in near.split(","))
+    except ValueError:
+        raise ValueError("near must be 'lat,lng'")
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("near is out of range")
+    return lat, lng
@@ -0,0 +1,92 @@
+# app/group_commit.py
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Commits one batch for a key; returns one result per item, in order. A result
+# that is an exception is raised to that item's caller only.
+BatchCommit = Callable[[Any, List[Any]], Awaitable[List[Any]]]
+
+class GroupCommitter:
+    """
+    Coalesces concurrent writes to the same key (e.g. bids on one order) into
+    one transaction.
+
+    The first submit() for a key starts a drain task for it, which waits
+    ``window`` seconds for more items, then hands the queue to ``commit`` in
+    batches of up to ``max_batch``, until the queue is empty. Items keep their
+    arrival order, so a batch decides exactly as running them one after another
+    would, but pays for one lock round trip and one commit. Each caller gets
+    its own item's result back (or its exception). stop() waits for the
+    running drains, so bids accepted before shutdown are still committed.
+    """
+
+    def __init__(self, commit: BatchCommit, window: float = 0.002, max_batch: int = 256):
+        self.commit = commit
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+        self._queues: Dict[Any, List[Tuple[Any, asyncio.Future]]] = {}
+        # The loop only keeps weak references to tasks
+        self._drains: Set[asyncio.Task] = set()
+
+    async def submit(self, key, item):
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = []
+            drain = asyncio.create_task(self._drain(key, queue))
+            self._drains.add(drain)
+            drain.add_done_callback(lambda task: self._drained(task, key, queue))
+        queue.append((item, future))
+        return await future
+
+    async def _drain(self, key, queue: List[Tuple[Any, asyncio.Future]]):
+        try:
+            await asyncio.sleep(self.window)
+            while queue:
+                batch = queue[:self.max_batch]
+                del queue[:self.max_batch]
+                await self._commit(key, batch)
+        finally:
+            del self._queues[key]
+
+    def _drained(self, task: asyncio.Task, key, queue: List[Tuple[Any, asyncio.Future]]):
+        # Also runs for a drain cancelled before it started, whose finally never ran
+        self._drains.discard(task)
+        if self._queues.get(key) is queue:
+            del self._queues[key]
+        for _, future in queue:  # Cancelled mid-drain: don't leave callers waiting
+            future.cancel()
+
+    async def stop(self):
+        await asyncio.gather(*self._drains, return_exceptions=True)
+
+    async def _commit(self, key, batch: List[Tuple[Any, asyncio.Future]]):
+        self.batches += 1
+        self.items += len(batch)
+        self.largest = max(self.largest, len(batch))
+        try:
+            results = await self.commit(key, [item for item, _ in batch])
+        except Exception as exc:
+            logger.exception("Group commit failed for %s", key)
+            results = [exc] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():  # Caller went away; the write stands
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest,
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
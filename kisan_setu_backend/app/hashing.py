@@ -0,0 +1,137 @@
+# app/hashing.py
+import asyncio
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from passlib.context import CryptContext
+
+# Recent queue waits kept for the percentiles in stats()
+WAIT_SAMPLES = 1000
+# Passwords per task in hash_many(): each hash is a few hundred ms of CPU
+# (sha256_crypt ~0.5s, bcrypt ~0.25s), so a chunk is one to two seconds and a
+# login queued behind a bulk import waits at most about that long
+HASH_CHUNK = 4
+# Backends that release the GIL, so a thread pool is enough for them
+THREAD_SAFE_SCHEMES = {"bcrypt", "argon2"}
+
+@lru_cache(maxsize=None)
+def _context(schemes: Tuple[str, ...]) -> CryptContext:
+    return CryptContext(schemes=list(schemes), deprecated="auto")
+
+# Module-level so a process pool can pickle them; each worker builds its context once
+def _hash(schemes: Tuple[str, ...], password: str) -> str:
+    return _context(schemes).hash(password)
+
+def _verify(schemes: Tuple[str, ...], password: str, hashed: str) -> bool:
+    return _context(schemes).verify(password, hashed)
+
+def _hash_many(schemes: Tuple[str, ...], passwords: List[str]) -> List[str]:
+    context = _context(schemes)
+    return [context.hash(password) for password in passwords]
+
+def _percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+class PasswordHasher:
+    """
+    passlib hash/verify run off the event loop, at most ``workers`` at a time.
+
+    A sha256_crypt or bcrypt call takes hundreds of milliseconds of CPU; run
+    inline it stalls every other request on the worker (bids, polls, SSE)
+    for that long. Calls over the cap wait their turn on a semaphore, and how
+    long they waited is what stats() reports: a growing queue wait means
+    logins need more workers, not that the loop is blocked.
+
+    ``executor="process"`` is needed for backends that hold the GIL, which
+    includes sha256_crypt via the crypt module; ``"thread"`` is cheaper and
+    enough for ones that release it, like bcrypt. ``"auto"`` (the default)
+    picks threads when every scheme is in THREAD_SAFE_SCHEMES, else
+    processes. Process workers are spawned, not forked, so they don't
+    inherit the loop or DB connections; as with any spawned pool, a script
+    that imports the app needs an ``if __name__ == "__main__"`` guard (the
+    uvicorn CLI has one).
+    """
+
+    def __init__(self, schemes: Sequence[str], workers: int = 2, executor: str = "auto"):
+        if executor not in ("auto", "process", "thread"):
+            raise ValueError(f"executor must be 'auto', 'process' or 'thread', not {executor!r}")
+        if executor == "auto":
+            executor = "thread" if set(schemes) <= THREAD_SAFE_SCHEMES else "process"
+        self.schemes = tuple(schemes)
+        self.workers = workers
+        self.executor = executor
+        self.completed = 0
+        self.waiting = 0
+        self.max_wait = 0.0
+        self._waits: deque = deque(maxlen=WAIT_SAMPLES)
+        self._slots = asyncio.Semaphore(workers)
+        self._pool: Optional[Executor] = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(_verify, password, hashed)
+
+    async def hash_many(self, passwords: Sequence[str]) -> List[str]:
+        """
+        Hashes for a bulk import, in order. Chunks go through the same slots
+        as single calls, but at most ``workers`` of them wait at a time, so
+        logins arriving meanwhile queue behind a chunk, not the whole import.
+        """
+        chunks = [list(passwords[start:start + HASH_CHUNK]) for start in range(0, len(passwords), HASH_CHUNK)]
+        hashed: List[List[str]] = [[] for _ in chunks]
+        pending = iter(range(len(chunks)))
+
+        async def feed():
+            for index in pending:
+                hashed[index] = await self._run(_hash_many, chunks[index])
+
+        await asyncio.gather(*(feed() for _ in range(min(self.workers, len(chunks)))))
+        return [value for chunk in hashed for value in chunk]
+
+    async def _run(self, fn, *args):
+        queued = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            waited = time.perf_counter() - queued
+            self._waits.append(waited)
+            self.max_wait = max(self.max_wait, waited)
+            result = await asyncio.get_running_loop().run_in_executor(self._executor(), fn, self.schemes, *args)
+            self.completed += 1
+            return result
+        finally:
+            self._slots.release()
+
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            if self.executor == "thread":
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hash")
+            else:
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor,
+            "workers": self.workers,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "queue_wait_p50_ms": round(_percentile(self._waits, 0.50) * 1000, 2),
+            "queue_wait_p99_ms": round(_percentile(self._waits, 0.99) * 1000, 2),
+            "queue_wait_max_ms": round(self.max_wait * 1000, 2),
+        }
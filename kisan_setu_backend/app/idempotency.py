@@ -0,0 +1,206 @@
+# app/idempotency.py
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+
+from jose import JWTError, jwt
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from app.serialization import dump_json
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Tries at claiming a key that keeps changing hands between SELECT and INSERT
+CLAIM_ATTEMPTS = 3
+
+class KeyBusy(Exception):
+    """The key changed hands too often to claim; the caller answers 409."""
+
+# _try_claim lost the INSERT race to a claim that was gone by the re-SELECT
+CLAIM_RACED = object()
+
+class IdempotencyMiddleware:
+    """
+    Replays the stored response when a mutating request is retried with the
+    same ``Idempotency-Key`` header, without running the handler again.
+
+    Keys are scoped to the caller (JWT subject, or "anon") and stored in
+    ``model``'s table, so a retry that lands on another worker is still caught.
+    The first request claims the key with an INSERT (the primary key makes
+    concurrent duplicates fail), runs, then saves status + body. A retry is
+    a single primary-key SELECT:
+
+    * completed, same method/path/body -> stored response, ``Idempotent-Replayed: true``
+    * completed, different request     -> 422
+    * still running                    -> 409, retry later
+
+    5xx responses and exceptions release the key, so those can be retried. A
+    claim still unfinished after ``lock_timeout`` seconds (the worker died) can
+    be taken over. Keys expire after ``ttl`` seconds; expired rows are purged at most once
+    per ``purge_interval`` per worker.
+    """
+
+    def __init__(self, app, session_factory, model, secret_key: str, algorithm: str,
+                 ttl: float = 86400, lock_timeout: float = 60, purge_interval: float = 300):
+        self.app = app
+        self.session_factory = session_factory
+        self.model = model
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.ttl = timedelta(seconds=ttl)
+        self.lock_timeout = timedelta(seconds=lock_timeout)
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+
+    def _scope(self, headers: dict) -> str:
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        if authorization.lower().startswith("bearer "):
+            try:
+                payload = jwt.decode(authorization[7:], self.secret_key, algorithms=[self.algorithm])
+                return f"user:{payload.get('sub')}"
+            except JWTError:
+                pass
+        return "anon"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in MUTATING_METHODS:
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        key = headers.get(IDEMPOTENCY_HEADER.encode())
+        if not key:
+            return await self.app(scope, receive, send)
+        key = key.decode("latin-1")
+        if len(key) > MAX_KEY_LENGTH:
+            return await self._reply(send, 400, {"detail": "Idempotency-Key is too long"})
+
+        # Buffer the body once: it goes into the fingerprint and is replayed to the app
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        fingerprint = hashlib.sha256(
+            scope["method"].encode() + b" " + scope["path"].encode() + b"\n" + body
+        ).hexdigest()
+        owner = self._scope(headers)
+
+        try:
+            stored = await self._claim(owner, key, fingerprint)
+        except KeyBusy:
+            return await self._reply(send, 409, {"detail": "A request with this Idempotency-Key is still in progress"})
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                return await self._reply(send, 422, {"detail": "Idempotency-Key was already used for a different request"})
+            if stored.status_code is None:
+                return await self._reply(send, 409, {"detail": "A request with this Idempotency-Key is still in progress"})
+            return await self._replay(send, stored)
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response = {"status": None, "content_type": None, "body": []}
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["content_type"] = dict(message.get("headers", [])).get(b"content-type")
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            await self._release(owner, key)
+            raise
+        if response["status"] is None or response["status"] >= 500:
+            await self._release(owner, key)
+        else:
+            await self._store(owner, key, response)
+
+    # ----- storage -----
+    async def _claim(self, owner: str, key: str, fingerprint: str):
+        """
+        Claim the key; returns None on success, else the existing row. Raises
+        KeyBusy if other requests kept taking and releasing the key for
+        CLAIM_ATTEMPTS tries in a row.
+        """
+        for _ in range(CLAIM_ATTEMPTS):
+            stored = await self._try_claim(owner, key, fingerprint)
+            if stored is not CLAIM_RACED:
+                return stored
+        raise KeyBusy()
+
+    async def _try_claim(self, owner: str, key: str, fingerprint: str):
+        model = self.model
+        now = datetime.now(timezone.utc)
+        async with self.session_factory() as session:
+            stored = await session.get(model, (owner, key))
+            if stored is not None:
+                created_at = stored.created_at if stored.created_at.tzinfo else stored.created_at.replace(tzinfo=timezone.utc)
+                abandoned = stored.status_code is None and created_at <= now - self.lock_timeout
+                if created_at > now - self.ttl and not abandoned:
+                    return stored
+                await session.delete(stored)
+            session.add(model(scope=owner, key=key, fingerprint=fingerprint, created_at=now))
+            try:
+                # The purge autoflushes the INSERT, so it can hit the race too
+                if time.monotonic() - self._last_purge > self.purge_interval:
+                    self._last_purge = time.monotonic()
+                    await session.execute(delete(model).where(model.created_at < now - self.ttl))
+                await session.commit()
+            except IntegrityError:
+                # Another request claimed it between our SELECT and INSERT; if
+                # its row is already gone again (released), start over
+                await session.rollback()
+                stored = await session.scalar(
+                    select(model).where(model.scope == owner, model.key == key)
+                )
+                return CLAIM_RACED if stored is None else stored
+        return None
+
+    async def _store(self, owner: str, key: str, response: dict):
+        async with self.session_factory() as session:
+            stored = await session.get(self.model, (owner, key))
+            if stored is not None:
+                stored.status_code = response["status"]
+                stored.content_type = (response["content_type"] or b"application/json").decode("latin-1")
+                stored.body = b"".join(response["body"])
+                await session.commit()
+
+    async def _release(self, owner: str, key: str):
+        async with self.session_factory() as session:
+            await session.execute(delete(self.model).where(self.model.scope == owner, self.model.key == key))
+            await session.commit()
+
+    # ----- responses -----
+    async def _replay(self, send, stored):
+        await send({
+            "type": "http.response.start",
+            "status": stored.status_code,
+            "headers": [
+                (b"content-type", stored.content_type.encode("latin-1")),
+                (b"content-length", str(len(stored.body)).encode()),
+                (b"idempotent-replayed", b"true"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": stored.body})
+
+    async def _reply(self, send, status_code: int, content: dict):
+        body = dump_json(content)
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
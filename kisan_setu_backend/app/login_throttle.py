@@ -0,0 +1,152 @@
+# app/login_throttle.py
+import math
+import struct
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.ratelimit import SharedSlots, SlotUpdate, default_store_path, fcntl, parse_rate
+
+# key hash, window start, failures in the previous window, failures in this
+# one, locked until, lockouts in a row (times are time.monotonic())
+RECORD = struct.Struct("<Qddddd")
+State = Tuple[float, float, float, float, float]
+
+def record_failure(state: Optional[State], now: float, limit: int, window: float,
+                   lockout: float, max_lockout: float) -> State:
+    """
+    One more failed login for a key. Failures are counted in a sliding window
+    (this fixed window plus the overlapping share of the previous one); when
+    they reach ``limit`` the key is locked out for ``lockout`` seconds,
+    doubling for every lockout in a row up to ``max_lockout``. A key that
+    stays clean for ``max_lockout`` after its last lockout starts over.
+    """
+    start, previous, current, locked_until, strikes = state or (now, 0.0, 0.0, 0.0, 0.0)
+    if strikes and now >= locked_until + max_lockout:
+        strikes = 0.0
+    elapsed = now - start
+    if elapsed >= 2 * window:
+        start, previous, current = now, 0.0, 0.0
+    elif elapsed >= window:
+        start, previous, current = start + window, current, 0.0
+    current += 1
+    if previous * (1 - (now - start) / window) + current >= limit:
+        strikes += 1
+        locked_until = now + min(max_lockout, lockout * 2 ** (strikes - 1))
+        previous = current = 0.0
+    return start, previous, current, locked_until, strikes
+
+class LocalThrottleStore:
+    """Counters in an LRU dict: per process only, for tests and platforms without fcntl."""
+
+    shared = False
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._states: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def update(self, key: str, fn: SlotUpdate):
+        values, result = fn(self._states.get(key))
+        if values is None:
+            self._states.pop(key, None)
+        else:
+            self._states[key] = values
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+        return result
+
+class SharedThrottleStore(SharedSlots):
+    """Counters shared by every worker on the host (see SharedSlots)."""
+
+    shared = True
+
+    def __init__(self, path: str):
+        super().__init__(path, RECORD)
+
+def create_throttle_store(path: Optional[str] = None):
+    """Shared store at ``path`` (default: /dev/shm); "memory" means per-worker counters.
+
+    Anything with the same update(key, fn) contract can stand in, e.g. a store
+    backed by Redis when logins are spread over several hosts.
+    """
+    if path == "memory" or fcntl is None:
+        return LocalThrottleStore()
+    return SharedThrottleStore(path or default_store_path("kisansetu-login-throttle"))
+
+class LoginThrottle:
+    """
+    Brute-force and credential-stuffing guard for /login: failed attempts are
+    counted per phone number (guessing one account's password) and per
+    client IP (trying leaked credentials across many accounts), each with its
+    own "failures/seconds" limit, and a key over its limit is locked out with
+    exponential backoff (see record_failure).
+
+    check() runs before the user lookup and the password hash, so a locked
+    out attempt costs one counter read instead of a hash. A successful login
+    clears the phone's counters; the IP's keep counting, so a stuffing run
+    that hits some valid accounts is still throttled.
+    """
+
+    def __init__(self, store, per_phone: str = "5/900", per_ip: str = "50/900",
+                 lockout: float = 60, max_lockout: float = 3600):
+        self.store = store
+        self.limits = {"phone": per_phone, "ip": per_ip}
+        self.rates = {scope: parse_rate(limit) for scope, limit in self.limits.items()}
+        self.lockout = lockout
+        self.max_lockout = max_lockout
+        self.rejected: Dict[str, int] = {"phone": 0, "ip": 0}
+        self.lockouts: Dict[str, int] = {"phone": 0, "ip": 0}
+
+    def _keys(self, phone: str, ip: str):
+        for scope, value in (("phone", phone), ("ip", ip)):
+            if self.rates[scope] is not None:
+                yield scope, f"{scope}:{value}"
+
+    def check(self, phone: str, ip: str):
+        """429 with Retry-After while the phone or the IP is locked out."""
+        now = time.monotonic()
+        for scope, key in self._keys(phone, ip):
+            wait = self.store.update(key, lambda state: (state, _locked_for(state, now)))
+            if wait:
+                self.rejected[scope] += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many failed login attempts, try again later",
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+
+    def failed(self, phone: str, ip: str):
+        now = time.monotonic()
+        for scope, key in self._keys(phone, ip):
+            limit, window = self.rates[scope]
+
+            def step(state):
+                if state is not None and state[0] > now:  # A file left over from before a reboot
+                    state = None
+                updated = record_failure(state, now, limit, window, self.lockout, self.max_lockout)
+                return updated, updated[3] > now and (state is None or updated[3] != state[3])
+
+            if self.store.update(key, step):
+                self.lockouts[scope] += 1
+
+    def succeeded(self, phone: str):
+        if self.rates["phone"] is not None:
+            self.store.update(f"phone:{phone}", lambda state: (None, None))
+
+    def stats(self) -> dict:
+        return {
+            scope: {
+                "limit": self.limits[scope] if self.rates[scope] else "off",
+                "rejected": self.rejected[scope],
+                "lockouts": self.lockouts[scope],
+            }
+            for scope in self.limits
+        }
+
+def _locked_for(state: Optional[State], now: float) -> float:
+    if state is None or state[0] > now:
+        return 0.0
+    return max(0.0, state[3] - now)
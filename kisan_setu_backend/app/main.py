@@ -1,9 +1,13 @@
 # app/main.py
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.database import engine, Base
+from app.search import install_search_index
+from app.casing import key_case
+from app.serialization import FastJSONResponse
 from app.config import settings
+from app.auth import password_hasher
 from app.routers import auth_router, orders_router, bids_router, deals_router, admin_router
 
 @asynccontextmanager
@@ -11,14 +15,18 @@ async def lifespan(app: FastAPI):
     # Startup: Create tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(install_search_index)
     yield
     # Shutdown
+    password_hasher.shutdown()
     await engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+    dependencies=[Depends(key_case)]
 )
 
 # CORS middleware
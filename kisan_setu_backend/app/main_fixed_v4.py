@@ -1,27 +1,92 @@
 # app/main_fixed_v4.py - FIXED JWT AUTH + ALL ENDPOINTS
-from fastapi import FastAPI, Depends, HTTPException, status, Query, Header
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Header, Response, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, select, func
-from passlib.context import CryptContext
+from sqlalchemy.orm import declarative_base, aliased
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Index, LargeBinary, select, insert, update, func, text, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List
+from typing import Any, Optional, List, Dict
+import asyncio
 import enum
 import os
 from contextlib import asynccontextmanager
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, ValidationError, validator
 import re
+from app.pagination import (
+    decode_amount_cursor, decode_cursor, decode_id_cursor, encode_amount_cursor, encode_id_cursor, split_page,
+)
+from app.search import install_search_index, text_search
+from app.order_cache import FACETS, OpenOrderSnapshot, as_utc, facet_values
+from app.etag import content_etag, etag_matches, make_etag, not_modified
+from app.streaming import ndjson_response, ndjson_stream, wants_ndjson
+from app.geo import MAX_RADIUS_KM, cells_within, distances_km, geo_cell, parse_near
+from app.serialization import FastJSONResponse, dump_json
+from app.casing import CAMEL, camelize, current_key_case, key_case, register_camel_aliases
+from app.bid_book import BidBooks
+from app.pubsub import OrderEvents
+from app.idempotency import IdempotencyMiddleware
+from app.ratelimit import ClientIP, RateLimit, create_bucket_store
+from app.login_throttle import LoginThrottle, create_throttle_store
+from app.expiry import ExpiryScheduler
+from app.group_commit import GroupCommitter
+from app.proxy_bidding import Proxy, resolve_proxy_bids
+from app.principal_cache import PrincipalCache
+from app.hashing import PasswordHasher
+from app.sessions import LazySession
 
 # ========== CONFIG ==========
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./kisansetu.db")
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production-12345")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days for easier testing
+ORDERS_PAGE_SIZE = int(os.getenv("ORDERS_PAGE_SIZE", "50"))
+ORDERS_MAX_PAGE_SIZE = 100  # Hard cap, clients cannot ask for more per page
+ORDER_SNAPSHOT_MAX_ORDERS = int(os.getenv("ORDER_SNAPSHOT_MAX_ORDERS", "50000"))
+ORDER_SNAPSHOT_TTL = float(os.getenv("ORDER_SNAPSHOT_TTL", "5"))  # Max staleness across workers (a cheap probe, see below)
+ORDER_SNAPSHOT_MAX_AGE = float(os.getenv("ORDER_SNAPSHOT_MAX_AGE", "300"))  # Full reload at least this often
+PRICE_BUCKET_SIZE = int(os.getenv("PRICE_BUCKET_SIZE", "500"))  # Rs per quintal, for facet chips
+BID_BOOK_MAX_ORDERS = int(os.getenv("BID_BOOK_MAX_ORDERS", "5000"))
+BID_BOOK_TTL = float(os.getenv("BID_BOOK_TTL", "5"))  # Max staleness across workers
+BID_BOOK_DEPTH = int(os.getenv("BID_BOOK_DEPTH", "500"))  # Highest bids kept per order
+BIDS_PAGE_SIZE = int(os.getenv("BIDS_PAGE_SIZE", "20"))
+BIDS_MAX_PAGE_SIZE = 100
+PUSH_QUEUE_SIZE = int(os.getenv("PUSH_QUEUE_SIZE", "16"))  # Events buffered per slow connection
+PUSH_POLL_INTERVAL = float(os.getenv("PUSH_POLL_INTERVAL", "2"))  # Picks up writes from other workers
+PUSH_KEEPALIVE = 15  # Seconds between SSE keep-alive comments
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", str(24 * 60 * 60)))  # How long a key can be replayed
+RATE_LIMIT_BIDS = os.getenv("RATE_LIMIT_BIDS", "10/10")  # "<requests>/<seconds>" per buyer, "off" to disable
+RATE_LIMIT_LOGIN = os.getenv("RATE_LIMIT_LOGIN", "20/60")  # Per client IP
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE")  # Shared-memory file (default /dev/shm), or "memory"
+LOGIN_FAILURES_PER_PHONE = os.getenv("LOGIN_FAILURES_PER_PHONE", "5/900")  # Failed logins before a lockout, "off" to disable
+LOGIN_FAILURES_PER_IP = os.getenv("LOGIN_FAILURES_PER_IP", "50/900")  # Across phones, catches credential stuffing
+LOGIN_LOCKOUT = float(os.getenv("LOGIN_LOCKOUT", "60"))  # Seconds, doubles per lockout in a row
+LOGIN_MAX_LOCKOUT = float(os.getenv("LOGIN_MAX_LOCKOUT", "3600"))
+LOGIN_THROTTLE_STORE = os.getenv("LOGIN_THROTTLE_STORE")  # Shared-memory file (default /dev/shm), or "memory"
+TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", "0"))  # Reverse proxies appending to X-Forwarded-For (1 behind Render/nginx)
+EXPIRY_HORIZON = float(os.getenv("EXPIRY_HORIZON", "600"))  # Seconds ahead the expiry heap holds
+EXPIRY_REFILL_INTERVAL = float(os.getenv("EXPIRY_REFILL_INTERVAL", "60"))  # Picks up orders from other workers
+EXPIRY_BATCH_SIZE = int(os.getenv("EXPIRY_BATCH_SIZE", "500"))  # Orders per UPDATE
+BID_GROUP_COMMIT = os.getenv("BID_GROUP_COMMIT", "0") == "1"  # Coalesce concurrent bids per order
+BID_GROUP_WINDOW = float(os.getenv("BID_GROUP_WINDOW", "0.002"))  # Seconds a batch stays open
+BID_GROUP_MAX = int(os.getenv("BID_GROUP_MAX", "256"))  # Bids per transaction
+PROXY_BID_INCREMENT = float(os.getenv("PROXY_BID_INCREMENT", "10"))  # Rs a proxy outbids by
+PRINCIPAL_CACHE_MAX = int(os.getenv("PRINCIPAL_CACHE_MAX", "10000"))  # Authenticated users kept per worker
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))  # Max staleness across workers
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))  # Concurrent hashes per worker
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "auto")  # "process", "thread", or "auto" by scheme
+BULK_REGISTER_MAX = int(os.getenv("BULK_REGISTER_MAX", "5000"))  # Users per /admin/users/bulk request
+BULK_INSERT_BATCH = 500  # Phones per "already registered?" lookup
+BULK_HASH_BATCH = int(os.getenv("BULK_HASH_BATCH", "100"))  # Users hashed and inserted per step (~30s on 2 workers)
 
 # ========== DATABASE ==========
-engine = create_async_engine(DATABASE_URL, echo=False)  # Set to False for production
+# SQLite allows one writer at a time; under a bid storm writers queue on the
+# file lock, so wait for it rather than failing after the 5s default
+ENGINE_CONNECT_ARGS = {"timeout": 30} if DATABASE_URL.startswith("sqlite") else {}
+engine = create_async_engine(DATABASE_URL, echo=False, connect_args=ENGINE_CONNECT_ARGS)  # Set to False for production
 Base = declarative_base()
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
@@ -36,6 +101,11 @@ async def get_db():
         finally:
             await session.close()
 
+def get_lazy_db() -> LazySession:
+    # For handlers that hash or sign between queries: a connection per
+    # statement, never held while they compute (see LazySession)
+    return LazySession(AsyncSessionLocal)
+
 # ========== MODELS ==========
 class User(Base):
     __tablename__ = "users"
@@ -65,9 +135,33 @@ class Order(Base):
     bids_count = Column(Integer, default=0)
     location = Column(String, nullable=False)
     pincode = Column(String(6), nullable=False)
+    lat = Column(Float, nullable=True)
+    lng = Column(Float, nullable=True)
+    geo_cell = Column(Integer, nullable=True)  # app.geo grid cell of (lat, lng)
     status = Column(String, default="OPEN")
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every write, backs the ETag
     expires_at = Column(DateTime(timezone=True), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Python-side default keeps microseconds, so the (created_at, id) cursor is stable
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
+    
+    # Keep in sync with alembic/versions/0001_marketplace_indexes.py
+    __table_args__ = (
+        Index("ix_orders_open_created", "created_at", "id",
+              postgresql_where=text("status = 'OPEN'"), sqlite_where=text("status = 'OPEN'")),
+        Index("ix_orders_open_crop_created", "crop", "created_at", "id",
+              postgresql_where=text("status = 'OPEN'"), sqlite_where=text("status = 'OPEN'")),
+        Index("ix_orders_open_min_price", "min_price",
+              postgresql_where=text("status = 'OPEN'"), sqlite_where=text("status = 'OPEN'")),
+        Index("ix_orders_farmer_created", "farmer_id", "created_at"),
+        Index("ix_orders_open_geo_cell", "geo_cell",
+              postgresql_where=text("status = 'OPEN'"), sqlite_where=text("status = 'OPEN'")),
+        Index("ix_orders_open_expires", "expires_at",
+              postgresql_where=text("status = 'OPEN'"), sqlite_where=text("status = 'OPEN'")),
+    )
+    
+    @property
+    def coordinates(self):
+        return {"lat": self.lat, "lng": self.lng} if self.lat is not None and self.lng is not None else None
 
 class Bid(Base):
     __tablename__ = "bids"
@@ -77,6 +171,12 @@ class Bid(Base):
     bidder_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     amount = Column(Float, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # Covers the (amount, id) DESC keyset scan of one order's bids
+        Index("ix_bids_order_amount_id", "order_id", "amount", "id"),
+        Index("ix_bids_bidder_id", "bidder_id", "id"),  # Keyset pages of GET /bids/my
+    )
 
 class Deal(Base):
     __tablename__ = "deals"
@@ -89,6 +189,40 @@ class Deal(Base):
     total_amount = Column(Float, nullable=False)
     status = Column(String, default="LOCKED")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_deals_seller_created", "seller_id", "created_at"),
+        Index("ix_deals_buyer_created", "buyer_id", "created_at"),
+    )
+
+class ProxyBid(Base):
+    __tablename__ = "proxy_bids"
+    
+    # A buyer's standing maximum on an order, see app/proxy_bidding.py
+    order_id = Column(Integer, ForeignKey("orders.id"), primary_key=True)
+    bidder_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    max_amount = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)  # Earlier wins a tie
+    
+    __table_args__ = (
+        Index("ix_proxy_bids_order_max", "order_id", "max_amount"),
+    )
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    
+    # Stored responses for retried mutations, see app/idempotency.py
+    scope = Column(String(64), primary_key=True)  # "user:<id>" or "anon"
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of method, path and body
+    status_code = Column(Integer, nullable=True)  # NULL while the first request is running
+    content_type = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    
+    __table_args__ = (
+        Index("ix_idempotency_keys_created", "created_at"),
+    )
 
 # ========== PYDANTIC SCHEMAS ==========
 class UserResponse(BaseModel):
@@ -119,6 +253,28 @@ class UserLogin(BaseModel):
     phone: str
     password: str
 
+class BulkUsersCreate(BaseModel):
+    # Raw rows: each is validated as a UserCreate on its own, so one bad row
+    # (even one that isn't an object) is reported instead of failing the
+    # whole village with a 422
+    users: List[Any]
+
+class BulkUserResult(BaseModel):
+    index: int
+    phone: Optional[str] = None
+    status: str  # "created" or "rejected"
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+class BulkUsersResponse(BaseModel):
+    created: int
+    rejected: int
+    results: List[BulkUserResult]
+
+class Coordinates(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+
 class OrderCreate(BaseModel):
     crop: str
     variety: str = Field(..., min_length=1, max_length=50)
@@ -128,6 +284,7 @@ class OrderCreate(BaseModel):
     min_price: float = Field(..., gt=0)
     location: str = Field(..., min_length=2, max_length=100)
     pincode: str = Field(..., min_length=6, max_length=6)
+    coordinates: Optional[Coordinates] = None
 
 class OrderResponse(BaseModel):
     id: int
@@ -143,6 +300,8 @@ class OrderResponse(BaseModel):
     bids_count: int
     location: str
     pincode: str
+    coordinates: Optional[Dict[str, float]] = None
+    distance_km: Optional[float] = None  # Only set for near= searches
     status: str
     expires_at: datetime
     created_at: datetime
@@ -167,6 +326,37 @@ class BidResponse(BaseModel):
 class DealCreate(BaseModel):
     bid_id: int
 
+class OrderSummary(BaseModel):
+    id: int
+    crop: str
+    variety: str
+    quantity: float
+    quantity_unit: str
+    location: str
+    min_price: float
+    status: str
+    current_high_bid: Optional[float] = None
+    bids_count: int = 0
+    expires_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class MyBidResponse(BidResponse):
+    # One row of GET /bids/my: the bid plus enough of its order for the dashboard
+    order: OrderSummary
+    is_winning: bool
+
+class ProxyBidCreate(BaseModel):
+    max_amount: float = Field(..., gt=0)
+
+class ProxyBidResponse(BaseModel):
+    order_id: int
+    max_amount: float
+    leading: bool
+    current_high_bid: float
+    bids: List[BidResponse] = []  # Placed by proxies while resolving this one
+
 class DealResponse(BaseModel):
     id: int
     order_id: int
@@ -185,14 +375,389 @@ class DealResponse(BaseModel):
 class DealStatusUpdate(BaseModel):
     status: str
 
+# ========== FAST SERIALIZERS ==========
+# Hot list routes map each row once into a plain dict with the same keys (and
+# order) as the response schema, then return FastJSONResponse directly so the
+# response_model is only used for the docs. These accept ORM objects or plain
+# column rows, since both expose columns as attributes.
+ORDER_COLUMNS = tuple(Order.__table__.c)
+BID_COLUMNS = tuple(Bid.__table__.c)
+DEAL_COLUMNS = tuple(Deal.__table__.c)
+# What INSERT ... RETURNING hands back for a new user (UserResponse's fields)
+USER_RESPONSE_COLUMNS = (User.id, User.name, User.phone, User.role, User.location, User.is_verified, User.trust_score)
+
+# Keys renamed for "X-Key-Case: camel" clients; also covers the dict-only
+# payloads (auth, facets, metrics) that have no schema.
+register_camel_aliases(
+    UserResponse, Token, OrderResponse, BidResponse, DealResponse, ProxyBidResponse, OrderSummary, MyBidResponse,
+    BulkUserResult, BulkUsersResponse,
+    "price_bucket", "order_snapshot", "max_orders", "hit_ratio", "deal_id", "next_cursor", "rate_limits", "next_due", "bid_group_commit", "largest_batch", "avg_batch", "max_entries",
+    "reloads_skipped",
+    "password_hashing", "login_throttle", "queue_wait_p50_ms", "queue_wait_p99_ms", "queue_wait_max_ms",
+)
+
+def order_to_dict(order, farmer_name: Optional[str]) -> dict:
+    return {
+        "id": order.id,
+        "farmer_id": order.farmer_id,
+        "farmer_name": farmer_name,
+        "crop": order.crop,
+        "variety": order.variety,
+        "quantity": order.quantity,
+        "quantity_unit": order.quantity_unit,
+        "moisture": order.moisture,
+        "min_price": order.min_price,
+        "current_high_bid": order.current_high_bid,
+        "bids_count": order.bids_count,
+        "location": order.location,
+        "pincode": order.pincode,
+        "coordinates": {"lat": order.lat, "lng": order.lng} if order.lat is not None and order.lng is not None else None,
+        "distance_km": None,
+        "status": order.status,
+        "expires_at": order.expires_at,
+        "created_at": order.created_at,
+    }
+
+def bid_to_dict(bid, bidder_name: Optional[str]) -> dict:
+    return {
+        "id": bid.id,
+        "order_id": bid.order_id,
+        "bidder_id": bid.bidder_id,
+        "bidder_name": bidder_name,
+        # RETURNING hands back the bound value (an int for "amount": 2500);
+        # BidResponse, and so every read path, says 2500.0
+        "amount": float(bid.amount),
+        "created_at": bid.created_at,
+    }
+
+# Order fields shown next to each of a buyer's bids (GET /bids/my)
+MY_BID_ORDER_COLUMNS = (
+    Order.crop, Order.variety, Order.quantity, Order.quantity_unit, Order.location, Order.min_price,
+    Order.status.label("order_status"), Order.current_high_bid, Order.bids_count, Order.expires_at,
+)
+
+def my_bid_to_dict(row, bidder_name: Optional[str]) -> dict:
+    bid = bid_to_dict(row, bidder_name)
+    bid["order"] = {
+        "id": row.order_id,
+        "crop": row.crop,
+        "variety": row.variety,
+        "quantity": row.quantity,
+        "quantity_unit": row.quantity_unit,
+        "location": row.location,
+        "min_price": row.min_price,
+        "status": row.order_status,
+        "current_high_bid": row.current_high_bid,
+        "bids_count": row.bids_count,
+        "expires_at": row.expires_at,
+    }
+    # Accepted bids strictly increase, so only the top bid can match the high
+    bid["is_winning"] = row.amount >= (row.current_high_bid or 0)
+    return bid
+
+def deal_to_dict(deal, seller_name: Optional[str], buyer_name: Optional[str]) -> dict:
+    return {
+        "id": deal.id,
+        "order_id": deal.order_id,
+        "seller_id": deal.seller_id,
+        "seller_name": seller_name,
+        "buyer_id": deal.buyer_id,
+        "buyer_name": buyer_name,
+        "final_price": deal.final_price,
+        "total_amount": deal.total_amount,
+        "status": deal.status,
+        "created_at": deal.created_at,
+    }
+
+def deals_with_names():
+    seller, buyer = aliased(User), aliased(User)
+    return (
+        select(*DEAL_COLUMNS, seller.name.label("seller_name"), buyer.name.label("buyer_name"))
+        .join(seller, Deal.seller_id == seller.id)
+        .join(buyer, Deal.buyer_id == buyer.id)
+    )
+
+# ========== OPEN ORDER SNAPSHOT ==========
+async def probe_open_orders() -> tuple:
+    # Every write to an order bumps its version, new orders raise max(id) and
+    # closed ones lower the count, so this only stays put while nothing changed
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(func.count(), func.max(Order.id), func.sum(Order.version)).where(Order.status == "OPEN")
+        )
+        return tuple(result.one())
+
+order_snapshot = OpenOrderSnapshot(
+    max_orders=ORDER_SNAPSHOT_MAX_ORDERS,
+    ttl=ORDER_SNAPSHOT_TTL,
+    price_bucket_size=PRICE_BUCKET_SIZE,
+    probe=probe_open_orders,
+    max_age=ORDER_SNAPSHOT_MAX_AGE
+)
+
+async def load_open_orders(limit: int) -> List[dict]:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(*ORDER_COLUMNS, User.name.label("farmer_name")).join(User, Order.farmer_id == User.id).where(
+                # Past expires_at but not yet flipped by the expiry scheduler
+                Order.status == "OPEN", Order.expires_at > datetime.now(timezone.utc)
+            ).limit(limit)
+        )
+        return [order_to_dict(row, row.farmer_name) for row in result.all()]
+
+# ========== BID BOOKS ==========
+bid_books = BidBooks(max_orders=BID_BOOK_MAX_ORDERS, ttl=BID_BOOK_TTL)
+
+def order_bids_query(order_id: int):
+    return select(*BID_COLUMNS, User.name.label("bidder_name")).join(User, Bid.bidder_id == User.id).where(
+        Bid.order_id == order_id
+    ).order_by(Bid.amount.desc(), Bid.id.desc())  # Backward scan of ix_bids_order_amount_id
+
+async def load_bid_book(db: AsyncSession, order_id: int):
+    order = (await db.execute(
+        select(Order.status, Order.expires_at, Order.bids_count).where(Order.id == order_id)
+    )).first()
+    if order is None or order.status != "OPEN":
+        return None
+    expires_at = order.expires_at if order.expires_at.tzinfo else order.expires_at.replace(tzinfo=timezone.utc)
+    if expires_at <= datetime.now(timezone.utc):
+        return None
+    result = await db.execute(order_bids_query(order_id).limit(BID_BOOK_DEPTH))
+    bids = [bid_to_dict(row, row.bidder_name) for row in result.all()]
+    return bids, expires_at, max(order.bids_count or 0, len(bids)), len(bids) < BID_BOOK_DEPTH
+
+# ========== LIVE ORDER EVENTS ==========
+order_events = OrderEvents(queue_size=PUSH_QUEUE_SIZE, poll_interval=PUSH_POLL_INTERVAL)
+
+async def load_order_state(order_id: int) -> Optional[dict]:
+    async with AsyncSessionLocal() as session:
+        row = (await session.execute(
+            select(Order.id, Order.status, Order.current_high_bid, Order.bids_count, Order.version)
+            .where(Order.id == order_id)
+        )).first()
+    if row is None:
+        return None
+    return {
+        "order_id": row.id,
+        "version": row.version,
+        "status": row.status,
+        "current_high_bid": row.current_high_bid,
+        "bids_count": row.bids_count,
+    }
+
+async def nearby_orders(db: AsyncSession, query, lat: float, lng: float, radius_km: float, limit: int) -> List[dict]:
+    # The indexed grid cell narrows the scan to the circle's bounding cells;
+    # exact distance is only computed for those candidates.
+    query = query.where(Order.geo_cell.in_(cells_within(lat, lng, radius_km)))
+    rows = (await db.execute(query)).all()
+    distances = distances_km(lat, lng, ((row.lat, row.lng) for row in rows))
+    nearest = sorted(
+        ((distance, row.id, row) for distance, row in zip(distances, rows) if distance <= radius_km),
+        key=lambda candidate: candidate[:2]
+    )[:limit]
+    orders = []
+    for distance, _, row in nearest:
+        order_dict = order_to_dict(row, row.farmer_name)
+        order_dict["distance_km"] = round(distance, 2)
+        orders.append(order_dict)
+    return orders
+
+# ========== ORDER EXPIRY ==========
+async def load_due_orders(until: datetime, limit: int):
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Order.id, Order.expires_at)
+            .where(Order.status == "OPEN", Order.expires_at <= until)  # ix_orders_open_expires
+            .order_by(Order.expires_at)
+            .limit(limit)
+        )
+        return [tuple(row) for row in result.all()]
+
+async def expire_orders(order_ids: List[int]) -> int:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(Order)
+            .where(
+                Order.id.in_(order_ids),
+                Order.status == "OPEN",
+                Order.expires_at <= datetime.now(timezone.utc)
+            )
+            .values(status="EXPIRED", version=Order.version + 1)
+            .returning(Order.id, Order.current_high_bid, Order.bids_count, Order.version)
+            .execution_options(synchronize_session=False)
+        )
+        expired = result.all()
+        await session.commit()
+    for row in expired:
+        order_snapshot.remove(row.id)
+        bid_books.evict(row.id)
+        order_events.publish(row.id, {
+            "type": "order",
+            "order_id": row.id,
+            "version": row.version,
+            "status": "EXPIRED",
+            "current_high_bid": row.current_high_bid,
+            "bids_count": row.bids_count,
+        })
+    return len(expired)
+
+expiry_scheduler = ExpiryScheduler(
+    load_due_orders,
+    expire_orders,
+    horizon=EXPIRY_HORIZON,
+    refill_interval=EXPIRY_REFILL_INTERVAL,
+    batch_size=EXPIRY_BATCH_SIZE
+)
+
+# ========== PROXY BIDS ==========
+async def place_proxy_bids(db: AsyncSession, order_id: int, leader_id: Optional[int], high: float) -> List[dict]:
+    """
+    Lets standing proxies answer ``leader_id``'s lead at ``high``. Runs in
+    the caller's transaction, which must already hold the order's write lock;
+    returns the bids it inserted, lowest first.
+    """
+    result = await db.execute(
+        select(ProxyBid.bidder_id, ProxyBid.max_amount, User.name)
+        .join(User, ProxyBid.bidder_id == User.id)
+        .where(ProxyBid.order_id == order_id, ProxyBid.max_amount > high)  # ix_proxy_bids_order_max
+        .order_by(ProxyBid.max_amount.desc(), ProxyBid.created_at)
+        .limit(2)
+    )
+    auto_bids = resolve_proxy_bids(leader_id, high, [Proxy(*row) for row in result.all()], PROXY_BID_INCREMENT)
+    if not auto_bids:
+        return []
+    rows = (await db.execute(
+        insert(Bid).returning(*BID_COLUMNS, sort_by_parameter_order=True),
+        [{"order_id": order_id, "bidder_id": auto.bidder_id, "amount": auto.amount} for auto in auto_bids]
+    )).all()
+    await db.execute(
+        update(Order)
+        .where(Order.id == order_id)
+        .values(
+            current_high_bid=auto_bids[-1].amount,
+            bids_count=Order.bids_count + len(auto_bids),
+            version=Order.version + len(auto_bids)
+        )
+    )
+    return [bid_to_dict(row, auto.bidder_name) for row, auto in zip(rows, auto_bids)]
+
+# ========== BID GROUP COMMIT ==========
+def bid_placed(order_id: int, bid: dict, bids_count: int, version: int):
+    # After commit: patch this worker's caches and push the bid to listeners
+    order_snapshot.patch(order_id, current_high_bid=bid["amount"], bids_count=bids_count)
+    bid_books.add(order_id, bid)
+    order_events.publish(order_id, {
+        "type": "bid",
+        "order_id": order_id,
+        "version": version,
+        "status": "OPEN",
+        "current_high_bid": bid["amount"],
+        "bids_count": bids_count,
+        "bid": bid,
+    })
+
+async def commit_bids(order_id: int, bids: List[tuple]) -> list:
+    """
+    One transaction for a batch of (amount, bidder_id, bidder_name), in arrival
+    order. Each bid must beat the one accepted before it, exactly as if they
+    had been placed one by one; results are bid dicts or HTTPExceptions.
+    """
+    async with AsyncSessionLocal() as session:
+        # No-op UPDATE: takes the row (SQLite: database) write lock and reads
+        # the state under it, so other workers can't interleave
+        result = await session.execute(
+            update(Order)
+            .where(Order.id == order_id, Order.status == "OPEN", Order.expires_at > datetime.now(timezone.utc))
+            .values(version=Order.version)
+            .returning(Order.min_price, Order.current_high_bid, Order.bids_count, Order.version)
+            .execution_options(synchronize_session=False)
+        )
+        order = result.first()
+        if order is None:
+            await session.rollback()
+            closed = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Order not found or not open for bidding")
+            return [closed] * len(bids)
+        
+        floor = max(order.min_price, order.current_high_bid or 0)
+        accepted = []
+        outcomes = []
+        for amount, bidder_id, bidder_name in bids:
+            if amount > floor:
+                floor = amount
+                outcomes.append(len(accepted))
+                accepted.append((amount, bidder_id, bidder_name))
+            else:
+                outcomes.append(HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Bid amount must be greater than minimum price and current highest bid"
+                ))
+        if not accepted:
+            await session.rollback()
+            return outcomes
+        
+        rows = (await session.execute(
+            insert(Bid).returning(*BID_COLUMNS, sort_by_parameter_order=True),
+            [{"order_id": order_id, "bidder_id": bidder_id, "amount": amount} for amount, bidder_id, _ in accepted]
+        )).all()
+        await session.execute(
+            update(Order)
+            .where(Order.id == order_id)
+            .values(
+                current_high_bid=floor,
+                bids_count=Order.bids_count + len(accepted),
+                version=Order.version + len(accepted)
+            )
+        )
+        # Proxies answer the batch's final high bid
+        auto_bids = await place_proxy_bids(session, order_id, accepted[-1][1], floor)
+        await session.commit()
+    
+    placed = [bid_to_dict(row, bidder_name) for row, (_, _, bidder_name) in zip(rows, accepted)]
+    for i, bid in enumerate(placed + auto_bids, start=1):
+        bid_placed(order_id, bid, (order.bids_count or 0) + i, order.version + i)
+    return [outcome if isinstance(outcome, HTTPException) else placed[outcome] for outcome in outcomes]
+
+bid_pipeline = GroupCommitter(commit_bids, window=BID_GROUP_WINDOW, max_batch=BID_GROUP_MAX)
+
+# ========== RATE LIMITS ==========
+# Token buckets in a file mapped by every worker on the host; checked before
+# any DB work, so a throttled request never reaches the database.
+rate_limit_store = create_bucket_store(RATE_LIMIT_STORE)
+client_ip = ClientIP(TRUSTED_PROXIES)
+
+def token_subject(request) -> str:
+    # Buyer id straight from the JWT (no user lookup); unauthenticated -> IP
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        try:
+            return f"user:{jwt.decode(authorization[7:], SECRET_KEY, algorithms=[ALGORITHM])['sub']}"
+        except (JWTError, KeyError):
+            pass
+    return f"ip:{client_ip(request)}"
+
+bid_rate_limit = RateLimit(rate_limit_store, "bids", RATE_LIMIT_BIDS, key=token_subject)
+login_rate_limit = RateLimit(rate_limit_store, "login", RATE_LIMIT_LOGIN, key=client_ip)
+
+# Failed logins per phone and per IP, with exponential lockout; checked
+# before the user lookup, so a locked-out attempt never costs a hash
+login_throttle = LoginThrottle(
+    create_throttle_store(LOGIN_THROTTLE_STORE),
+    per_phone=LOGIN_FAILURES_PER_PHONE,
+    per_ip=LOGIN_FAILURES_PER_IP,
+    lockout=LOGIN_LOCKOUT,
+    max_lockout=LOGIN_MAX_LOCKOUT
+)
+
 # ========== AUTH UTILITIES ==========
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
+# Hashing costs hundreds of ms of CPU: it runs in a small pool so a login
+# burst queues there instead of stalling every request on the event loop
+password_hasher = PasswordHasher(["sha256_crypt"], workers=PASSWORD_HASH_WORKERS, executor=PASSWORD_HASH_EXECUTOR)
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    return await password_hasher.verify(plain_password, hashed_password)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    return await password_hasher.hash(password)
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -200,9 +765,29 @@ def create_access_token(data: dict):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+# The authenticated user as handlers see it: UserResponse fields, cached by
+# id so a request only queries users on a miss. Call
+# principal_cache.invalidate() after changing any of these fields.
+principal_cache = PrincipalCache(max_entries=PRINCIPAL_CACHE_MAX, ttl=PRINCIPAL_CACHE_TTL)
+
+async def load_principal(user_id: int) -> Optional[UserResponse]:
+    async with AsyncSessionLocal() as session:
+        user = await session.get(User, user_id)
+        return UserResponse.from_orm(user) if user is not None else None
+
+async def user_from_token(token: Optional[str]) -> Optional[UserResponse]:
+    # For push channels, where browsers can't send an Authorization header
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user_id = int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
+        return None
+    return await principal_cache.get(user_id, load_principal)
+
 async def get_current_user(
-    authorization: Optional[str] = Header(None),
-    db: AsyncSession = Depends(get_db)
+    authorization: Optional[str] = Header(None)
 ):
     if not authorization:
         raise HTTPException(
@@ -231,8 +816,8 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        result = await db.execute(select(User).where(User.id == int(user_id)))
-        user = result.scalar_one_or_none()
+        # No session (so no pooled connection) unless the cache misses
+        user = await principal_cache.get(int(user_id), load_principal)
         
         if not user:
             raise HTTPException(
@@ -256,7 +841,7 @@ async def get_current_user(
         )
 
 def require_role(required_role: str):
-    def role_checker(current_user: User = Depends(get_current_user)):
+    def role_checker(current_user: UserResponse = Depends(get_current_user)):
         if current_user.role != required_role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -274,7 +859,12 @@ require_admin = require_role("ADMIN")
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(install_search_index)
+    expiry_scheduler.start()
     yield
+    await bid_pipeline.stop()
+    await expiry_scheduler.stop()
+    password_hasher.shutdown()
     await engine.dispose()
 
 # ========== APP ==========
@@ -282,10 +872,23 @@ app = FastAPI(
     title="KisanSetu API",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+    dependencies=[Depends(key_case)],
     docs_url="/docs",
     redoc_url="/redoc"
 )
 
+# Replays retried POST/PATCH/... that carry an Idempotency-Key (added before
+# CORS so its own 409/422 replies still get CORS headers)
+app.add_middleware(
+    IdempotencyMiddleware,
+    session_factory=AsyncSessionLocal,
+    model=IdempotencyKey,
+    secret_key=SECRET_KEY,
+    algorithm=ALGORITHM,
+    ttl=IDEMPOTENCY_TTL
+)
+
 # Fix CORS for ALL origins including Render
 app.add_middleware(
     CORSMiddleware,
@@ -310,9 +913,27 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "order_snapshot": order_snapshot.stats(),
+        "bid_books": bid_books.stats(),
+        "push": order_events.stats(),
+        "principals": principal_cache.stats(),
+        "password_hashing": password_hasher.stats(),
+        "expiry": expiry_scheduler.stats(),
+        "bid_group_commit": bid_pipeline.stats() if BID_GROUP_COMMIT else None,
+        "rate_limits": {
+            "shared": rate_limit_store.shared,
+            "bids": bid_rate_limit.stats(),
+            "login": login_rate_limit.stats(),
+        },
+        "login_throttle": {"shared": login_throttle.store.shared, **login_throttle.stats()},
+    }
+
 # ========== PUBLIC ENDPOINTS ==========
 @app.post("/register", response_model=Token)
-async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
+async def register(user_data: UserCreate, db: LazySession = Depends(get_lazy_db)):
     # Validate phone number
     if not re.match(r'^\d{10}$', user_data.phone):
         raise HTTPException(
@@ -320,27 +941,27 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
             detail="Phone number must be 10 digits"
         )
     
-    # Check if user exists
-    result = await db.execute(select(User).where(User.phone == user_data.phone))
-    existing_user = result.scalar_one_or_none()
+    # Hash with no connection checked out
+    password_hash = await get_password_hash(user_data.password)
     
-    if existing_user:
+    # Create user: one INSERT ... RETURNING, the unique index on phone
+    # catches duplicates (no check-then-insert race)
+    try:
+        result = await db.execute(
+            insert(User).values(
+                phone=user_data.phone,
+                password_hash=password_hash,
+                name=user_data.name,
+                role=user_data.role,
+                location=user_data.location
+            ).returning(*USER_RESPONSE_COLUMNS)
+        )
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Phone number already registered"
         )
-    
-    # Create user
-    user = User(
-        phone=user_data.phone,
-        password_hash=get_password_hash(user_data.password),
-        name=user_data.name,
-        role=user_data.role,
-        location=user_data.location
-    )
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    user = result.one()
     
     # Create token
     token = create_access_token({"sub": str(user.id), "role": user.role})
@@ -351,16 +972,22 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
         "user": UserResponse.from_orm(user)
     }
 
-@app.post("/login", response_model=Token)
-async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
+@app.post("/login", response_model=Token, dependencies=[Depends(login_rate_limit)])
+async def login(user_data: UserLogin, request: Request, db: LazySession = Depends(get_lazy_db)):
+    ip = client_ip(request)
+    login_throttle.check(user_data.phone, ip)
+    
     result = await db.execute(select(User).where(User.phone == user_data.phone))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(user_data.password, user.password_hash):
+    # The connection is already back in the pool while the password is checked
+    if not user or not await verify_password(user_data.password, user.password_hash):
+        login_throttle.failed(user_data.phone, ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect phone or password"
         )
+    login_throttle.succeeded(user_data.phone)
     
     token = create_access_token({"sub": str(user.id), "role": user.role})
     
@@ -376,13 +1003,62 @@ async def get_all_orders(
     crop: Optional[str] = Query(None),
     min_price: Optional[float] = Query(None),
     location: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, description="Search location, variety and pincode"),
+    near: Optional[str] = Query(None, description="'lat,lng'; returns the nearest `limit` orders by distance"),
+    radius_km: float = Query(50, gt=0, le=MAX_RADIUS_KM),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: int = Query(ORDERS_PAGE_SIZE, ge=1, le=ORDERS_MAX_PAGE_SIZE),
+    stream: bool = Query(False, description="Stream every match as NDJSON, ignoring limit"),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     # This endpoint should be accessible to all authenticated users
-    query = select(Order, User.name).join(User, Order.farmer_id == User.id).where(
-        Order.status == "OPEN",
-        Order.expires_at > datetime.now(timezone.utc)
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    near_point = None
+    if near:
+        try:
+            near_point = parse_near(near)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    streaming = wants_ndjson(accept, stream) and near_point is None
+    
+    def page_response(orders: List[dict], next_cursor: Optional[str]) -> Response:
+        # Polling clients: the tag covers the page and the query that produced
+        # it, so it is the same on every worker and never matches another page
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+        page = FastJSONResponse(orders, headers=headers)
+        etag = content_etag(
+            "orders", page.body, crop, min_price, location and location.strip().lower(),
+            q and q.strip().lower(), cursor, limit, next_cursor
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        page.headers["ETag"] = etag
+        return page
+    
+    if not streaming and near_point is None:
+        page = await order_snapshot.query(
+            load_open_orders,
+            crop=crop,
+            min_price=min_price,
+            location=location,
+            q=q,
+            after=after,
+            limit=limit
+        )
+        if page is not None:
+            return page_response(*page)
+    
+    # Expired orders are moved out of OPEN by the expiry scheduler
+    query = select(*ORDER_COLUMNS, User.name.label("farmer_name")).join(User, Order.farmer_id == User.id).where(
+        Order.status == "OPEN"
     )
     
     if crop:
@@ -390,70 +1066,110 @@ async def get_all_orders(
     if min_price:
         query = query.where(Order.min_price >= min_price)
     if location:
-        query = query.where(Order.location.ilike(f"%{location}%"))
-    
-    query = query.order_by(Order.created_at.desc())
+        query = query.where(text_search(Order, location, engine.dialect.name, columns=("location",)))
+    if q:
+        query = query.where(text_search(Order, q, engine.dialect.name))
+    if near_point:
+        return FastJSONResponse(await nearby_orders(db, query, *near_point, radius_km, limit))
+    if after:
+        query = query.where(tuple_(Order.created_at, Order.id) < tuple_(*after))
+    
+    # Keyset pagination: id breaks ties so pages never overlap or skip rows
+    query = query.order_by(Order.created_at.desc(), Order.id.desc())
+    if streaming:
+        return ndjson_response(AsyncSessionLocal, query, lambda row: order_to_dict(row, row.farmer_name))
+    query = query.limit(limit + 1)
     
     result = await db.execute(query)
-    rows = result.all()
-    
-    orders = []
-    for order, farmer_name in rows:
-        order_dict = OrderResponse.from_orm(order).dict()
-        order_dict["farmer_name"] = farmer_name
-        orders.append(order_dict)
+    rows, next_cursor = split_page(result.all(), limit, lambda row: (row.created_at, row.id))
     
-    return orders
+    return page_response([order_to_dict(row, row.farmer_name) for row in rows], next_cursor)
 
 @app.post("/orders", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(
     order_data: OrderCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_farmer)
+    current_user: UserResponse = Depends(require_farmer)
 ):
     expires_at = datetime.now(timezone.utc) + timedelta(days=7)
     
+    coordinates = order_data.coordinates
     order = Order(
-        **order_data.dict(),
+        **order_data.dict(exclude={"coordinates"}),
         farmer_id=current_user.id,
         expires_at=expires_at
     )
+    if coordinates:
+        order.lat, order.lng = coordinates.lat, coordinates.lng
+        order.geo_cell = geo_cell(coordinates.lat, coordinates.lng)
     db.add(order)
     await db.commit()
     await db.refresh(order)
     
-    order_dict = OrderResponse.from_orm(order).dict()
-    order_dict["farmer_name"] = current_user.name
+    order_dict = order_to_dict(order, current_user.name)
+    order_snapshot.upsert(order_dict)
+    expiry_scheduler.schedule(order.id, order.expires_at)
     
     return order_dict
 
+@app.get("/orders/facets")
+async def get_order_facets(
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    facets = await order_snapshot.facets(load_open_orders)
+    if facets is not None:
+        return facets
+    
+    # Snapshot disabled (too many open orders): one grouped scan instead
+    result = await db.execute(
+        select(Order.crop, Order.min_price, Order.location, func.count())
+        .where(Order.status == "OPEN", Order.expires_at > datetime.now(timezone.utc))
+        .group_by(Order.crop, Order.min_price, Order.location)
+    )
+    total = 0
+    counts = {facet: {} for facet in FACETS}
+    for crop, min_price, location, count in result.all():
+        total += count
+        values = facet_values({"crop": crop, "min_price": min_price, "location": location}, PRICE_BUCKET_SIZE)
+        for facet, value in values.items():
+            if value is not None:
+                counts[facet][value] = counts[facet].get(value, 0) + count
+    return {
+        "total": total,
+        **{facet: dict(sorted(values.items(), key=lambda item: -item[1])) for facet, values in counts.items()}
+    }
+
 @app.get("/orders/my", response_model=List[OrderResponse])
 async def get_my_orders(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     # Allow both farmers and buyers to see their orders
     result = await db.execute(
-        select(Order)
+        select(*ORDER_COLUMNS)
         .where(Order.farmer_id == current_user.id)
         .order_by(Order.created_at.desc())
     )
-    orders = result.scalars().all()
     
-    order_list = []
-    for order in orders:
-        order_dict = OrderResponse.from_orm(order).dict()
-        order_dict["farmer_name"] = current_user.name
-        order_list.append(order_dict)
-    
-    return order_list
+    return FastJSONResponse([order_to_dict(row, current_user.name) for row in result.all()])
 
 @app.get("/orders/{order_id}", response_model=OrderResponse)
 async def get_order_details(
     order_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
+    # Cheap primary-key lookup of the version before paying for the JOIN
+    if if_none_match:
+        result = await db.execute(select(Order.version).where(Order.id == order_id))
+        version = result.scalar_one_or_none()
+        etag = make_etag("order", order_id, version, current_key_case())
+        if version is not None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    
     query = select(Order, User.name).join(User, Order.farmer_id == User.id).where(Order.id == order_id)
     result = await db.execute(query)
     row = result.first()
@@ -464,90 +1180,332 @@ async def get_order_details(
     order, farmer_name = row
     order_dict = OrderResponse.from_orm(order).dict()
     order_dict["farmer_name"] = farmer_name
+    response.headers["ETag"] = make_etag("order", order.id, order.version, current_key_case())
     
     return order_dict
 
 # ========== BID ENDPOINTS ==========
-@app.post("/orders/{order_id}/bids", response_model=BidResponse, status_code=status.HTTP_201_CREATED)
+@app.post(
+    "/orders/{order_id}/bids",
+    response_model=BidResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(bid_rate_limit)]
+)
 async def place_bid(
     order_id: int,
     bid_data: BidCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_buyer)
+    current_user: UserResponse = Depends(require_buyer)
 ):
-    result = await db.execute(select(Order).where(Order.id == order_id))
-    order = result.scalar_one_or_none()
-    
-    if not order or order.status != "OPEN":
+    amount = bid_data.amount
+    # The high bid only ever goes up, so a cached copy (possibly stale) from
+    # the snapshot or the bid book can reject a losing bid without taking the
+    # write lock
+    floor = 0
+    cached = order_snapshot.peek(order_id)
+    if cached is not None:
+        floor = max(cached["min_price"], cached["current_high_bid"] or 0)
+    book = bid_books.peek(order_id)
+    best = book.best() if book is not None else None
+    if best is not None:
+        floor = max(floor, best["amount"])
+    if amount <= floor:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Order not found or not open for bidding"
+            detail="Bid amount must be greater than minimum price and current highest bid"
+        )
+    
+    if BID_GROUP_COMMIT:
+        # Queued with the other bids on this order arriving in the same few ms
+        bid = await bid_pipeline.submit(order_id, (amount, current_user.id, current_user.name))
+        return FastJSONResponse(bid, status_code=status.HTTP_201_CREATED)
+    
+    # Check and raise the high bid in one statement: the row lock taken by the
+    # UPDATE serializes concurrent bidders, and a bid that is no longer higher
+    # simply matches no row instead of overwriting a better one.
+    result = await db.execute(
+        update(Order)
+        .where(
+            Order.id == order_id,
+            Order.status == "OPEN",
+            Order.expires_at > datetime.now(timezone.utc),
+            Order.min_price < amount,
+            func.coalesce(Order.current_high_bid, 0) < amount
+        )
+        .values(
+            current_high_bid=amount,
+            bids_count=Order.bids_count + 1,
+            version=Order.version + 1
         )
+        .returning(Order.bids_count, Order.version)
+        .execution_options(synchronize_session=False)
+    )
+    updated = result.first()
     
-    if bid_data.amount <= order.min_price or bid_data.amount <= order.current_high_bid:
+    if updated is None:
+        await db.rollback()
+        order = (await db.execute(select(Order.status, Order.expires_at).where(Order.id == order_id))).first()
+        if order is None or order.status != "OPEN" or as_utc(order.expires_at) <= datetime.now(timezone.utc):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Order not found or not open for bidding"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bid amount must be greater than minimum price and current highest bid"
         )
     
-    bid = Bid(
-        order_id=order_id,
-        bidder_id=current_user.id,
-        amount=bid_data.amount
+    result = await db.execute(
+        insert(Bid)
+        .values(order_id=order_id, bidder_id=current_user.id, amount=amount)
+        .returning(*BID_COLUMNS)
     )
-    db.add(bid)
-    
-    order.current_high_bid = bid_data.amount
-    order.bids_count += 1
-    
+    bid = bid_to_dict(result.one(), current_user.name)
+    # Standing proxies answer in the same transaction, no client round trips
+    auto_bids = await place_proxy_bids(db, order_id, current_user.id, amount)
     await db.commit()
-    await db.refresh(bid)
+    for i, placed in enumerate([bid, *auto_bids]):
+        bid_placed(order_id, placed, updated.bids_count + i, updated.version + i)
     
-    bid_dict = BidResponse.from_orm(bid).dict()
-    bid_dict["bidder_name"] = current_user.name
+    return FastJSONResponse(bid, status_code=status.HTTP_201_CREATED)
+
+@app.put(
+    "/orders/{order_id}/proxy-bid",
+    response_model=ProxyBidResponse,
+    dependencies=[Depends(bid_rate_limit)]
+)
+async def set_proxy_bid(
+    order_id: int,
+    proxy_data: ProxyBidCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(require_buyer)
+):
+    # Register (or move) the buyer's maximum; the engine then bids for them,
+    # one increment at a time, whenever someone else takes the lead
+    max_amount = proxy_data.max_amount
+    result = await db.execute(
+        update(Order)
+        .where(Order.id == order_id, Order.status == "OPEN", Order.expires_at > datetime.now(timezone.utc))
+        .values(version=Order.version)  # Takes the write lock, like a bid
+        .returning(Order.min_price, Order.current_high_bid, Order.bids_count, Order.version)
+        .execution_options(synchronize_session=False)
+    )
+    order = result.first()
+    if order is None:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Order not found or not open for bidding"
+        )
+    high = max(order.min_price, order.current_high_bid or 0)
+    if max_amount <= high:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Maximum bid must be greater than minimum price and current highest bid"
+        )
+    
+    now = datetime.now(timezone.utc)
+    proxy = await db.get(ProxyBid, (order_id, current_user.id))
+    if proxy is None:
+        db.add(ProxyBid(order_id=order_id, bidder_id=current_user.id, max_amount=max_amount, created_at=now))
+    else:
+        proxy.max_amount, proxy.created_at = max_amount, now
+    await db.flush()
     
-    return bid_dict
+    leader_id = await db.scalar(
+        select(Bid.bidder_id).where(Bid.order_id == order_id).order_by(Bid.amount.desc(), Bid.id.desc()).limit(1)
+    )
+    auto_bids = await place_proxy_bids(db, order_id, leader_id, high)
+    await db.commit()
+    for i, placed in enumerate(auto_bids, start=1):
+        bid_placed(order_id, placed, (order.bids_count or 0) + i, order.version + i)
+    
+    last = auto_bids[-1] if auto_bids else None
+    return FastJSONResponse({
+        "order_id": order_id,
+        "max_amount": max_amount,
+        "leading": (last["bidder_id"] if last else leader_id) == current_user.id,
+        "current_high_bid": last["amount"] if last else float(order.current_high_bid or 0),
+        "bids": auto_bids,
+    })
+
+@app.delete("/orders/{order_id}/proxy-bid", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_proxy_bid(
+    order_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(require_buyer)
+):
+    # Bids already placed by the proxy stand
+    proxy = await db.get(ProxyBid, (order_id, current_user.id))
+    if proxy is None:
+        raise HTTPException(status_code=404, detail="No proxy bid on this order")
+    await db.delete(proxy)
+    await db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @app.get("/orders/{order_id}/bids", response_model=List[BidResponse])
 async def get_order_bids(
     order_id: int,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int = Query(BIDS_PAGE_SIZE, ge=1, le=BIDS_MAX_PAGE_SIZE),
+    summary: bool = Query(False, description="Wrap the page as {bids, summary, next_cursor}"),
+    stream: bool = Query(False),
+    accept: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
-    query = select(Bid, User.name).join(User, Bid.bidder_id == User.id).where(
-        Bid.order_id == order_id
-    ).order_by(Bid.amount.desc())
-    
-    result = await db.execute(query)
-    rows = result.all()
-    
-    bids = []
-    for bid, bidder_name in rows:
-        bid_dict = BidResponse.from_orm(bid).dict()
-        bid_dict["bidder_name"] = bidder_name
-        bids.append(bid_dict)
+    # Highest first, keyset-paged over (amount, id)
+    if wants_ndjson(accept, stream):
+        # Full export, not paged
+        return ndjson_response(AsyncSessionLocal, order_bids_query(order_id), lambda row: bid_to_dict(row, row.bidder_name))
     
-    return bids
+    try:
+        after = decode_amount_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    # Open orders are served from the in-memory bid book, no DB sort
+    rows = None
+    book = await bid_books.get(order_id, lambda: load_bid_book(db, order_id))
+    if book is not None:
+        rows = book.page(after, limit + 1)
+    if rows is None:
+        query = order_bids_query(order_id)
+        if after is not None:
+            query = query.where(tuple_(Bid.amount, Bid.id) < tuple_(*after))
+        result = await db.execute(query.limit(limit + 1))
+        rows = [bid_to_dict(row, row.bidder_name) for row in result.all()]
+    
+    bids, next_cursor = split_page(rows, limit, lambda bid: (bid["amount"], bid["id"]), encode=encode_amount_cursor)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if not summary:
+        return FastJSONResponse(bids, headers=headers)
+    
+    # Count and max come from the book or the order row, never from scanning bids
+    if book is not None:
+        best = book.best()
+        totals = {"count": book.total, "max": best["amount"] if best else None}
+    else:
+        order = (await db.execute(
+            select(Order.bids_count, Order.current_high_bid).where(Order.id == order_id)
+        )).first()
+        if order is None:
+            raise HTTPException(status_code=404, detail="Order not found")
+        totals = {"count": order.bids_count or 0, "max": order.current_high_bid or None}
+    return FastJSONResponse({"bids": bids, "summary": totals, "next_cursor": next_cursor}, headers=headers)
+
+# ========== LIVE UPDATES ==========
+# Push channels replace polling /orders/{id} and /orders/{id}/bids. The first
+# event is the current state; after that "bid" events carry the new bid and
+# "order" events a state change (status, or writes seen from other workers).
+# Every event has the order's version: on a gap, refetch over REST.
+def encode_event(event: dict, camel: bool) -> bytes:
+    return dump_json(camelize(event) if camel else event)
+
+def wants_camel(case: Optional[str]) -> bool:
+    return (case or current_key_case()).strip().lower() == CAMEL
+
+@app.websocket("/ws/orders/{order_id}")
+async def order_updates_ws(
+    websocket: WebSocket,
+    order_id: int,
+    token: Optional[str] = Query(None),
+    case: Optional[str] = Query(None, alias="key_case")
+):
+    user = await user_from_token(token)
+    state = await load_order_state(order_id) if user is not None else None
+    if state is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    camel = wants_camel(case)
+    
+    async with order_events.subscribe(order_id, load_order_state, state["version"]) as queue:
+        async def pump():
+            await websocket.send_text(encode_event({"type": "order", **state}, camel).decode())
+            while True:
+                event = await queue.get()
+                await websocket.send_text(encode_event(event, camel).decode())
+        
+        sender = asyncio.create_task(pump())
+        try:
+            # Nothing is expected from the client; this just notices the disconnect
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            sender.cancel()
 
-@app.get("/bids/my", response_model=List[BidResponse])
+@app.get("/orders/{order_id}/events")
+async def order_updates_sse(
+    order_id: int,
+    token: Optional[str] = Query(None),
+    case: Optional[str] = Query(None, alias="key_case"),
+    authorization: Optional[str] = Header(None)
+):
+    if authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if await user_from_token(token) is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    state = await load_order_state(order_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    camel = wants_camel(case)
+    
+    def frame(event: dict) -> bytes:
+        return b"event: " + event["type"].encode() + b"\ndata: " + encode_event(event, camel) + b"\n\n"
+    
+    async def body():
+        async with order_events.subscribe(order_id, load_order_state, state["version"]) as queue:
+            yield frame({"type": "order", **state})
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), PUSH_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield frame(event)
+    
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/bids/my", response_model=List[MyBidResponse])
 async def get_my_bids(
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int = Query(BIDS_PAGE_SIZE, ge=1, le=BIDS_MAX_PAGE_SIZE),
+    stream: bool = Query(False),
+    accept: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
-    result = await db.execute(
-        select(Bid)
+    # Every bid with its order summary from one JOIN, so the dashboard doesn't
+    # fetch each order separately. Newest first, keyset-paged over id.
+    query = (
+        select(*BID_COLUMNS, *MY_BID_ORDER_COLUMNS)
+        .join(Order, Bid.order_id == Order.id)
         .where(Bid.bidder_id == current_user.id)
-        .order_by(Bid.created_at.desc())
+        .order_by(Bid.id.desc())  # Backward scan of ix_bids_bidder_id
     )
-    bids = result.scalars().all()
+    bidder_name = current_user.name
+    if wants_ndjson(accept, stream):
+        # Full export, not paged
+        return ndjson_response(AsyncSessionLocal, query, lambda row: my_bid_to_dict(row, bidder_name))
     
-    bid_list = []
-    for bid in bids:
-        bid_dict = BidResponse.from_orm(bid).dict()
-        bid_dict["bidder_name"] = current_user.name
-        bid_list.append(bid_dict)
-    
-    return bid_list
+    if cursor:
+        try:
+            query = query.where(Bid.id < decode_id_cursor(cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    result = await db.execute(query.limit(limit + 1))
+    rows, next_cursor = split_page(result.all(), limit, lambda row: (row.id,), encode=encode_id_cursor)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    
+    return FastJSONResponse([my_bid_to_dict(row, bidder_name) for row in rows], headers=headers)
 
 # ========== DEAL ENDPOINTS ==========
 @app.post("/orders/{order_id}/accept-bid", response_model=DealResponse, status_code=status.HTTP_201_CREATED)
@@ -555,7 +1513,7 @@ async def accept_bid(
     order_id: int,
     deal_data: DealCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_farmer)
+    current_user: UserResponse = Depends(require_farmer)
 ):
     result = await db.execute(select(Order).where(Order.id == order_id))
     order = result.scalar_one_or_none()
@@ -588,10 +1546,22 @@ async def accept_bid(
     
     # Update order status
     order.status = "LOCKED"
+    order.version += 1
     
     db.add(deal)
     await db.commit()
     await db.refresh(deal)
+    order_snapshot.remove(order_id)
+    bid_books.evict(order_id)
+    order_events.publish(order_id, {
+        "type": "order",
+        "order_id": order_id,
+        "version": order.version,
+        "status": order.status,
+        "current_high_bid": order.current_high_bid,
+        "bids_count": order.bids_count,
+        "deal_id": deal.id,
+    })
     
     # Get buyer name
     buyer_result = await db.execute(select(User).where(User.id == bid.bidder_id))
@@ -606,39 +1576,25 @@ async def accept_bid(
 @app.get("/deals", response_model=List[DealResponse])
 async def get_deals(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
-    # Get deals where user is either seller or buyer
-    result = await db.execute(select(Deal).where(
+    # Get deals where user is either seller or buyer, names in the same query
+    result = await db.execute(deals_with_names().where(
         (Deal.seller_id == current_user.id) | (Deal.buyer_id == current_user.id)
     ).order_by(Deal.created_at.desc()))
     
-    deals = result.scalars().all()
-    
-    deal_list = []
-    for deal in deals:
-        # Get seller and buyer names
-        seller_result = await db.execute(select(User).where(User.id == deal.seller_id))
-        seller = seller_result.scalar_one()
-        
-        buyer_result = await db.execute(select(User).where(User.id == deal.buyer_id))
-        buyer = buyer_result.scalar_one()
-        
-        deal_dict = DealResponse.from_orm(deal).dict()
-        deal_dict["seller_name"] = seller.name
-        deal_dict["buyer_name"] = buyer.name
-        deal_list.append(deal_dict)
-    
-    return deal_list
+    return FastJSONResponse([
+        deal_to_dict(row, row.seller_name, row.buyer_name) for row in result.all()
+    ])
 
 @app.get("/deals/{deal_id}", response_model=DealResponse)
 async def get_deal_details(
     deal_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
-    result = await db.execute(select(Deal).where(Deal.id == deal_id))
-    deal = result.scalar_one_or_none()
+    result = await db.execute(deals_with_names().where(Deal.id == deal_id))
+    deal = result.first()
     
     if not deal:
         raise HTTPException(status_code=404, detail="Deal not found")
@@ -647,25 +1603,14 @@ async def get_deal_details(
     if current_user.id != deal.seller_id and current_user.id != deal.buyer_id:
         raise HTTPException(status_code=403, detail="Not authorized to view this deal")
     
-    # Get seller and buyer names
-    seller_result = await db.execute(select(User).where(User.id == deal.seller_id))
-    seller = seller_result.scalar_one()
-    
-    buyer_result = await db.execute(select(User).where(User.id == deal.buyer_id))
-    buyer = buyer_result.scalar_one()
-    
-    deal_dict = DealResponse.from_orm(deal).dict()
-    deal_dict["seller_name"] = seller.name
-    deal_dict["buyer_name"] = buyer.name
-    
-    return deal_dict
+    return FastJSONResponse(deal_to_dict(deal, deal.seller_name, deal.buyer_name))
 
 @app.patch("/deals/{deal_id}/status", response_model=DealResponse)
 async def update_deal_status(
     deal_id: int,
     status_data: DealStatusUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     valid_statuses = ["LOCKED", "IN_TRANSIT", "DELIVERED", "CANCELLED"]
     if status_data.status not in valid_statuses:
@@ -695,6 +1640,8 @@ async def update_deal_status(
         buyer.trust_score = min(5.0, buyer.trust_score + 0.1)
     
     await db.commit()
+    if status_data.status == "DELIVERED":
+        principal_cache.invalidate(deal.seller_id, deal.buyer_id)
     await db.refresh(deal)
     
     # Get names for response
@@ -713,10 +1660,16 @@ async def update_deal_status(
 # ========== ADMIN ENDPOINTS ==========
 @app.get("/admin/users", response_model=List[UserResponse])
 async def get_all_users(
+    stream: bool = Query(False),
+    accept: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_admin)
+    current_user: UserResponse = Depends(require_admin)
 ):
-    result = await db.execute(select(User).order_by(User.created_at.desc()))
+    query = select(User).order_by(User.created_at.desc())
+    if wants_ndjson(accept, stream):
+        return ndjson_response(AsyncSessionLocal, query, lambda row: UserResponse.from_orm(row[0]).dict())
+    
+    result = await db.execute(query)
     users = result.scalars().all()
     
     return [UserResponse.from_orm(user) for user in users]
@@ -725,7 +1678,7 @@ async def get_all_users(
 async def verify_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_admin)
+    current_user: UserResponse = Depends(require_admin)
 ):
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
@@ -736,9 +1689,130 @@ async def verify_user(
     user.is_verified = True
     await db.commit()
     await db.refresh(user)
+    principal_cache.invalidate(user_id)
     
     return UserResponse.from_orm(user)
 
+def validation_detail(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors())
+
+def insert_new_users(rows: List[dict]):
+    # INSERT ... ON CONFLICT (phone) DO NOTHING RETURNING: rows whose phone
+    # is taken (e.g. registered since we checked) just don't come back
+    dialect_insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+    return (
+        dialect_insert(User).values(rows)
+        .on_conflict_do_nothing(index_elements=[User.phone])
+        .returning(User.id, User.phone)
+    )
+
+async def onboard_users(db: LazySession, results: List[dict], valid: Dict[str, UserCreate]):
+    """
+    Registers the ``valid`` users (by phone, in request order), filling in
+    their entries in ``results``. Users are hashed and inserted
+    BULK_HASH_BATCH at a time, so each step commits on its own; after each
+    one, the results that became final are yielded, in request order.
+    """
+    pending = {result["phone"]: result for result in results if result["detail"] is None}
+    
+    # Skip phones that are already registered before paying for their hashes
+    phones = list(valid)
+    for start in range(0, len(phones), BULK_INSERT_BATCH):
+        taken = await db.execute(select(User.phone).where(User.phone.in_(phones[start:start + BULK_INSERT_BATCH])))
+        for phone in taken.scalars():
+            del valid[phone]
+            pending[phone]["detail"] = "Phone number already registered"
+    
+    new_users = list(valid.values())
+    done = 0
+    for start in range(0, len(new_users), BULK_HASH_BATCH):
+        batch = new_users[start:start + BULK_HASH_BATCH]
+        # Hashing is most of the work: spread over the pool, between logins
+        password_hashes = await password_hasher.hash_many([user_data.password for user_data in batch])
+        inserted = await db.execute(insert_new_users([
+            {
+                "phone": user_data.phone,
+                "password_hash": password_hash,
+                "name": user_data.name,
+                "role": user_data.role,
+                "location": user_data.location,
+            }
+            for user_data, password_hash in zip(batch, password_hashes)
+        ]))
+        created = {phone: user_id for user_id, phone in inserted}
+        for user_data in batch:
+            result = pending[user_data.phone]
+            if user_data.phone in created:
+                result.update(status="created", id=created[user_data.phone])
+            else:
+                result["detail"] = "Phone number already registered"
+        end = pending[batch[-1].phone]["index"] + 1
+        yield results[done:end]
+        done = end
+    if done < len(results):
+        yield results[done:]
+
+@app.post("/admin/users/bulk", response_model=BulkUsersResponse)
+async def bulk_register_users(
+    payload: BulkUsersCreate,
+    stream: bool = Query(False, description="Stream one NDJSON result per row as each batch commits"),
+    accept: Optional[str] = Header(None),
+    db: LazySession = Depends(get_lazy_db),
+    current_user: UserResponse = Depends(require_admin)
+):
+    """
+    Onboards a whole village at once. Every row gets a result in request
+    order: "created" with its id, or "rejected" with the reason (invalid,
+    repeated in the request, or phone already registered); one bad row
+    doesn't stop the rest.
+    
+    Each password hash takes about half a second of CPU, so a few thousand
+    users take minutes. They are committed BULK_HASH_BATCH at a time, and an
+    NDJSON client (Accept: application/x-ndjson or ?stream=true) gets each
+    batch's results as soon as it commits, which also keeps proxies from
+    timing out the connection.
+    """
+    if len(payload.users) > BULK_REGISTER_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BULK_REGISTER_MAX} users per request"
+        )
+    
+    results: List[dict] = []
+    valid: Dict[str, UserCreate] = {}  # By phone, in request order
+    for index, row in enumerate(payload.users):
+        result = {"index": index, "phone": None, "status": "rejected", "id": None, "detail": None}
+        results.append(result)
+        if not isinstance(row, dict):
+            result["detail"] = "User must be an object"
+            continue
+        if isinstance(row.get("phone"), str):
+            result["phone"] = row["phone"]
+        try:
+            user_data = UserCreate(**row)
+        except ValidationError as exc:
+            result["detail"] = validation_detail(exc)
+            continue
+        result["phone"] = user_data.phone
+        if not re.match(r'^\d{10}$', user_data.phone):
+            result["detail"] = "Phone number must be 10 digits"
+        elif user_data.phone in valid:
+            result["detail"] = "Phone number repeated in this request"
+        else:
+            valid[user_data.phone] = user_data
+    
+    batches = onboard_users(db, results, valid)
+    if wants_ndjson(accept, stream):
+        return ndjson_stream(batches)
+    async for _ in batches:
+        pass
+    created = sum(1 for result in results if result["status"] == "created")
+    return {
+        "created": created,
+        "rejected": len(results) - created,
+        "results": results,
+    }
+
 # ========== MAIN ==========
 if __name__ == "__main__":
     import uvicorn
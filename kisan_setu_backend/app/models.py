@@ -1,8 +1,9 @@
 # app/models.py
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Enum, ForeignKey, CheckConstraint
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Enum, ForeignKey, CheckConstraint, Index, LargeBinary, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum as PyEnum
+from datetime import datetime, timezone
 from app.database import Base
 import enum
 
@@ -27,6 +28,7 @@ class OrderStatus(str, enum.Enum):
     OPEN = "OPEN"
     LOCKED = "LOCKED"
     DELIVERED = "DELIVERED"
+    EXPIRED = "EXPIRED"
 
 class DealStatus(str, enum.Enum):
     LOCKED = "LOCKED"
@@ -72,14 +74,34 @@ class Order(Base):
     bids_count = Column(Integer, default=0)
     location = Column(String, nullable=False)
     pincode = Column(String(6), nullable=False)
+    lat = Column(Float, nullable=True)
+    lng = Column(Float, nullable=True)
+    geo_cell = Column(Integer, nullable=True)  # app.geo grid cell of (lat, lng)
     status = Column(Enum(OrderStatus), default=OrderStatus.OPEN)
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every write, backs the ETag
     expires_at = Column(DateTime(timezone=True), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Python-side default keeps microseconds, so the (created_at, id) cursor is stable
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
     
     # Relationships
     farmer = relationship("User", back_populates="orders", foreign_keys=[farmer_id])
     bids = relationship("Bid", back_populates="order", cascade="all, delete-orphan")
     deal = relationship("Deal", back_populates="order", uselist=False)
+    
+    # Keep in sync with alembic/versions/0001_marketplace_indexes.py
+    __table_args__ = (
+        Index("ix_orders_open_created", "created_at", "id",
+              postgresql_where=text("status = 'OPEN'"), sqlite_where=text("status = 'OPEN'")),
+        Index("ix_orders_open_crop_created", "crop", "created_at", "id",
+              postgresql_where=text("status = 'OPEN'"), sqlite_where=text("status = 'OPEN'")),
+        Index("ix_orders_open_min_price", "min_price",
+              postgresql_where=text("status = 'OPEN'"), sqlite_where=text("status = 'OPEN'")),
+        Index("ix_orders_farmer_created", "farmer_id", "created_at"),
+        Index("ix_orders_open_geo_cell", "geo_cell",
+              postgresql_where=text("status = 'OPEN'"), sqlite_where=text("status = 'OPEN'")),
+        Index("ix_orders_open_expires", "expires_at",
+              postgresql_where=text("status = 'OPEN'"), sqlite_where=text("status = 'OPEN'")),
+    )
 
 class Bid(Base):
     __tablename__ = "bids"
@@ -93,6 +115,12 @@ class Bid(Base):
     # Relationships
     order = relationship("Order", back_populates="bids")
     bidder = relationship("User", back_populates="bids")
+    
+    __table_args__ = (
+        # Covers the (amount, id) DESC keyset scan of one order's bids
+        Index("ix_bids_order_amount_id", "order_id", "amount", "id"),
+        Index("ix_bids_bidder_id", "bidder_id", "id"),  # Keyset pages of GET /bids/my
+    )
 
 class Deal(Base):
     __tablename__ = "deals"
@@ -109,4 +137,38 @@ class Deal(Base):
     # Relationships
     order = relationship("Order", back_populates="deal")
     seller = relationship("User", back_populates="seller_deals", foreign_keys=[seller_id])
-    buyer = relationship("User", back_populates="buyer_deals", foreign_keys=[buyer_id])
\ No newline at end of file
+    buyer = relationship("User", back_populates="buyer_deals", foreign_keys=[buyer_id])
+    
+    __table_args__ = (
+        Index("ix_deals_seller_created", "seller_id", "created_at"),
+        Index("ix_deals_buyer_created", "buyer_id", "created_at"),
+    )
+
+class ProxyBid(Base):
+    __tablename__ = "proxy_bids"
+    
+    # A buyer's standing maximum on an order, see app/proxy_bidding.py
+    order_id = Column(Integer, ForeignKey("orders.id"), primary_key=True)
+    bidder_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    max_amount = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)  # Earlier wins a tie
+    
+    __table_args__ = (
+        Index("ix_proxy_bids_order_max", "order_id", "max_amount"),
+    )
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    
+    # Stored responses for retried mutations, see app/idempotency.py
+    scope = Column(String(64), primary_key=True)  # "user:<id>" or "anon"
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of method, path and body
+    status_code = Column(Integer, nullable=True)  # NULL while the first request is running
+    content_type = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    
+    __table_args__ = (
+        Index("ix_idempotency_keys_created", "created_at"),
+    )
@@ -0,0 +1,319 @@
+# app/order_cache.py
+import asyncio
+import bisect
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.pagination import encode_cursor
+
+SEARCH_FIELDS = ("location", "variety", "pincode")
+FACETS = ("crop", "price_bucket", "state", "district")
+UNKNOWN_LOCATION = "Unknown"
+
+# States and union territories, by lowercase name, for telling "Haryana"
+# (a state) from "Karnal" (a district) in a one-part location
+STATES = {
+    name.lower(): name for name in (
+        "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar", "Chhattisgarh", "Goa", "Gujarat",
+        "Haryana", "Himachal Pradesh", "Jharkhand", "Karnataka", "Kerala", "Madhya Pradesh",
+        "Maharashtra", "Manipur", "Meghalaya", "Mizoram", "Nagaland", "Odisha", "Punjab", "Rajasthan",
+        "Sikkim", "Tamil Nadu", "Telangana", "Tripura", "Uttar Pradesh", "Uttarakhand", "West Bengal",
+        "Andaman and Nicobar Islands", "Chandigarh", "Dadra and Nagar Haveli and Daman and Diu",
+        "Delhi", "Jammu and Kashmir", "Ladakh", "Lakshadweep", "Puducherry",
+    )
+}
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes for timezone=True columns
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def price_bucket(min_price: float, size: int) -> str:
+    low = int(min_price // size) * size
+    return f"{low}-{low + size - 1}"
+
+def location_parts(location: str):
+    """
+    "Karnal, Haryana" -> district "Karnal", state "Haryana". A one-part
+    location (PostOrder fills in just the city or district) is a state if it
+    names one, else a district; the missing part is UNKNOWN_LOCATION, so both
+    facets add up to the number of orders.
+    """
+    parts = [part.strip() for part in (location or "").split(",") if part.strip()]
+    if not parts:
+        return UNKNOWN_LOCATION, UNKNOWN_LOCATION
+    state = STATES.get(parts[-1].lower())
+    if len(parts) == 1:
+        return (UNKNOWN_LOCATION, state) if state else (parts[0], UNKNOWN_LOCATION)
+    return parts[0], state or parts[-1]
+
+def facet_values(order: dict, bucket_size: int) -> dict:
+    district, state = location_parts(order["location"])
+    return {
+        "crop": order["crop"],
+        "price_bucket": price_bucket(order["min_price"], bucket_size),
+        "state": state,
+        "district": district,
+    }
+
+def replay(orders: Dict[int, dict], journal: List[tuple]):
+    for entry in journal:
+        if entry[0] == "upsert":
+            order = entry[1]
+            orders.pop(order["id"], None)
+            if order.get("status", "OPEN") == "OPEN":
+                orders[order["id"]] = order
+        elif entry[0] == "patch":
+            _, order_id, fields = entry
+            if order_id in orders:
+                orders[order_id] = {**orders[order_id], **fields}
+        else:
+            orders.pop(entry[1], None)
+
+class OpenOrderSnapshot:
+    """
+    In-process copy of every OPEN order, already serialized (OrderResponse dict
+    plus farmer_name), kept sorted by (created_at, id) so /orders can be served
+    without touching the database.
+
+    Write handlers patch it through upsert/patch/remove, and every change bumps
+    ``version`` (so does an order expiring, or a reload that finds different
+    rows), which makes it usable as a list ETag. Other workers only see those
+    writes after ``ttl`` seconds, when their own snapshot is rechecked. With
+    a ``probe`` (a cheap query whose result changes whenever the open set
+    does), a recheck runs the probe and only reloads when its marker moved,
+    or once every ``max_age`` seconds for changes the marker can't see; an
+    idle marketplace costs one aggregate query per ``ttl``, not a full scan.
+    Writes that land while a reload is running are journaled and replayed
+    onto the loaded rows, so a bid storm doesn't keep throwing reloads away.
+    Memory is
+    bounded by ``max_orders``: if more orders than that are open, the snapshot
+    stays empty and reads go to the DB.
+
+    Facet counters (crop, price bucket, state, district) are adjusted on the
+    same add/remove paths, so ``facets()`` costs O(#facet values).
+    """
+
+    def __init__(self, max_orders: int = 50000, ttl: float = 5.0, price_bucket_size: int = 500,
+                 probe: Optional[Callable[[], Awaitable[Any]]] = None, max_age: float = 300.0):
+        self.max_orders = max_orders
+        self.ttl = ttl
+        self.price_bucket_size = price_bucket_size
+        self.probe = probe
+        self.max_age = max_age
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.reloads_skipped = 0
+        self._orders: Optional[Dict[int, dict]] = None
+        self._keys: List[Tuple[datetime, int]] = []  # ascending (created_at, id)
+        self._loaded_at = 0.0
+        self._reloaded_at = 0.0  # Last full load; _loaded_at also moves on an unchanged probe
+        self._marker: Any = None
+        self._next_expiry: Optional[datetime] = None
+        self._facets: Dict[str, Counter] = {facet: Counter() for facet in FACETS}
+        self._lock = asyncio.Lock()
+        # Writes seen while a reload is in flight, replayed onto its rows
+        self._journal: Optional[List[tuple]] = None
+
+    # ----- write-through -----
+    def _bump(self):
+        self.version += 1
+
+    def invalidate(self):
+        self._bump()
+        self._orders = None
+        self._marker = None
+        self._keys = []
+        self._facets = {facet: Counter() for facet in FACETS}
+
+    def _count(self, order: dict, delta: int):
+        for facet, value in facet_values(order, self.price_bucket_size).items():
+            if value is None:
+                continue
+            counter = self._facets[facet]
+            counter[value] += delta
+            if counter[value] <= 0:
+                del counter[value]
+
+    def upsert(self, order: dict):
+        self._bump()
+        if self._journal is not None:
+            self._journal.append(("upsert", order))
+        if self._orders is None:
+            return
+        self._discard(order["id"])
+        if order.get("status", "OPEN") != "OPEN":
+            return
+        if len(self._orders) >= self.max_orders:
+            self.invalidate()
+            return
+        self._orders[order["id"]] = order
+        self._count(order, 1)
+        bisect.insort(self._keys, (as_utc(order["created_at"]), order["id"]))
+        expires_at = as_utc(order["expires_at"])
+        if self._next_expiry is None or expires_at < self._next_expiry:
+            self._next_expiry = expires_at
+
+    def patch(self, order_id: int, **fields):
+        self._bump()
+        if self._journal is not None:
+            self._journal.append(("patch", order_id, fields))
+        if self._orders is not None and order_id in self._orders:
+            # Copy so responses already handed out never change underneath
+            old = self._orders[order_id]
+            new = self._orders[order_id] = {**old, **fields}
+            self._count(old, -1)
+            self._count(new, 1)
+
+    def remove(self, order_id: int):
+        self._bump()
+        if self._journal is not None:
+            self._journal.append(("remove", order_id))
+        if self._orders is not None:
+            self._discard(order_id)
+
+    def _discard(self, order_id: int):
+        order = self._orders.pop(order_id, None)
+        if order is not None:
+            self._count(order, -1)
+            key = (as_utc(order["created_at"]), order_id)
+            index = bisect.bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                del self._keys[index]
+
+    def _install(self, orders: Dict[int, dict]):
+        self._orders = orders
+        self._keys = sorted((as_utc(row["created_at"]), order_id) for order_id, row in orders.items())
+        self._next_expiry = min((as_utc(row["expires_at"]) for row in orders.values()), default=None)
+        self._facets = {facet: Counter() for facet in FACETS}
+        for row in orders.values():
+            self._count(row, 1)
+
+    def _drop_expired(self):
+        # Expiry changes the result set without any write, so it must bump the version
+        now = datetime.now(timezone.utc)
+        if self._next_expiry is None or self._next_expiry > now:
+            return
+        self._bump()
+        expired = [order_id for order_id, row in self._orders.items() if as_utc(row["expires_at"]) <= now]
+        for order_id in expired:
+            self._discard(order_id)
+        self._next_expiry = min((as_utc(row["expires_at"]) for row in self._orders.values()), default=None)
+
+    # ----- loading -----
+    def _fresh(self) -> bool:
+        return self._orders is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    async def ensure_loaded(self, loader: Callable[[int], Awaitable[List[dict]]]) -> bool:
+        if self._fresh():
+            self._drop_expired()
+            return True
+        async with self._lock:
+            if self._fresh():
+                self._drop_expired()
+                return True
+            # Taken before the load: a write in between shows up in the rows
+            # and moves the next marker, costing one extra reload at worst
+            marker = await self.probe() if self.probe is not None else None
+            if (marker is not None and marker == self._marker and self._orders is not None
+                    and time.monotonic() - self._reloaded_at < self.max_age):
+                self.reloads_skipped += 1
+                self._loaded_at = time.monotonic()
+                self._drop_expired()
+                return True
+            self._journal = []
+            try:
+                rows = await loader(self.max_orders + 1)
+            finally:
+                journal, self._journal = self._journal, None
+            self.reloads += 1
+            self._loaded_at = self._reloaded_at = time.monotonic()
+            self._marker = marker
+            orders = {row["id"]: row for row in rows}
+            # Writes that landed while loading may predate the rows or not;
+            # replaying them is idempotent either way
+            replay(orders, journal)
+            if len(rows) > self.max_orders or len(orders) > self.max_orders:
+                self.invalidate()
+                return False
+            if orders != self._orders:
+                # Only a real change (e.g. a write on another worker) moves the version
+                self._bump()
+                self._install(orders)
+            # Replayed writes, or rows that expired since the loader's query
+            self._drop_expired()
+            return True
+
+    # ----- reads -----
+    def peek(self, order_id: int) -> Optional[dict]:
+        """The cached order as last seen, without loading or counting a hit."""
+        if self._orders is None:
+            return None
+        return self._orders.get(order_id)
+
+    async def query(
+        self,
+        loader: Callable[[int], Awaitable[List[dict]]],
+        crop: Optional[str] = None,
+        min_price: Optional[float] = None,
+        location: Optional[str] = None,
+        q: Optional[str] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = 50,
+    ) -> Optional[Tuple[List[dict], Optional[str]]]:
+        """Same semantics as the SQL in get_all_orders; None means "ask the DB"."""
+        if not await self.ensure_loaded(loader):
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        now = datetime.now(timezone.utc)
+        location = location.strip().lower() if location else None
+        q = q.strip().lower() if q else None
+        end = len(self._keys)
+        if after is not None:
+            end = bisect.bisect_left(self._keys, (as_utc(after[0]), after[1]))
+
+        page = []
+        for index in range(end - 1, -1, -1):
+            order = self._orders[self._keys[index][1]]
+            if as_utc(order["expires_at"]) <= now:
+                continue
+            if crop and order["crop"] != crop:
+                continue
+            if min_price and order["min_price"] < min_price:
+                continue
+            if location and location not in order["location"].lower():
+                continue
+            if q and not any(q in order[field].lower() for field in SEARCH_FIELDS):
+                continue
+            if len(page) == limit:
+                last = page[-1]
+                return page, encode_cursor(last["created_at"], last["id"])
+            page.append(order)
+        return page, None
+
+    async def facets(self, loader: Callable[[int], Awaitable[List[dict]]]) -> Optional[dict]:
+        if not await self.ensure_loaded(loader):
+            return None
+        return {
+            "total": len(self._orders),
+            **{facet: dict(counter.most_common()) for facet, counter in self._facets.items()},
+        }
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "loaded": self._orders is not None,
+            "orders": len(self._orders) if self._orders is not None else 0,
+            "max_orders": self.max_orders,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "reloads": self.reloads,
+            "reloads_skipped": self.reloads_skipped,
+        }
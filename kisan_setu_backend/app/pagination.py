@@ -0,0 +1,51 @@
+# app/pagination.py
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+# Keyset cursors are an opaque "<created_at iso>|<id>" pair, urlsafe-base64 encoded.
+# The next page is everything strictly after that (created_at, id) in DESC order,
+# so fetching page N costs the same index range scan as page 1.
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+# Bid lists page over (amount, id) DESC instead
+def encode_amount_cursor(amount: float, row_id: int) -> str:
+    raw = f"{amount!r}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_amount_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        amount, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return float(amount), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+# A user's own bids page over id DESC (ids grow with created_at, no ties)
+def encode_id_cursor(row_id: int) -> str:
+    return base64.urlsafe_b64encode(str(row_id).encode()).decode().rstrip("=")
+
+def decode_id_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def split_page(rows: list, limit: int, key, encode=encode_cursor) -> Tuple[list, Optional[str]]:
+    # Callers fetch limit + 1 rows; the extra row only tells us a next page exists
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode(*key(rows[-1]))
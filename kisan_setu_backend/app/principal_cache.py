@@ -0,0 +1,62 @@
+# app/principal_cache.py
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+# Loads the principal for a user id from the DB; None when the user is gone
+PrincipalLoader = Callable[[int], Awaitable[Optional[Any]]]
+
+class PrincipalCache:
+    """
+    Authenticated users by id, so auth on a hot path (bids, polls) is a JWT
+    decode plus a dict lookup instead of a users query.
+
+    An LRU of at most ``max_entries`` principals, each trusted for ``ttl``
+    seconds. Handlers that change a cached field (verification, trust score,
+    blocking, KYC) call invalidate() so this worker sees it at once; other
+    workers pick it up when their entry expires, so keep ``ttl`` short.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, Tuple[float, Any]]" = OrderedDict()
+        # Bumped per user on invalidate, so a load that raced it isn't stored
+        self._generations: "dict[int, int]" = {}
+
+    async def get(self, user_id: int, loader: PrincipalLoader) -> Optional[Any]:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            loaded_at, principal = entry
+            if time.monotonic() - loaded_at < self.ttl:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return principal
+            del self._entries[user_id]
+        self.misses += 1
+
+        generation = self._generations.get(user_id, 0)
+        principal = await loader(user_id)
+        if principal is not None and self._generations.get(user_id, 0) == generation:
+            self._entries[user_id] = (time.monotonic(), principal)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, *user_ids: int):
+        for user_id in user_ids:
+            self._entries.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
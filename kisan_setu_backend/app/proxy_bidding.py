@@ -0,0 +1,46 @@
+# app/proxy_bidding.py
+from typing import List, NamedTuple, Optional
+
+class Proxy(NamedTuple):
+    bidder_id: int
+    max_amount: float
+    bidder_name: Optional[str] = None
+
+class AutoBid(NamedTuple):
+    bidder_id: int
+    amount: float
+    bidder_name: Optional[str] = None
+
+def resolve_proxy_bids(leader_id: Optional[int], high: float, proxies: List[Proxy], increment: float) -> List[AutoBid]:
+    """
+    Bids the proxies place after ``leader_id`` took the lead at ``high``,
+    in the order they must be inserted.
+
+    ``proxies`` are the strongest standing maximums above ``high``, highest
+    first, earlier registration first on a tie; only the top two matter. The
+    strongest proxy (W) ends up leading at one increment over the runner-up
+    (R's maximum, or ``high`` without one), capped at its own maximum. R bids
+    its maximum first so the history shows what W had to beat. The many
+    outbid-by-a-little rounds of two people refreshing the page collapse into
+    at most two bids.
+
+    Amounts are strictly increasing, and an earlier proxy beats a later one
+    with the same maximum.
+    """
+    if not proxies:
+        return []
+    winner = proxies[0]
+    runner_up = next((proxy for proxy in proxies[1:] if proxy.bidder_id != winner.bidder_id), None)
+    if runner_up is None and winner.bidder_id == leader_id:
+        return []  # Already leading, nobody to answer
+
+    bids = []
+    floor = high
+    if runner_up is not None and runner_up.max_amount < winner.max_amount:
+        bids.append(AutoBid(*runner_up))
+        floor = runner_up.max_amount
+    opposition = runner_up.max_amount if runner_up is not None else high
+    amount = round(min(winner.max_amount, opposition + increment), 2)
+    if amount > floor:
+        bids.append(AutoBid(winner.bidder_id, amount, winner.bidder_name))
+    return bids
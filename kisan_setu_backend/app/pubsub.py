@@ -0,0 +1,95 @@
+# app/pubsub.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Loader for the shared per-order watcher: current order state (must include
+# "version"), or None when the order is gone.
+StateLoader = Callable[[int], Awaitable[Optional[dict]]]
+
+class OrderEvents:
+    """
+    In-process pub/sub for per-order push channels (WebSocket / SSE).
+
+    Every connection gets its own bounded queue. publish() never waits: when a
+    consumer is too slow and its queue is full, the oldest event is dropped so
+    the connection always ends with the latest state. Events carry the order's
+    ``version``, so a client that sees a gap just refetches.
+
+    Writes on other workers are not published here. For those, while an order
+    has subscribers on this worker, one shared watcher polls the order's
+    state every ``poll_interval`` seconds and publishes when the version moves.
+    That is one primary-key lookup per order per worker, however many clients
+    are listening.
+    """
+
+    def __init__(self, queue_size: int = 16, poll_interval: float = 2.0):
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.delivered = 0
+        self.dropped = 0
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._versions: Dict[int, int] = {}
+        self._watchers: Dict[int, asyncio.Task] = {}
+
+    def connections(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, order_id: int, event: dict):
+        if order_id not in self._subscribers:
+            return
+        version = event.get("version")
+        if version is not None:
+            if version <= self._versions.get(order_id, -1):
+                return
+            self._versions[order_id] = version
+        for queue in self._subscribers.get(order_id, ()):
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+            self.delivered += 1
+
+    @asynccontextmanager
+    async def subscribe(self, order_id: int, loader: Optional[StateLoader] = None, version: Optional[int] = None):
+        """``version`` is the state the caller already sent; older events are skipped."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(order_id, set()).add(queue)
+        if version is not None and version > self._versions.get(order_id, -1):
+            self._versions[order_id] = version
+        if loader is not None and order_id not in self._watchers:
+            self._watchers[order_id] = asyncio.create_task(self._watch(order_id, loader))
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(order_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[order_id]
+                    self._versions.pop(order_id, None)
+                    watcher = self._watchers.pop(order_id, None)
+                    if watcher is not None:
+                        watcher.cancel()
+
+    async def _watch(self, order_id: int, loader: StateLoader):
+        while order_id in self._subscribers:
+            try:
+                state = await loader(order_id)
+            except Exception:
+                logger.exception("Order watcher failed for order %s", order_id)
+                state = None
+            if state is not None:
+                self.publish(order_id, {"type": "order", **state})
+            await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections(),
+            "orders": len(self._subscribers),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
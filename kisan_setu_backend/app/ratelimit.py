@@ -0,0 +1,188 @@
+# app/ratelimit.py
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+try:
+    import fcntl
+except ImportError:  # Windows: no shared store, buckets are per worker
+    fcntl = None
+
+# key hash, tokens left, last refill (time.monotonic(), which is system-wide)
+SLOT = struct.Struct("<Qdd")
+DEFAULT_SLOTS = 65536
+
+# Gets a key's stored values (None if it has none) and returns (values to
+# store, None to clear the key; result for the caller)
+SlotUpdate = Callable[[Optional[tuple]], Tuple[Optional[tuple], Any]]
+
+def parse_rate(value: str) -> Optional[Tuple[int, float]]:
+    """"10/60" -> 10 requests per 60 seconds; "off" or "0" -> no limit."""
+    value = value.strip().lower()
+    if value in ("", "0", "off"):
+        return None
+    requests, _, seconds = value.partition("/")
+    return int(requests), float(seconds or 1)
+
+def refill(tokens: float, updated: float, now: float, rate: float, capacity: float, cost: float) -> Tuple[float, float]:
+    """Token bucket step: (tokens left, seconds to wait; 0 when the request is allowed)."""
+    tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / rate
+
+class LocalBucketStore:
+    """Buckets in a dict: per process only, for tests and platforms without fcntl."""
+
+    shared = False
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens, wait = refill(tokens, updated, now, rate, capacity, cost)
+        self._buckets[key] = (tokens, now)
+        return wait
+
+class SharedSlots:
+    """
+    Per-key records in a memory-mapped file that every worker on the host
+    opens, so state kept in it holds however uvicorn spreads the requests.
+    The file is a fixed table of ``slots`` records (``record``'s first field
+    is the key hash) indexed by a hash of the key; each update() locks just
+    its own record (fcntl record lock), reads it, writes it back. That is two
+    syscalls and no I/O: a few microseconds.
+
+    Two keys that land in the same slot evict each other, and the newcomer
+    starts from nothing. With the default 64k slots that is rare enough for
+    counters that only ever make a limit more lenient when they are lost.
+    """
+
+    def __init__(self, path: str, record: struct.Struct, slots: int = DEFAULT_SLOTS):
+        self.path = path
+        self.record = record
+        self.slots = slots
+        size = slots * record.size
+        self._empty = record.unpack(bytes(record.size))  # Key hash 0: a free slot
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+
+    def update(self, key: str, fn: SlotUpdate):
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+        offset = (digest % self.slots) * self.record.size
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, self.record.size, offset)
+        try:
+            stored, *values = self.record.unpack_from(self._map, offset)
+            values, result = fn(tuple(values) if stored == digest else None)
+            if values is not None:
+                self.record.pack_into(self._map, offset, digest, *values)
+            elif stored == digest:  # Clear only our own record, not a colliding key's
+                self.record.pack_into(self._map, offset, *self._empty)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, self.record.size, offset)
+        return result
+
+class SharedBucketStore:
+    """
+    Buckets in SharedSlots, so a limit holds across all workers on the host.
+    An evicted bucket comes back full.
+    """
+
+    shared = True
+
+    def __init__(self, path: str, slots: int = DEFAULT_SLOTS):
+        self.path = path
+        self._slots = SharedSlots(path, SLOT, slots)
+
+    def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+
+        def step(values):
+            tokens, updated = values if values is not None else (capacity, now)
+            if updated > now:  # A file left over from before a reboot
+                tokens, updated = capacity, now
+            tokens, wait = refill(tokens, updated, now, rate, capacity, cost)
+            return (tokens, now), wait
+
+        return self._slots.update(key, step)
+
+def default_store_path(name: str = "kisansetu-ratelimit") -> str:
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, name)
+
+def create_bucket_store(path: Optional[str] = None):
+    """Shared store at ``path`` (default: /dev/shm); "memory" means per-worker buckets."""
+    if path == "memory" or fcntl is None:
+        return LocalBucketStore()
+    return SharedBucketStore(path or default_store_path())
+
+class ClientIP:
+    """
+    Key function giving the client address behind ``trusted_proxies`` reverse
+    proxies (0, the default, when clients connect directly; 1 behind the
+    Render/nginx proxy). Only raise it when the app can't be reached except
+    through those proxies, or clients can pick their own key.
+
+    Each proxy appends the address it saw to X-Forwarded-For, so the client
+    is the hop ``trusted_proxies`` from the right; anything to its left came
+    from the client and is ignored, since a made-up first hop would otherwise
+    get a fresh rate limit and login throttle on every request. Without the
+    header (or with fewer hops than proxies), the socket peer is used.
+    """
+
+    def __init__(self, trusted_proxies: int = 0):
+        self.trusted_proxies = trusted_proxies
+
+    def __call__(self, request: Request) -> str:
+        forwarded = request.headers.get("x-forwarded-for")
+        if self.trusted_proxies and forwarded:
+            hops = [hop.strip() for hop in forwarded.split(",")]
+            if len(hops) >= self.trusted_proxies and hops[-self.trusted_proxies]:
+                return hops[-self.trusted_proxies]
+        return request.client.host if request.client else "unknown"
+
+class RateLimit:
+    """
+    Route dependency enforcing ``limit`` ("requests/seconds") per principal.
+
+    ``key`` maps the request to the principal (buyer id, client IP, ...). It
+    runs before the route's other dependencies touch the DB, so a rejected
+    request costs one bucket update. Over the limit -> 429 with Retry-After.
+    """
+
+    def __init__(self, store, scope: str, limit: str, key: Callable[[Request], str]):
+        self.store = store
+        self.scope = scope
+        self.limit = limit
+        self.key = key
+        parsed = parse_rate(limit)
+        self.capacity, self.rate = (parsed[0], parsed[0] / parsed[1]) if parsed else (0, 0.0)
+        self.allowed = 0
+        self.limited = 0
+
+    async def __call__(self, request: Request):
+        if not self.rate:
+            return
+        wait = self.store.take(f"{self.scope}:{self.key(request)}", self.rate, self.capacity)
+        if wait:
+            self.limited += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, slow down",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+        self.allowed += 1
+
+    def stats(self) -> dict:
+        return {"limit": self.limit if self.rate else "off", "allowed": self.allowed, "limited": self.limited}
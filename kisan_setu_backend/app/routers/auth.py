@@ -1,31 +1,32 @@
 # app/routers/auth.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from datetime import timedelta
 from typing import Optional
-from app.database import get_db
+from app.database import get_lazy_db
+from app.sessions import LazySession
 from app import schemas, crud
 from app.auth import verify_password, create_access_token
 from app.config import settings
+from app.dependencies import client_ip, login_rate_limit, login_throttle
 
 router = APIRouter(tags=["authentication"])
 
 @router.post("/register", response_model=schemas.Token)
 async def register(
     user_data: schemas.UserCreate,
-    db: AsyncSession = Depends(get_db)
+    db: LazySession = Depends(get_lazy_db)
 ):
-    # Check if user already exists
-    existing_user = await crud.get_user_by_phone(db, user_data.phone)
-    if existing_user:
+    # Create user; the unique index on phone rejects duplicates
+    try:
+        user = await crud.create_user(db, user_data)
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Phone number already registered"
         )
     
-    # Create user
-    user = await crud.create_user(db, user_data)
-    
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -35,18 +36,23 @@ async def register(
     
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.post("/login", response_model=schemas.Token)
+@router.post("/login", response_model=schemas.Token, dependencies=[Depends(login_rate_limit)])
 async def login(
     login_data: schemas.UserLogin,  # Changed from OAuth2PasswordRequestForm
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    db: LazySession = Depends(get_lazy_db)
 ):
+    ip = client_ip(request)
+    login_throttle.check(login_data.phone, ip)
     user = await crud.get_user_by_phone(db, login_data.phone)
-    if not user or not verify_password(login_data.password, user.password_hash):
+    if not user or not await verify_password(login_data.password, user.password_hash):
+        login_throttle.failed(login_data.phone, ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect phone or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    login_throttle.succeeded(login_data.phone)
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -1,15 +1,21 @@
 # app/routers/bids.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Union
 from app.database import get_db
-from app.dependencies import get_current_user, require_buyer
+from app.dependencies import bid_rate_limit, get_current_user, require_buyer
 from app import schemas, crud
 from app.schemas import TokenData
 from app.config import settings
 
 router = APIRouter(tags=["bids"])
 
-@router.post("/orders/{order_id}/bids", response_model=schemas.BidResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/orders/{order_id}/bids",
+    response_model=schemas.BidResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(bid_rate_limit)]
+)
 async def place_bid(
     order_id: int,
     bid_data: schemas.BidCreate,
@@ -30,19 +36,48 @@ async def place_bid(
             detail="Internal server error"
         )
 
-@router.get("/orders/{order_id}/bids", response_model=List[schemas.BidResponse])
+@router.get("/orders/{order_id}/bids", response_model=Union[List[schemas.BidResponse], schemas.BidPage])
 async def get_order_bids(
     order_id: int,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: int = Query(settings.BIDS_PAGE_SIZE, ge=1, le=settings.BIDS_MAX_PAGE_SIZE),
+    summary: bool = Query(False, description="Wrap the page as {bids, summary, next_cursor}"),
     db: AsyncSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user)
 ):
-    bids = await crud.get_order_bids(db, order_id)
-    return bids if bids else []
+    try:
+        bids, next_cursor = await crud.get_order_bids(db, order_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if not summary:
+        return bids if bids else []
+    
+    totals = await crud.get_order_bid_summary(db, order_id)
+    if totals is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return {"bids": bids, "summary": totals, "next_cursor": next_cursor}
 
-@router.get("/bids/my", response_model=List[schemas.BidResponse])
+@router.get("/bids/my", response_model=List[schemas.MyBidResponse])
 async def get_my_bids(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: int = Query(settings.BIDS_PAGE_SIZE, ge=1, le=settings.BIDS_MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db),
     current_user: TokenData = Depends(require_buyer)
 ):
-    bids = await crud.get_user_bids(db, current_user.user_id)
+    try:
+        bids, next_cursor = await crud.get_user_bids(db, current_user.user_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return bids if bids else []
\ No newline at end of file
@@ -1,5 +1,5 @@
 # app/routers/orders.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from app.database import get_db
@@ -12,18 +12,33 @@ router = APIRouter(tags=["orders"])
 
 @router.get("/", response_model=List[schemas.OrderResponse])
 async def get_all_orders(
+    response: Response,
     crop: Optional[str] = Query(None, description="Filter by crop type"),
     min_price: Optional[float] = Query(None, description="Minimum price filter"),
     location: Optional[str] = Query(None, description="Location filter"),
+    q: Optional[str] = Query(None, description="Search location, variety and pincode"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: int = Query(settings.ORDERS_PAGE_SIZE, ge=1, le=settings.ORDERS_MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user)
 ):
-    orders = await crud.get_orders(
-        db,
-        crop=crop,
-        min_price=min_price,
-        location=location
-    )
+    try:
+        orders, next_cursor = await crud.get_orders(
+            db,
+            crop=crop,
+            min_price=min_price,
+            location=location,
+            q=q,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return orders if orders else []
 
 @router.post("/", response_model=schemas.OrderResponse, status_code=status.HTTP_201_CREATED)
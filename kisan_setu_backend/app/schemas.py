@@ -4,6 +4,8 @@ from datetime import datetime
 from typing import Optional, List
 from enum import Enum
 
+from app.casing import register_camel_aliases
+
 # Enums for schemas
 class UserRole(str, Enum):
     FARMER = "FARMER"
@@ -25,6 +27,7 @@ class OrderStatus(str, Enum):
     OPEN = "OPEN"
     LOCKED = "LOCKED"
     DELIVERED = "DELIVERED"
+    EXPIRED = "EXPIRED"
 
 class DealStatus(str, Enum):
     LOCKED = "LOCKED"
@@ -105,6 +108,36 @@ class BidResponse(BidBase):
     class Config:
         from_attributes = True
 
+class BidSummary(BaseModel):
+    count: int
+    max: Optional[float] = None
+
+class BidPage(BaseModel):
+    bids: List[BidResponse]
+    summary: BidSummary
+    next_cursor: Optional[str] = None
+
+class OrderSummary(BaseModel):
+    id: int
+    crop: str
+    variety: str
+    quantity: float
+    quantity_unit: str
+    location: str
+    min_price: float
+    status: OrderStatus
+    current_high_bid: Optional[float] = None
+    bids_count: int = 0
+    expires_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class MyBidResponse(BidResponse):
+    # One row of GET /bids/my: the bid plus enough of its order for the dashboard
+    order: OrderSummary
+    is_winning: bool
+
 # Deal schemas
 class DealBase(BaseModel):
     status: Optional[DealStatus] = None
@@ -130,4 +163,7 @@ class DealStatusUpdate(BaseModel):
 
 # Admin schemas
 class UserVerify(BaseModel):
-    is_verified: bool = True
\ No newline at end of file
+    is_verified: bool = True
+
+# camelCase keys for clients that send X-Key-Case: camel
+register_camel_aliases(UserResponse, Token, OrderResponse, BidResponse, BidPage, OrderSummary, MyBidResponse, DealResponse)
@@ -0,0 +1,87 @@
+# app/search.py
+import logging
+from typing import Sequence
+
+from sqlalchemy import Integer, bindparam, or_, text
+
+logger = logging.getLogger(__name__)
+
+SEARCH_COLUMNS = ("location", "variety", "pincode")
+MIN_TERM_LENGTH = 3  # Trigram indexes cannot answer shorter terms
+
+# SQLite: external-content FTS5 table with the trigram tokenizer, so MATCH gives
+# the same case-insensitive substring semantics as ILIKE '%x%'. Triggers keep it
+# in sync; the update trigger only fires when a searchable column changes, so
+# bids (current_high_bid / bids_count updates) never touch the index.
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS orders_fts USING fts5(
+        location, variety, pincode,
+        content='orders', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS orders_fts_ai AFTER INSERT ON orders BEGIN
+        INSERT INTO orders_fts(rowid, location, variety, pincode)
+        VALUES (new.id, new.location, new.variety, new.pincode);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS orders_fts_ad AFTER DELETE ON orders BEGIN
+        INSERT INTO orders_fts(orders_fts, rowid, location, variety, pincode)
+        VALUES ('delete', old.id, old.location, old.variety, old.pincode);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS orders_fts_au AFTER UPDATE OF location, variety, pincode ON orders BEGIN
+        INSERT INTO orders_fts(orders_fts, rowid, location, variety, pincode)
+        VALUES ('delete', old.id, old.location, old.variety, old.pincode);
+        INSERT INTO orders_fts(rowid, location, variety, pincode)
+        VALUES (new.id, new.location, new.variety, new.pincode);
+    END""",
+]
+SQLITE_REBUILD = "INSERT INTO orders_fts(orders_fts) VALUES ('rebuild')"
+
+# Postgres: trigram GIN indexes make the plain ILIKE '%x%' predicate indexable
+# and are maintained by the database itself.
+POSTGRES_DDL = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX IF NOT EXISTS ix_orders_{column}_trgm ON orders USING gin ({column} gin_trgm_ops)"
+    for column in SEARCH_COLUMNS
+]
+
+_index_ready = False
+
+def install_search_index(sync_conn) -> bool:
+    """Create the search index for this dialect. Run via ``conn.run_sync`` after create_all."""
+    global _index_ready
+    dialect = sync_conn.dialect.name
+    try:
+        if dialect == "sqlite":
+            exists = sync_conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE name = 'orders_fts'"
+            ).first()
+            for statement in SQLITE_DDL:
+                sync_conn.exec_driver_sql(statement)
+            if not exists:
+                # Backfill rows written before the index existed
+                sync_conn.exec_driver_sql(SQLITE_REBUILD)
+        elif dialect == "postgresql":
+            with sync_conn.begin_nested():
+                for statement in POSTGRES_DDL:
+                    sync_conn.exec_driver_sql(statement)
+        else:
+            return False
+    except Exception as e:
+        logger.warning("Search index unavailable on %s, falling back to ILIKE: %s", dialect, e)
+        _index_ready = False
+        return False
+    _index_ready = True
+    return True
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+def text_search(model, term: str, dialect: str, columns: Sequence[str] = SEARCH_COLUMNS):
+    """WHERE clause matching ``term`` as a substring of any of ``columns``."""
+    term = term.strip()
+    if _index_ready and dialect == "sqlite" and len(term) >= MIN_TERM_LENGTH:
+        match = "{" + " ".join(columns) + "} : " + _fts_phrase(term)
+        matching_ids = text(
+            "SELECT rowid FROM orders_fts WHERE orders_fts MATCH :fts_match"
+        ).bindparams(bindparam("fts_match", match, unique=True)).columns(rowid=Integer)
+        return model.id.in_(matching_ids)
+    # Postgres serves this from the trigram indexes; short terms scan either way
+    return or_(*(getattr(model, column).ilike(f"%{term}%") for column in columns))
@@ -0,0 +1,30 @@
+# app/serialization.py
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from app.casing import CAMEL, KEY_CASE_HEADER, camelize, current_key_case
+
+def dump_json(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+class FastJSONResponse(JSONResponse):
+    """
+    orjson-encoded response. Hot list routes return this directly with plain
+    dicts built straight from result rows, which skips FastAPI's second pass
+    through response_model (validate + jsonable_encoder) entirely.
+
+    OPT_UTC_Z renders UTC datetimes as "...Z", the same as Pydantic, so both
+    paths produce identical JSON. Keys are renamed to camelCase here when the
+    request asked for it (see app.casing).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.headers.add_vary_header(KEY_CASE_HEADER)
+
+    def render(self, content: Any) -> bytes:
+        if current_key_case() == CAMEL:
+            content = camelize(content)
+        return dump_json(content)
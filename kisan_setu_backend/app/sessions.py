@@ -0,0 +1,40 @@
+# app/sessions.py
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+class LazySession:
+    """
+    Per-request stand-in for the get_db session, for handlers that do
+    CPU-bound work (password hashing, JWT signing) between queries.
+
+    get_db's session keeps its pooled connection from the first query until
+    the dependency is torn down, after the response is sent. Through a
+    LazySession, each execute()/get() checks a connection out, runs one
+    statement in its own transaction and hands the connection back, so it
+    is never held while the handler computes. Results come back buffered and
+    ORM objects detached (with their loaded attributes; the factory must not
+    expire on commit).
+
+    Statements that have to commit together go in ``async with
+    db.transaction() as session:``, which is one connection for the block.
+    Reads look like an AsyncSession, so crud helpers that only call
+    ``db.execute`` accept either.
+    """
+
+    def __init__(self, factory: async_sessionmaker):
+        self.factory = factory
+
+    async def execute(self, statement, *args, **kwargs):
+        async with self.factory.begin() as session:
+            return await session.execute(statement, *args, **kwargs)
+
+    async def get(self, entity, ident) -> Any:
+        async with self.factory() as session:
+            return await session.get(entity, ident)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncSession]:
+        async with self.factory.begin() as session:
+            yield session
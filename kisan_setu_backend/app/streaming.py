@@ -0,0 +1,44 @@
+# app/streaming.py
+from typing import Any, AsyncIterator, Callable, List, Optional
+
+from fastapi.responses import StreamingResponse
+
+from app.casing import CAMEL, KEY_CASE_HEADER, camelize, current_key_case
+from app.serialization import dump_json
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500  # Rows fetched from the cursor and flushed per chunk
+
+def wants_ndjson(accept: Optional[str], stream: bool = False) -> bool:
+    return stream or (accept is not None and NDJSON_MEDIA_TYPE in accept)
+
+def ndjson_stream(batches: AsyncIterator[List[dict]]) -> StreamingResponse:
+    """
+    Stream the dicts from ``batches`` as newline-delimited JSON, one object
+    per line, flushing after each batch. Lines are encoded with dump_json, so
+    each object is byte-for-byte what the JSON response would hold.
+    """
+    # The key case is read now: the body runs after the handler has returned
+    camel = current_key_case() == CAMEL
+
+    async def body():
+        async for batch in batches:
+            yield b"".join(dump_json(camelize(row) if camel else row) + b"\n" for row in batch)
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE, headers={"Vary": KEY_CASE_HEADER})
+
+def ndjson_response(session_factory, statement, to_dict: Callable[[Any], dict]) -> StreamingResponse:
+    """
+    Stream ``statement`` as newline-delimited JSON, one object per row.
+
+    The generator opens its own session: the request's get_db session may be
+    closed before the body is sent, and a server-side cursor keeps only one
+    batch of rows in memory at a time.
+    """
+    async def batches():
+        async with session_factory() as session:
+            result = await session.stream(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+            async for rows in result.partitions():
+                yield [to_dict(row) for row in rows]
+
+    return ndjson_stream(batches())
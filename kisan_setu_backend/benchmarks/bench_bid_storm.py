@@ -0,0 +1,111 @@
+# benchmarks/bench_bid_storm.py
+#
+# Fires a storm of simultaneous bids at one order through the ASGI app and
+# checks the bidding invariants afterwards:
+#   * every 201 has a bid row, and orders.bids_count equals the number of rows
+#   * orders.current_high_bid is the highest bid stored
+#   * accepted bids are strictly increasing in insertion order
+#   * the highest amount attempted was accepted
+#
+#   python -m benchmarks.bench_bid_storm
+#   BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_bid_storm
+#
+# BENCH_BIDS (default 500) bids are sent at once by BENCH_BUYERS (default 25) buyers.
+# Without BENCH_DATABASE_URL a throwaway SQLite file is used. BENCH_WARM=0 skips
+# the initial GET /orders, so losing bids can't be rejected from the snapshot
+# and every bid goes through the conditional UPDATE. The per-buyer bid rate
+# limit is off unless RATE_LIMIT_BIDS is set. BENCH_GROUP_COMMIT=1 runs the
+# same storm through the per-order group-commit pipeline (BID_GROUP_COMMIT).
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL") or (
+    "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_bids.db")
+)
+os.environ.setdefault("RATE_LIMIT_BIDS", "off")
+if os.getenv("BENCH_GROUP_COMMIT") == "1":
+    os.environ["BID_GROUP_COMMIT"] = "1"
+
+import httpx
+from sqlalchemy import select
+
+from app.main_fixed_v4 import (
+    AsyncSessionLocal, Base, Bid, Order, User, app, create_access_token, engine, get_password_hash,
+)
+
+N_BIDS = int(os.getenv("BENCH_BIDS", "500"))
+N_BUYERS = int(os.getenv("BENCH_BUYERS", "25"))
+WARM_SNAPSHOT = os.getenv("BENCH_WARM", "1") != "0"
+MIN_PRICE = 2000.0
+
+async def seed():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    password_hash = await get_password_hash("bench")
+    async with AsyncSessionLocal() as session:
+        farmer = User(phone="9000000000", password_hash=password_hash, name="Farmer", role="FARMER", location="Karnal")
+        buyers = [
+            User(phone=f"8{i:09d}", password_hash=password_hash, name=f"Buyer {i}", role="BUYER", location="Delhi")
+            for i in range(N_BUYERS)
+        ]
+        session.add_all([farmer, *buyers])
+        await session.flush()
+        order = Order(
+            farmer_id=farmer.id, crop="Rice", variety="Basmati 1121", quantity=100, quantity_unit="quintal",
+            min_price=MIN_PRICE, location="Karnal, Haryana", pincode="132001",
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        )
+        session.add(order)
+        await session.commit()
+        tokens = [create_access_token({"sub": str(buyer.id), "role": "BUYER"}) for buyer in buyers]
+        return order.id, tokens
+
+async def main():
+    order_id, tokens = await seed()
+    amounts = [MIN_PRICE + step for step in random.sample(range(1, N_BIDS * 10), N_BIDS)]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def bid(i: int, amount: float):
+            headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+            response = await client.post(f"/orders/{order_id}/bids", json={"amount": amount}, headers=headers)
+            return response.status_code
+
+        if WARM_SNAPSHOT:
+            await client.get("/orders", headers={"Authorization": f"Bearer {tokens[0]}"})
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(bid(i, amount) for i, amount in enumerate(amounts)))
+        elapsed = time.perf_counter() - started
+
+    async with AsyncSessionLocal() as session:
+        order = await session.get(Order, order_id)
+        stored = (await session.execute(
+            select(Bid.amount).where(Bid.order_id == order_id).order_by(Bid.id)
+        )).scalars().all()
+    await engine.dispose()
+
+    codes = Counter(statuses)
+    print(f"{N_BIDS} bids in {elapsed:.2f}s -> {N_BIDS / elapsed:.0f} req/s  {dict(codes)}")
+    print(f"accepted={len(stored)} bids_count={order.bids_count} current_high_bid={order.current_high_bid}")
+
+    checks = {
+        "only 201/400 responses": set(codes) <= {201, 400},
+        "201 count == bid rows": codes[201] == len(stored),
+        "bids_count == bid rows": order.bids_count == len(stored),
+        "current_high_bid == max bid": order.current_high_bid == max(stored, default=0),
+        "accepted bids strictly increasing": all(a < b for a, b in zip(stored, stored[1:])),
+        "highest attempt accepted": max(amounts) in stored,
+    }
+    for name, ok in checks.items():
+        print(f"  [{'ok' if ok else 'FAIL'}] {name}")
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+# benchmarks/bench_login_burst.py
+#
+# Fires a burst of simultaneous logins through the ASGI app while a probe
+# calls GET /health on a fixed schedule, and reports how late its responses
+# were (the probe stands in for every other request on the worker: bids,
+# polls, SSE). Runs the burst twice: hashing inline on the event loop as
+# before, then through the password hashing pool.
+#
+#   python -m benchmarks.bench_login_burst
+#   PASSWORD_HASH_WORKERS=4 python -m benchmarks.bench_login_burst
+#
+# BENCH_LOGINS (default 20) logins are sent at once; the probe fires every
+# BENCH_PROBE_INTERVAL seconds (default 0.01). The login rate limit is off
+# unless RATE_LIMIT_LOGIN is set. A throwaway SQLite file is used.
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_logins.db")
+os.environ.setdefault("RATE_LIMIT_LOGIN", "off")
+
+import httpx
+
+from app import main_fixed_v4
+from app.hashing import _context
+from app.main_fixed_v4 import AsyncSessionLocal, Base, User, app, engine, get_password_hash, password_hasher
+
+N_LOGINS = int(os.getenv("BENCH_LOGINS", "20"))
+PROBE_INTERVAL = float(os.getenv("BENCH_PROBE_INTERVAL", "0.01"))
+PASSWORD = "bench-password"
+
+class InlineHasher:
+    """The old behaviour: passlib called straight from the coroutine."""
+
+    def __init__(self, schemes):
+        self.schemes = tuple(schemes)
+
+    async def hash(self, password):
+        return _context(self.schemes).hash(password)
+
+    async def verify(self, password, hashed):
+        return _context(self.schemes).verify(password, hashed)
+
+async def seed():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    password_hash = await get_password_hash(PASSWORD)
+    async with AsyncSessionLocal() as session:
+        session.add_all([
+            User(phone=f"7{i:09d}", password_hash=password_hash, name=f"User {i}", role="BUYER", location="Pune")
+            for i in range(N_LOGINS)
+        ])
+        await session.commit()
+
+async def burst(client: httpx.AsyncClient, label: str):
+    probe_ms = []
+    done = asyncio.Event()
+
+    async def probe():
+        # Timed from when each probe was due, so a stalled loop counts against
+        # the probes that should have run during the stall
+        due = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            await client.get("/health")
+            probe_ms.append((time.perf_counter() - due) * 1000)
+            due += PROBE_INTERVAL
+
+    async def login(i: int):
+        response = await client.post("/login", json={"phone": f"7{i:09d}", "password": PASSWORD})
+        return response.status_code
+
+    prober = asyncio.create_task(probe())
+    started = time.perf_counter()
+    statuses = await asyncio.gather(*(login(i) for i in range(N_LOGINS)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await prober
+
+    probe_ms.sort()
+    p99 = probe_ms[min(len(probe_ms) - 1, int(len(probe_ms) * 0.99))]
+    print(f"{label:<8} {N_LOGINS} logins in {elapsed:.2f}s  statuses={sorted(set(statuses))}")
+    print(f"         /health during burst: n={len(probe_ms)} p50={statistics.median(probe_ms):.1f}ms "
+          f"p99={p99:.1f}ms max={probe_ms[-1]:.1f}ms")
+    return set(statuses) == {200}
+
+async def main():
+    await seed()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        main_fixed_v4.password_hasher = InlineHasher(password_hasher.schemes)
+        inline_ok = await burst(client, "inline")
+        main_fixed_v4.password_hasher = password_hasher
+        pool_ok = await burst(client, "pool")
+    print(f"         pool ({password_hasher.executor} x{password_hasher.workers}): {password_hasher.stats()}")
+    password_hasher.shutdown()
+    await engine.dispose()
+    if not (inline_ok and pool_ok):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
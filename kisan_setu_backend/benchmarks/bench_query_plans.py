@@ -0,0 +1,162 @@
+# benchmarks/bench_query_plans.py
+#
+# Captures query plans and timings for the hot marketplace queries with and
+# without the indexes from alembic/versions/0001_marketplace_indexes.py.
+#
+#   python -m benchmarks.bench_query_plans                 # SQLite only
+#   BENCH_POSTGRES_URL=postgresql+asyncpg://... python -m benchmarks.bench_query_plans
+#
+# BENCH_ORDERS controls the seeded row count (default 20000).
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.main_fixed_v4 import Base, User, Order, Bid, Deal
+
+N_ORDERS = int(os.getenv("BENCH_ORDERS", "20000"))
+CROPS = ["Dhan (Paddy)", "Rice", "Wheat", "Maize"]
+STATUSES = ["OPEN"] * 6 + ["LOCKED", "DELIVERED", "EXPIRED"]
+
+NEW_INDEXES = {
+    "ix_orders_open_created", "ix_orders_open_crop_created", "ix_orders_open_min_price",
+    "ix_orders_farmer_created", "ix_bids_order_amount_id", "ix_bids_bidder_id",
+    "ix_deals_seller_created", "ix_deals_buyer_created", "ix_orders_open_expires",
+}
+
+# Same shape as the statements the v4 handlers emit (expired orders are
+# moved out of OPEN by the expiry scheduler, so reads filter on status only)
+QUERIES = {
+    "marketplace": (
+        "SELECT orders.*, users.name FROM orders JOIN users ON orders.farmer_id = users.id "
+        "WHERE orders.status = :status "
+        "ORDER BY orders.created_at DESC, orders.id DESC LIMIT 51"
+    ),
+    "marketplace_crop": (
+        "SELECT orders.*, users.name FROM orders JOIN users ON orders.farmer_id = users.id "
+        "WHERE orders.status = :status AND orders.crop = :crop "
+        "ORDER BY orders.created_at DESC, orders.id DESC LIMIT 51"
+    ),
+    "marketplace_min_price": (
+        "SELECT orders.*, users.name FROM orders JOIN users ON orders.farmer_id = users.id "
+        "WHERE orders.status = :status AND orders.min_price >= :min_price "
+        "ORDER BY orders.created_at DESC, orders.id DESC LIMIT 51"
+    ),
+    "expiry_due": (
+        "SELECT id, expires_at FROM orders WHERE status = :status AND expires_at <= :soon "
+        "ORDER BY expires_at LIMIT 10000"
+    ),
+    "order_bids": "SELECT * FROM bids WHERE order_id = :order_id ORDER BY amount DESC, id DESC LIMIT 21",
+    "my_bids": (
+        "SELECT bids.*, orders.crop, orders.variety, orders.status, orders.current_high_bid "
+        "FROM bids JOIN orders ON bids.order_id = orders.id "
+        "WHERE bids.bidder_id = :user_id ORDER BY bids.id DESC LIMIT 21"
+    ),
+    "my_deals": (
+        "SELECT * FROM deals WHERE seller_id = :user_id OR buyer_id = :user_id "
+        "ORDER BY created_at DESC"
+    ),
+}
+
+def query_params():
+    return {
+        "status": "OPEN",
+        "soon": datetime.now(timezone.utc) + timedelta(minutes=10),
+        "crop": "Wheat",
+        "min_price": 4800.0,
+        "order_id": N_ORDERS // 2,
+        "user_id": 7,
+    }
+
+async def seed(conn):
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    n_users = max(50, N_ORDERS // 100)
+    await conn.execute(insert(User), [
+        dict(id=i, phone=f"9{i:09d}", password_hash="x", name=f"User {i}",
+             role="FARMER" if i % 2 else "BUYER", location="Karnal")
+        for i in range(1, n_users + 1)
+    ])
+    orders = []
+    for i in range(1, N_ORDERS + 1):
+        created = now - timedelta(minutes=N_ORDERS - i)
+        expires_at = created + timedelta(days=rng.choice([-1, 7]))
+        status = rng.choice(STATUSES)
+        if status == "OPEN" and expires_at <= now:
+            status = "EXPIRED"
+        orders.append(dict(
+            id=i, farmer_id=rng.randrange(1, n_users, 2), crop=rng.choice(CROPS),
+            variety="Pusa 1121", quantity=50, quantity_unit="quintal",
+            min_price=rng.uniform(2000, 5000), current_high_bid=0, bids_count=0,
+            location="Karnal, Haryana", pincode="132001", status=status,
+            expires_at=expires_at, created_at=created,
+        ))
+    await conn.execute(insert(Order), orders)
+    await conn.execute(insert(Bid), [
+        dict(order_id=rng.randrange(1, N_ORDERS), bidder_id=rng.randrange(2, n_users, 2),
+             amount=rng.uniform(2000, 6000), created_at=now)
+        for _ in range(N_ORDERS * 3)
+    ])
+    await conn.execute(insert(Deal), [
+        dict(order_id=i, seller_id=rng.randrange(1, n_users, 2), buyer_id=rng.randrange(2, n_users, 2),
+             final_price=4000, total_amount=200000, status="LOCKED", created_at=now)
+        for i in range(1, N_ORDERS // 10)
+    ])
+
+async def explain(conn, sql, params):
+    if conn.dialect.name == "sqlite":
+        rows = (await conn.execute(text("EXPLAIN QUERY PLAN " + sql), params)).all()
+        return [row[-1] for row in rows]
+    rows = (await conn.execute(text("EXPLAIN ANALYZE " + sql), params)).all()
+    return [row[0] for row in rows]
+
+async def timed(conn, sql, params, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        (await conn.execute(text(sql), params)).all()
+    return (time.perf_counter() - start) / repeat * 1000
+
+async def report(conn, label):
+    print(f"\n--- {label} ---")
+    params = query_params()
+    for name, sql in QUERIES.items():
+        plan = await explain(conn, sql, params)
+        ms = await timed(conn, sql, params)
+        print(f"{name:<24}{ms:8.2f} ms")
+        for line in plan:
+            print(f"    {line}")
+
+async def run(url):
+    engine = create_async_engine(url)
+    indexes = [ix for table in Base.metadata.sorted_tables for ix in table.indexes if ix.name in NEW_INDEXES]
+    print(f"\n===== {engine.dialect.name}: {N_ORDERS} orders =====")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        for ix in indexes:
+            await conn.run_sync(lambda sync_conn, ix=ix: ix.drop(sync_conn))
+        await seed(conn)
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+        await report(conn, "before (primary keys only)")
+        for ix in indexes:
+            await conn.run_sync(lambda sync_conn, ix=ix: ix.create(sync_conn))
+        await conn.execute(text("ANALYZE"))
+        await report(conn, "after 0001_marketplace_indexes")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        await run(f"sqlite+aiosqlite:///{tmp}/bench.db")
+    if os.getenv("BENCH_POSTGRES_URL"):
+        await run(os.environ["BENCH_POSTGRES_URL"])
+
+if __name__ == "__main__":
+    asyncio.run(main())
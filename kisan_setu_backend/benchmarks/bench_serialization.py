@@ -0,0 +1,71 @@
+# benchmarks/bench_serialization.py
+#
+# Compares the old list serialization path (from_orm().dict() per row, then
+# FastAPI re-validating the list against response_model and jsonable_encoder
+# walking it before JSONResponse) with the single pass the v4 handlers use now
+# (order_to_dict per row straight into FastJSONResponse).
+#
+#   python -m benchmarks.bench_serialization
+#
+# BENCH_SIZES overrides the row counts (default "1000,10000,100000").
+import asyncio
+import os
+import time
+import warnings
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.main_fixed_v4 import Order, OrderResponse, order_to_dict
+from app.serialization import FastJSONResponse
+
+SIZES = [int(size) for size in os.getenv("BENCH_SIZES", "1000,10000,100000").split(",")]
+ORDER_LIST_FIELD = create_response_field(name="bench_orders", type_=List[OrderResponse])
+
+def make_orders(count: int) -> List[Order]:
+    now = datetime.now(timezone.utc)
+    return [
+        Order(
+            id=i, farmer_id=i % 500, crop="Rice", variety=f"Basmati {i % 40}", quantity=10 + i % 90,
+            quantity_unit="quintal", moisture=12.5, min_price=2000 + i % 3000, current_high_bid=0.0,
+            bids_count=0, location="Karnal, Haryana", pincode="132001", lat=29.68, lng=76.99,
+            status="OPEN", expires_at=now + timedelta(hours=48), created_at=now - timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+async def old_path(orders: List[Order]) -> bytes:
+    rows = []
+    for order in orders:
+        order_dict = OrderResponse.from_orm(order).dict()
+        order_dict["farmer_name"] = "Farmer"
+        rows.append(order_dict)
+    content = await serialize_response(field=ORDER_LIST_FIELD, response_content=rows)
+    return JSONResponse(content).body
+
+async def new_path(orders: List[Order]) -> bytes:
+    return FastJSONResponse([order_to_dict(order, "Farmer") for order in orders]).body
+
+async def timed(path, orders, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await path(orders)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+async def main():
+    warnings.simplefilter("ignore", DeprecationWarning)  # from_orm on Pydantic 2
+    print(f"{'rows':>8} {'old ms':>10} {'new ms':>10} {'speedup':>8}")
+    for size in SIZES:
+        orders = make_orders(size)
+        repeat = 5 if size <= 10000 else 2
+        old = await timed(old_path, orders, repeat)
+        new = await timed(new_path, orders, repeat)
+        print(f"{size:>8} {old * 1000:>10.1f} {new * 1000:>10.1f} {old / new:>7.1f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,8 @@
+# tests/conftest.py
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Manual smoke scripts against a running server (python tests/test_backend.py)
+collect_ignore = ["test_backend.py", "test.py", "test-simple.py"]
@@ -0,0 +1,30 @@
+# tests/test_etag.py
+from app.etag import content_etag, etag_matches, make_etag, not_modified
+
+def test_make_etag_is_weak():
+    assert make_etag("order", 5, 3, "snake") == 'W/"order-5-3-snake"'
+
+def test_etag_matches_weakly():
+    etag = make_etag("order", 5, 3)
+    assert etag_matches(etag, etag)
+    assert etag_matches('"order-5-3"', etag)
+    assert etag_matches('W/"other", W/"order-5-3"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches(make_etag("order", 5, 4), etag)
+
+def test_content_etag_covers_body_and_query():
+    body = b'[{"id":1}]'
+    tag = content_etag("orders", body, "Wheat", 2, None)
+    # Same data and query -> same tag on any worker
+    assert tag == content_etag("orders", body, "Wheat", 2, None)
+    # A different page size or filter with the same rows must not 304
+    assert tag != content_etag("orders", body, "Wheat", 3, None)
+    assert tag != content_etag("orders", body, "Rice", 2, None)
+    assert tag != content_etag("orders", b'[{"id":2}]', "Wheat", 2, None)
+
+def test_not_modified():
+    response = not_modified('W/"x"')
+    assert response.status_code == 304
+    assert response.headers["etag"] == 'W/"x"'
+    assert response.body == b""
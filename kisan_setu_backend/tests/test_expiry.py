@@ -0,0 +1,54 @@
+# tests/test_expiry.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.expiry import ExpiryScheduler
+
+class FakeOrders:
+    def __init__(self, due):
+        self.due = due  # (order id, expires_at)
+        self.expired_batches = []
+
+    async def load_due(self, until, limit):
+        return sorted([row for row in self.due if row[1] <= until], key=lambda row: row[1])[:limit]
+
+    async def expire(self, order_ids):
+        self.expired_batches.append(order_ids)
+        return len(order_ids)
+
+def test_tick_expires_due_orders_in_batches():
+    now = datetime.now(timezone.utc)
+    orders = FakeOrders([(i, now - timedelta(seconds=i)) for i in range(1, 6)] + [(99, now + timedelta(hours=1))])
+    scheduler = ExpiryScheduler(orders.load_due, orders.expire, horizon=600, batch_size=2)
+
+    asyncio.run(scheduler.tick())
+    # Soonest first, at most batch_size per UPDATE; the far-off order isn't loaded
+    assert orders.expired_batches == [[5, 4], [3, 2], [1]]
+    assert scheduler.stats()["expired"] == 5 and scheduler.stats()["batches"] == 3
+    assert scheduler.stats()["pending"] == 0
+
+def test_schedule_keeps_near_orders_and_skips_far_ones():
+    now = datetime.now(timezone.utc)
+    orders = FakeOrders([])
+    scheduler = ExpiryScheduler(orders.load_due, orders.expire, horizon=600)
+    scheduler.schedule(1, now + timedelta(seconds=30))
+    scheduler.schedule(1, now + timedelta(seconds=30))  # Already scheduled
+    scheduler.schedule(2, now + timedelta(hours=2))
+    assert scheduler.stats()["pending"] == 1
+
+    scheduler.schedule(3, now - timedelta(seconds=1))
+    asyncio.run(scheduler.tick())
+    assert orders.expired_batches == [[3]]
+    assert scheduler.stats()["pending"] == 1
+
+def test_full_page_of_overdue_orders_refills_right_away():
+    now = datetime.now(timezone.utc)
+    orders = FakeOrders([(i, now - timedelta(minutes=1)) for i in range(5)])
+    scheduler = ExpiryScheduler(orders.load_due, orders.expire, refill_interval=60, max_pending=3)
+
+    asyncio.run(scheduler.tick())
+    assert scheduler._next_refill == 0.0  # A backlog: come back at once
+    orders.due = orders.due[3:]
+    asyncio.run(scheduler.tick())
+    assert sum(len(batch) for batch in orders.expired_batches) == 5
+    assert scheduler._next_refill > 0.0
@@ -0,0 +1,58 @@
+# tests/test_group_commit.py
+import asyncio
+
+import pytest
+
+from app.group_commit import GroupCommitter
+
+async def double(key, items):
+    await asyncio.sleep(0.01)
+    return [item * 2 for item in items]
+
+def test_concurrent_submits_share_a_batch_and_get_their_own_results():
+    committer = GroupCommitter(double, window=0.01)
+
+    async def run():
+        return await asyncio.gather(*(committer.submit("order-1", i) for i in range(5)))
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8]
+    assert committer.stats()["batches"] == 1 and committer.stats()["largest_batch"] == 5
+
+def test_failed_item_raises_for_its_caller_only():
+    async def commit(key, items):
+        return [ValueError("too low") if item < 0 else item for item in items]
+
+    committer = GroupCommitter(commit, window=0.01)
+
+    async def run():
+        return await asyncio.gather(committer.submit(1, 5), committer.submit(1, -1), return_exceptions=True)
+
+    ok, failed = asyncio.run(run())
+    assert ok == 5 and isinstance(failed, ValueError)
+
+def test_stop_waits_for_running_drains():
+    committer = GroupCommitter(double, window=0.01)
+
+    async def run():
+        callers = [asyncio.create_task(committer.submit(i % 2, i)) for i in range(4)]
+        await asyncio.sleep(0)
+        await committer.stop()
+        assert all(caller.done() for caller in callers)
+        return [caller.result() for caller in callers]
+
+    assert asyncio.run(run()) == [0, 2, 4, 6]
+
+def test_cancelled_drain_cancels_its_callers_and_frees_the_key():
+    committer = GroupCommitter(double, window=0.05)
+
+    async def run():
+        caller = asyncio.create_task(committer.submit("k", 1))
+        await asyncio.sleep(0.01)
+        for drain in list(committer._drains):
+            drain.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        assert not committer._queues and not committer._drains
+        return await committer.submit("k", 2)
+
+    assert asyncio.run(run()) == 4
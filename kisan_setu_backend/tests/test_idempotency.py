@@ -0,0 +1,160 @@
+# tests/test_idempotency.py
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.idempotency import CLAIM_ATTEMPTS, CLAIM_RACED, IdempotencyMiddleware
+
+Base = declarative_base()
+
+class IdempotencyKey(Base):
+    # Same columns as main_fixed_v4.IdempotencyKey
+    __tablename__ = "idempotency_keys"
+    scope = Column(String(64), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+class CountingApp:
+    """Answers every request with 201 and how many times it ran."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        await receive()
+        body = json.dumps({"call": self.calls}).encode()
+        await send({"type": "http.response.start", "status": 201, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": body})
+
+async def request(app, body=b"{}", key="k1", path="/orders"):
+    scope = {
+        "type": "http", "method": "POST", "path": path,
+        "headers": [(b"idempotency-key", key.encode())] if key else [],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start = messages[0]
+    headers = dict(start.get("headers", []))
+    return start["status"], headers, b"".join(m.get("body", b"") for m in messages[1:])
+
+def with_middleware(test):
+    """Runs ``test(middleware, inner_app, session_factory)`` against a throwaway SQLite file."""
+    async def run():
+        path = os.path.join(tempfile.mkdtemp(), "idempotency.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        inner = CountingApp()
+        middleware = IdempotencyMiddleware(
+            inner, session_factory=session_factory, model=IdempotencyKey, secret_key="test", algorithm="HS256"
+        )
+        try:
+            await test(middleware, inner, session_factory)
+        finally:
+            await engine.dispose()
+    asyncio.run(run())
+
+def test_retry_replays_the_stored_response():
+    async def test(middleware, inner, _):
+        first = await request(middleware)
+        retry = await request(middleware)
+        assert first[0] == retry[0] == 201
+        assert retry[2] == first[2] and inner.calls == 1
+        assert retry[1][b"idempotent-replayed"] == b"true"
+        # Without a key every request runs
+        await request(middleware, key="")
+        assert inner.calls == 2
+    with_middleware(test)
+
+def test_same_key_for_a_different_request_is_422():
+    async def test(middleware, inner, _):
+        await request(middleware, body=b'{"amount": 1}')
+        status, _, _ = await request(middleware, body=b'{"amount": 2}')
+        assert status == 422 and inner.calls == 1
+    with_middleware(test)
+
+def test_retry_while_the_first_is_running_is_409():
+    async def test(middleware, inner, session_factory):
+        # A claim row without a status: the first request hasn't finished
+        fingerprint = hashlib.sha256(b"POST /orders\n{}").hexdigest()
+        assert await middleware._claim("anon", "k1", fingerprint) is None
+        status, _, _ = await request(middleware)
+        assert status == 409 and inner.calls == 0
+    with_middleware(test)
+
+def test_claim_retries_when_the_competing_claim_is_released():
+    async def test(middleware, inner, session_factory):
+        # The other request's claim lands between our SELECT and INSERT, then
+        # is released before we re-read it: we must claim again, not run unclaimed
+        races = []
+
+        class RacingSession:
+            def __init__(self):
+                self.session = session_factory()
+
+            async def __aenter__(self):
+                await self.session.__aenter__()
+                return self
+
+            async def __aexit__(self, *exc):
+                return await self.session.__aexit__(*exc)
+
+            async def get(self, model, ident):
+                stored = await self.session.get(model, ident)
+                if not races:
+                    races.append(ident)
+                    async with session_factory.begin() as other:
+                        other.add(model(scope=ident[0], key=ident[1], fingerprint="x", created_at=_now()))
+                return stored
+
+            async def rollback(self):
+                await self.session.rollback()
+                async with session_factory.begin() as other:
+                    await other.execute(delete(IdempotencyKey))
+
+            def __getattr__(self, name):
+                return getattr(self.session, name)
+
+        middleware.session_factory = RacingSession
+        status, _, _ = await request(middleware)
+        assert races and status == 201 and inner.calls == 1
+        middleware.session_factory = session_factory
+        stored = await middleware._claim("anon", "k1", "other")
+        assert stored is not None and stored.status_code == 201
+    with_middleware(test)
+
+def test_key_that_keeps_changing_hands_is_409():
+    async def test(middleware, inner, _):
+        attempts = []
+
+        async def always_raced(owner, key, fingerprint):
+            attempts.append(key)
+            return CLAIM_RACED
+
+        middleware._try_claim = always_raced
+        status, _, _ = await request(middleware)
+        assert status == 409 and inner.calls == 0 and len(attempts) == CLAIM_ATTEMPTS
+    with_middleware(test)
+
+def _now():
+    return datetime.now(timezone.utc)
@@ -0,0 +1,77 @@
+# tests/test_login_throttle.py
+import pytest
+from fastapi import HTTPException
+
+from app import login_throttle as module
+from app.login_throttle import LocalThrottleStore, LoginThrottle, record_failure
+
+def test_failures_below_the_limit_do_not_lock():
+    state = None
+    for _ in range(4):
+        state = record_failure(state, 10.0, limit=5, window=60, lockout=60, max_lockout=3600)
+    assert state[3] == 0.0 and state[2] == 4
+
+def test_reaching_the_limit_locks_out_and_doubles():
+    state = None
+    for _ in range(5):
+        state = record_failure(state, 10.0, limit=5, window=60, lockout=60, max_lockout=3600)
+    assert state[3] == 70.0 and state[4] == 1
+    for _ in range(5):
+        state = record_failure(state, 80.0, limit=5, window=60, lockout=60, max_lockout=3600)
+    assert state[3] == 80.0 + 120 and state[4] == 2
+
+def test_lockout_is_capped_and_forgotten_after_a_clean_stretch():
+    state = (0.0, 0.0, 0.0, 100.0, 10.0)  # Ten lockouts in a row, the last ending at 100
+    state = record_failure(state, 100.0, limit=1, window=60, lockout=60, max_lockout=3600)
+    assert state[3] == 100.0 + 3600
+    # max_lockout after the lockout ended, the streak starts over
+    later = state[3] + 3600
+    state = record_failure(state, later, limit=1, window=60, lockout=60, max_lockout=3600)
+    assert state[3] == later + 60 and state[4] == 1
+
+def test_previous_window_counts_in_proportion():
+    # 4 failures in the last window, 30s into this one: half of them still count
+    state = (0.0, 0.0, 4.0, 0.0, 0.0)
+    state = record_failure(state, 90.0, limit=4, window=60, lockout=60, max_lockout=3600)
+    assert state[1] == 4.0 and state[2] == 1.0 and state[3] == 0.0
+    state = record_failure(state, 90.0, limit=4, window=60, lockout=60, max_lockout=3600)
+    assert state[3] == 150.0
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: now[0])
+    return now
+
+def test_phone_lockout_and_retry_after(clock):
+    throttle = LoginThrottle(LocalThrottleStore(), per_phone="3/900", per_ip="100/900", lockout=60)
+    for _ in range(3):
+        throttle.check("9876543210", "1.2.3.4")
+        throttle.failed("9876543210", "1.2.3.4")
+    with pytest.raises(HTTPException) as rejected:
+        throttle.check("9876543210", "1.2.3.4")
+    assert rejected.value.status_code == 429
+    assert rejected.value.headers["Retry-After"] == "60"
+    # Another phone from the same IP is fine
+    throttle.check("9876543211", "1.2.3.4")
+    clock[0] += 61
+    throttle.check("9876543210", "1.2.3.4")
+    assert throttle.stats()["phone"] == {"limit": "3/900", "rejected": 1, "lockouts": 1}
+
+def test_success_clears_the_phone_but_not_the_ip(clock):
+    throttle = LoginThrottle(LocalThrottleStore(), per_phone="3/900", per_ip="5/900", lockout=60)
+    for _ in range(2):
+        throttle.failed("9876543210", "1.2.3.4")
+    throttle.succeeded("9876543210")
+    for _ in range(2):
+        throttle.failed("9876543210", "1.2.3.4")
+    throttle.check("9876543210", "1.2.3.4")  # Phone count restarted at 0
+    throttle.failed("9876543299", "1.2.3.4")
+    with pytest.raises(HTTPException):
+        throttle.check("9876543298", "1.2.3.4")  # But the IP saw 5 failures
+
+def test_off_disables_a_scope(clock):
+    throttle = LoginThrottle(LocalThrottleStore(), per_phone="off", per_ip="off")
+    for _ in range(100):
+        throttle.failed("9876543210", "1.2.3.4")
+    throttle.check("9876543210", "1.2.3.4")
@@ -0,0 +1,124 @@
+# tests/test_order_cache.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.order_cache import OpenOrderSnapshot, location_parts, replay
+from app.pagination import decode_cursor
+
+NOW = datetime.now(timezone.utc)
+
+def make_order(order_id, crop="Wheat", location="Karnal, Haryana", expires_in=timedelta(days=1), **fields):
+    return {
+        "id": order_id, "crop": crop, "variety": "HD-2967", "min_price": 2000, "location": location,
+        "pincode": "132001", "status": "OPEN", "created_at": NOW + timedelta(seconds=order_id),
+        "expires_at": NOW + expires_in, "current_high_bid": 0, "bids_count": 0, **fields,
+    }
+
+def loader_for(rows):
+    async def loader(limit):
+        return [dict(row) for row in rows][:limit]
+    return loader
+
+def test_location_parts():
+    assert location_parts("Karnal, Haryana") == ("Karnal", "Haryana")
+    assert location_parts("Karnal, haryana") == ("Karnal", "Haryana")
+    assert location_parts("Karnal") == ("Karnal", "Unknown")
+    assert location_parts("haryana") == ("Unknown", "Haryana")
+    assert location_parts(" , ") == ("Unknown", "Unknown")
+
+def test_facets_after_reload_skip_expired_orders():
+    # The loader can hand back orders that expired after its query ran
+    rows = [make_order(1), make_order(2, crop="Rice"), make_order(3, crop="Maize", expires_in=-timedelta(minutes=1))]
+    snapshot = OpenOrderSnapshot(ttl=0)
+
+    facets = asyncio.run(snapshot.facets(loader_for(rows)))
+    assert facets["total"] == 2
+    assert facets["crop"] == {"Wheat": 1, "Rice": 1}
+    assert facets["state"] == {"Haryana": 2}
+
+    # ttl=0: the next read reloads, and must not bring the expired order back
+    rows.append(make_order(4, location="Punjab"))
+    facets = asyncio.run(snapshot.facets(loader_for(rows)))
+    assert facets["total"] == 3
+    assert "Maize" not in facets["crop"]
+    assert facets["state"] == {"Haryana": 2, "Punjab": 1}
+    assert facets["district"] == {"Karnal": 2, "Unknown": 1}
+
+def test_unchanged_probe_skips_the_reload():
+    rows = [make_order(1), make_order(2)]
+    marker = [(2, 2, 0)]
+    loads = []
+
+    async def loader(limit):
+        loads.append(limit)
+        return [dict(row) for row in rows]
+
+    async def probe():
+        return marker[0]
+
+    async def run():
+        snapshot = OpenOrderSnapshot(ttl=0, probe=probe)
+        await snapshot.facets(loader)
+        await snapshot.facets(loader)
+        await snapshot.facets(loader)
+        assert len(loads) == 1 and snapshot.reloads_skipped == 2
+
+        # Another worker placed a bid: the marker moves and the rows are reloaded
+        rows[0] = make_order(1, current_high_bid=2100, bids_count=1)
+        marker[0] = (2, 2, 1)
+        page, _ = await snapshot.query(loader)
+        assert len(loads) == 2
+        assert {order["id"]: order["current_high_bid"] for order in page} == {1: 2100, 2: 0}
+
+        # max_age forces a full reload even when the marker didn't move
+        snapshot.max_age = 0
+        await snapshot.facets(loader)
+        assert len(loads) == 3
+
+    asyncio.run(run())
+
+def test_replay():
+    orders = {1: make_order(1), 2: make_order(2)}
+    replay(orders, [
+        ("patch", 1, {"current_high_bid": 2100}),
+        ("upsert", make_order(3)),
+        ("upsert", make_order(2, status="CLOSED")),
+        ("remove", 9),
+        ("patch", 9, {"current_high_bid": 1}),
+    ])
+    assert sorted(orders) == [1, 3]
+    assert orders[1]["current_high_bid"] == 2100
+
+def test_writes_during_a_reload_are_replayed():
+    snapshot = OpenOrderSnapshot(ttl=0)
+
+    async def loader(limit):
+        # The SELECT ran before these writes committed, so the rows miss them
+        rows = [make_order(1), make_order(2)]
+        snapshot.patch(1, current_high_bid=2500, bids_count=1)
+        snapshot.upsert(make_order(3))
+        snapshot.remove(2)
+        return rows
+
+    page, cursor = asyncio.run(snapshot.query(loader))
+    assert cursor is None
+    assert [order["id"] for order in page] == [3, 1]
+    assert page[1]["current_high_bid"] == 2500
+
+def test_query_pages_newest_first_with_id_tie_break():
+    created_at = NOW - timedelta(hours=1)
+    rows = [make_order(i, created_at=created_at) for i in range(1, 6)] + [make_order(6)]
+    snapshot = OpenOrderSnapshot(ttl=60)
+
+    async def run():
+        seen, after = [], None
+        while True:
+            page, cursor = await snapshot.query(loader_for(rows), after=after, limit=2)
+            seen += [order["id"] for order in page]
+            if cursor is None:
+                return seen
+            after = decode_cursor(cursor)
+            assert after == (page[-1]["created_at"], page[-1]["id"])
+
+    # Five orders share created_at: the id keeps the pages apart, no repeats or gaps
+    assert asyncio.run(run()) == [6, 5, 4, 3, 2, 1]
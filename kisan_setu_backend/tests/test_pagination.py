@@ -0,0 +1,43 @@
+# tests/test_pagination.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.pagination import (
+    decode_amount_cursor, decode_cursor, decode_id_cursor, encode_amount_cursor, encode_cursor, encode_id_cursor,
+    split_page,
+)
+
+def test_cursors_round_trip():
+    created_at = datetime(2026, 3, 1, 9, 30, 15, 123456, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    assert decode_amount_cursor(encode_amount_cursor(2500.5, 7)) == (2500.5, 7)
+    assert decode_id_cursor(encode_id_cursor(99)) == 99
+
+def test_cursors_are_url_safe():
+    cursor = encode_cursor(datetime(2026, 3, 1, tzinfo=timezone.utc), 10 ** 12)
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+@pytest.mark.parametrize("decode", [decode_cursor, decode_amount_cursor, decode_id_cursor])
+def test_garbage_cursor_is_a_value_error(decode):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode("not a cursor!")
+
+def test_split_page():
+    now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    rows = [(now - timedelta(seconds=i), 10 - i) for i in range(4)]
+    key = lambda row: row
+
+    page, cursor = split_page(rows, 3, key)
+    assert page == rows[:3]
+    assert decode_cursor(cursor) == rows[2]
+
+    # limit + 1 rows is how callers ask "is there more?"; exactly limit means no
+    assert split_page(rows[:3], 3, key) == (rows[:3], None)
+
+def test_split_page_with_ties_keys_on_the_id():
+    # Same created_at: the cursor still pins the exact row through its id
+    now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    rows = [(now, 9), (now, 8), (now, 7)]
+    _, cursor = split_page(rows, 2, lambda row: row)
+    assert decode_cursor(cursor) == (now, 8)
@@ -0,0 +1,72 @@
+# tests/test_principal_cache.py
+import asyncio
+
+from app import principal_cache as module
+from app.principal_cache import PrincipalCache
+
+class Loader:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, user_id):
+        self.calls.append(user_id)
+        return {"id": user_id, "load": len(self.calls)}
+
+def test_hit_within_ttl_and_reload_after(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: clock[0])
+    cache, loader = PrincipalCache(ttl=30), Loader()
+
+    async def run():
+        first = await cache.get(1, loader)
+        assert await cache.get(1, loader) is first
+        clock[0] += 31
+        assert (await cache.get(1, loader))["load"] == 2
+
+    asyncio.run(run())
+    assert loader.calls == [1, 1]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_invalidate_drops_the_entry():
+    cache, loader = PrincipalCache(), Loader()
+
+    async def run():
+        await cache.get(1, loader)
+        cache.invalidate(1)
+        await cache.get(1, loader)
+
+    asyncio.run(run())
+    assert loader.calls == [1, 1]
+
+def test_load_racing_an_invalidate_is_not_stored():
+    cache = PrincipalCache()
+    calls = []
+
+    async def loader(user_id):
+        calls.append(user_id)
+        if len(calls) == 1:
+            cache.invalidate(user_id)  # e.g. the user was blocked mid-load
+        return {"id": user_id}
+
+    async def run():
+        await cache.get(1, loader)
+        await cache.get(1, loader)
+
+    asyncio.run(run())
+    assert calls == [1, 1]
+
+def test_missing_users_are_not_cached_and_lru_is_bounded():
+    cache = PrincipalCache(max_entries=2)
+    loader = Loader()
+
+    async def gone(user_id):
+        return None
+
+    async def run():
+        assert await cache.get(9, gone) is None
+        for user_id in (1, 2, 3):
+            await cache.get(user_id, loader)
+
+    asyncio.run(run())
+    assert cache.stats()["entries"] == 2
+    assert 1 not in cache._entries and 9 not in cache._entries
@@ -0,0 +1,31 @@
+# tests/test_proxy_bidding.py
+from app.proxy_bidding import AutoBid, Proxy, resolve_proxy_bids
+
+def test_no_proxies_no_bids():
+    assert resolve_proxy_bids(1, 2000, [], 10) == []
+
+def test_single_proxy_answers_one_increment_over_the_lead():
+    assert resolve_proxy_bids(1, 2000, [Proxy(2, 3000, "B")], 10) == [AutoBid(2, 2010, "B")]
+
+def test_single_proxy_is_capped_at_its_maximum():
+    assert resolve_proxy_bids(1, 2995, [Proxy(2, 3000)], 10) == [AutoBid(2, 3000)]
+
+def test_leading_proxy_does_not_bid_against_itself():
+    assert resolve_proxy_bids(2, 2500, [Proxy(2, 3000)], 10) == []
+
+def test_two_proxies_collapse_into_two_bids():
+    # The runner-up bids its maximum, the winner goes one increment over it
+    bids = resolve_proxy_bids(1, 2000, [Proxy(2, 3000, "B"), Proxy(3, 2500, "C")], 10)
+    assert bids == [AutoBid(3, 2500, "C"), AutoBid(2, 2510, "B")]
+
+def test_equal_maximums_go_to_the_earlier_proxy():
+    # Proxies come highest first, earlier registration first on a tie
+    bids = resolve_proxy_bids(1, 2000, [Proxy(2, 3000), Proxy(3, 3000)], 10)
+    assert [bid.bidder_id for bid in bids] == [2]
+    assert bids[-1].amount == 3000
+
+def test_amounts_strictly_increase():
+    bids = resolve_proxy_bids(1, 2000, [Proxy(2, 2505.55), Proxy(3, 2500.25)], 10)
+    amounts = [bid.amount for bid in bids]
+    assert amounts == sorted(set(amounts)) and amounts[0] > 2000
+    assert bids[-1] == AutoBid(2, 2505.55)
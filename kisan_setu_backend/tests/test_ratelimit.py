@@ -0,0 +1,20 @@
+# tests/test_ratelimit.py
+from starlette.requests import Request
+
+from app.ratelimit import ClientIP
+
+def make_request(forwarded=None, peer="10.0.0.9"):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+def test_client_ip_ignores_forwarded_for_by_default():
+    assert ClientIP()(make_request("1.2.3.4")) == "10.0.0.9"
+
+def test_client_ip_takes_the_trusted_proxys_hop():
+    # The client can prepend anything; only the hop the proxy appended counts
+    assert ClientIP(1)(make_request("6.6.6.6, 1.2.3.4")) == "1.2.3.4"
+    assert ClientIP(2)(make_request("6.6.6.6, 1.2.3.4, 10.1.1.1")) == "1.2.3.4"
+
+def test_client_ip_falls_back_to_the_peer():
+    assert ClientIP(1)(make_request()) == "10.0.0.9"
+    assert ClientIP(2)(make_request("1.2.3.4")) == "10.0.0.9"
@@ -4,7 +4,7 @@ import { authService, orderService, bidService, dealService } from '../services/
 import { Card, Button, Badge } from '../components/UI';
 import { ArrowRight, TrendingUp, Package, Gavel, ShoppingBag, ChevronRight } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
-import { UserRole } from '../types';
+import { OrderStatus, UserRole } from '../types';
 
 export const Dashboard: React.FC = () => {
   const user = authService.getCurrentUser();
@@ -26,7 +26,7 @@ export const Dashboard: React.FC = () => {
 
   const { data: myBids, isLoading: bidsLoading } = useQuery({
     queryKey: ['myBids'],
-    queryFn: bidService.getMyBids,
+    queryFn: () => bidService.getMyBids(),
     enabled: !!user && !isFarmer
   });
 
@@ -210,17 +210,33 @@ export const Dashboard: React.FC = () => {
                 </Card>
             ) : (
                 <div className="space-y-3">
+                    {/* Order summary comes with each bid, no per-order fetch */}
                     {myBids?.map((bid: any) => (
-                        <Card key={bid.id} className="p-4">
+                        <Card key={bid.id} className="p-4 cursor-pointer" onClick={() => navigate(`/orders/${bid.orderId}`)}>
                              <div className="flex justify-between items-center mb-2">
-                                <h3 className="font-bold text-gray-900">Order #{bid.orderId}</h3>
-                                <Badge variant="warning">Active</Badge>
+                                <div className="flex items-center gap-2">
+                                    <h3 className="font-bold text-gray-900">{bid.order.variety}</h3>
+                                    <Badge variant="success">{bid.order.crop}</Badge>
+                                </div>
+                                {bid.order.status === OrderStatus.OPEN ? (
+                                    <Badge variant={bid.isWinning ? 'success' : 'warning'}>{bid.isWinning ? 'Winning' : 'Outbid'}</Badge>
+                                ) : (
+                                    <Badge variant="neutral">{bid.order.status}</Badge>
+                                )}
                              </div>
                              <div className="flex justify-between items-center">
                                 <span className="text-gray-600 text-sm">Your Bid Amount</span>
                                 <span className="text-lg font-bold text-agri-600">₹{bid.amount}</span>
                              </div>
-                             <p className="text-xs text-gray-400 mt-2 text-right">Placed on {new Date(bid.timestamp).toLocaleDateString()}</p>
+                             {!bid.isWinning && (
+                                <div className="flex justify-between items-center">
+                                    <span className="text-gray-600 text-sm">Highest Bid</span>
+                                    <span className="text-sm font-bold text-gray-900">₹{bid.order.currentHighBid}</span>
+                                </div>
+                             )}
+                             <p className="text-xs text-gray-400 mt-2 text-right">
+                                {bid.order.quantity} {bid.order.quantityUnit} • Placed on {new Date(bid.createdAt).toLocaleDateString()}
+                             </p>
                         </Card>
                     ))}
                 </div>
@@ -1,5 +1,5 @@
-import React, { useState } from 'react';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import React, { useEffect, useState } from 'react';
+import { useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { orderService, bidService, authService } from '../services/api';
 import { Card, Button, Badge, Input, Select } from '../components/UI';
 import { Filter, MapPin, Clock, Scale, Search, X } from 'lucide-react';
@@ -68,14 +68,37 @@ export const Marketplace: React.FC = () => {
     const navigate = useNavigate();
     const user = authService.getCurrentUser();
 
-    // Filters State (Mock)
+    // Filters State
     const [searchTerm, setSearchTerm] = useState('');
     const [selectedCrop, setSelectedCrop] = useState('');
+    const [locationTerm, setLocationTerm] = useState('');
+    const [debouncedSearch, setDebouncedSearch] = useState('');
+    const [debouncedLocation, setDebouncedLocation] = useState('');
 
-    const { data: orders, isLoading } = useQuery({
-        queryKey: ['orders'],
-        queryFn: () => orderService.getOrders()
+    // Don't hit the server on every keystroke
+    useEffect(() => {
+        const timer = setTimeout(() => {
+            setDebouncedSearch(searchTerm.trim());
+            setDebouncedLocation(locationTerm.trim());
+        }, 300);
+        return () => clearTimeout(timer);
+    }, [searchTerm, locationTerm]);
+
+    // Filtering and paging happen on the server (a page is 50 orders);
+    // "Load more" follows X-Next-Cursor
+    const filters = {
+        ...(selectedCrop && { crop: selectedCrop }),
+        ...(debouncedLocation && { location: debouncedLocation }),
+        ...(debouncedSearch && { q: debouncedSearch }),
+    };
+
+    const { data, isLoading, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
+        queryKey: ['orders', filters],
+        queryFn: ({ pageParam }) => orderService.getOrdersPage(filters, pageParam),
+        initialPageParam: undefined as string | undefined,
+        getNextPageParam: (lastPage) => lastPage.nextCursor ?? undefined,
     });
+    const orders = data?.pages.flatMap((page) => page.items);
 
     const bidMutation = useMutation({
         mutationFn: ({orderId, amount}: {orderId: string, amount: number}) => bidService.placeBid(orderId, amount),
@@ -96,12 +119,6 @@ export const Marketplace: React.FC = () => {
         return bidMutation.mutateAsync({ orderId, amount });
     };
 
-    const filteredOrders = orders?.filter((o: any) => {
-        const matchesSearch = o.variety.toLowerCase().includes(searchTerm.toLowerCase()) || o.location.toLowerCase().includes(searchTerm.toLowerCase());
-        const matchesCrop = selectedCrop ? o.crop === selectedCrop : true;
-        return matchesSearch && matchesCrop;
-    });
-
     return (
         <div>
             {/* Header */}
@@ -115,7 +132,7 @@ export const Marketplace: React.FC = () => {
                          <Search className="absolute left-3 top-3 w-4 h-4 text-gray-400" />
                          <input 
                             type="text" 
-                            placeholder="Search crop, variety or location..." 
+                            placeholder="Search variety, location or pincode..." 
                             className="w-full pl-10 pr-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-agri-500 focus:outline-none"
                             value={searchTerm}
                             onChange={(e) => setSearchTerm(e.target.value)}
@@ -134,11 +151,17 @@ export const Marketplace: React.FC = () => {
                         <h3 className="font-bold text-gray-700">Refine Results</h3>
                         <button onClick={() => setShowFilters(false)}><X className="w-4 h-4 text-gray-500"/></button>
                     </div>
-                    <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
+                    <div className="grid grid-cols-1 md:grid-cols-4 gap-4">
                         <Select label="Crop Type" value={selectedCrop} onChange={(e) => setSelectedCrop(e.target.value)}>
                             <option value="">All Crops</option>
                             {Object.values(CropType).map(c => <option key={c} value={c}>{c}</option>)}
                         </Select>
+                        <Input
+                            label="Location"
+                            value={locationTerm}
+                            onChange={(e) => setLocationTerm(e.target.value)}
+                            placeholder="District or state"
+                        />
                         <Select label="Sort By">
                             <option>Newest Listed</option>
                             <option>Price: Low to High</option>
@@ -157,7 +180,7 @@ export const Marketplace: React.FC = () => {
             {/* List */}
             {isLoading ? (
                 <div className="flex justify-center py-20"><div className="animate-spin rounded-full h-8 w-8 border-b-2 border-agri-600"></div></div>
-            ) : filteredOrders?.length === 0 ? (
+            ) : orders?.length === 0 ? (
                 <div className="text-center py-20 bg-white rounded-xl border border-dashed">
                     <div className="mx-auto w-16 h-16 bg-gray-100 rounded-full flex items-center justify-center mb-4">
                         <Search className="w-8 h-8 text-gray-400" />
@@ -166,8 +189,9 @@ export const Marketplace: React.FC = () => {
                     <p className="text-gray-500">Try adjusting your filters or search term.</p>
                 </div>
             ) : (
+                <>
                 <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-                    {filteredOrders?.map((order: any) => (
+                    {orders?.map((order: any) => (
                         <Card key={order.id} className="flex flex-col h-full hover:shadow-lg transition-all duration-200">
                             <div className="p-5 flex-1">
                                 <div className="flex justify-between items-start mb-3">
@@ -209,6 +233,14 @@ export const Marketplace: React.FC = () => {
                         </Card>
                     ))}
                 </div>
+                {hasNextPage && (
+                    <div className="flex justify-center mt-8">
+                        <Button variant="outline" onClick={() => fetchNextPage()} isLoading={isFetchingNextPage}>
+                            Load more
+                        </Button>
+                    </div>
+                )}
+                </>
             )}
 
             <BidModal 
@@ -1,11 +1,13 @@
-import React from 'react';
+import React, { useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { orderService, bidService, dealService } from '../services/api';
+import { orderService, bidService, dealService, subscribeToOrder } from '../services/api';
 import { Card, Button, Badge } from '../components/UI';
 import { ChevronLeft, Gavel, Clock, MapPin, User, ArrowRight } from 'lucide-react';
 import { OrderStatus } from '../types';
 
+const BIDS_SHOWN = 20;
+
 export const OrderDetails: React.FC = () => {
   const { id } = useParams<{ id: string }>();
   const navigate = useNavigate();
@@ -19,10 +21,34 @@ export const OrderDetails: React.FC = () => {
 
   const { data: bids, isLoading: bidsLoading } = useQuery({
     queryKey: ['bids', id],
-    queryFn: () => bidService.getBidsForOrder(id!),
+    queryFn: () => bidService.getBidsForOrder(id!, BIDS_SHOWN),
     enabled: !!id
   });
 
+  // Live updates instead of refetching: new bids are merged into the cache,
+  // anything else (status change, missed events) triggers one refetch
+  useEffect(() => {
+    if (!id) return;
+    let lastVersion: number | null = null;
+    return subscribeToOrder(id, (event) => {
+      const previous = lastVersion;
+      lastVersion = event.version;
+      queryClient.setQueryData(['order', id], (old: any) => old && {
+        ...old,
+        status: event.status,
+        currentHighBid: event.currentHighBid,
+        bidsCount: event.bidsCount,
+      });
+      if (previous === null) return; // Initial state; bids were just fetched
+      if (event.type === 'bid' && event.version === previous + 1) {
+        // The list is the first page only (highest bids); the total is order.bidsCount
+        queryClient.setQueryData(['bids', id], (old: any[] | undefined) => [event.bid, ...(old ?? [])].slice(0, BIDS_SHOWN));
+      } else {
+        queryClient.invalidateQueries({ queryKey: ['bids', id] });
+      }
+    });
+  }, [id, queryClient]);
+
   const acceptBidMutation = useMutation({
       mutationFn: ({ orderId, bidId }: { orderId: string, bidId: string }) => dealService.acceptBid(orderId, bidId),
       onSuccess: (data) => {
@@ -82,7 +108,7 @@ export const OrderDetails: React.FC = () => {
              <div>
                 <h3 className="text-xl font-bold mb-4 flex items-center">
                     <Gavel className="w-5 h-5 mr-2 text-agri-600" />
-                    Bids Received ({bids?.length || 0})
+                    Bids Received ({order.bidsCount ?? bids?.length ?? 0})
                 </h3>
                 
                 {bidsLoading ? (
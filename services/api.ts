@@ -13,24 +13,32 @@ export const api = axios.create({
   },
 });
 
+// The backend emits camelCase keys itself when asked via X-Key-Case, so the
+// client-side conversion below is only a fallback for servers that predate it.
+const KEY_CASE_HEADER = 'X-Key-Case';
+api.defaults.headers.common[KEY_CASE_HEADER] = 'camel';
+
+const snakeToCamel = (key: string) => key.replace(/_([a-z0-9])/g, (g) => g[1].toUpperCase());
+
 const toCamelCase = (obj: any): any => {
   if (Array.isArray(obj)) {
     return obj.map(v => toCamelCase(v));
   } else if (obj !== null && obj.constructor === Object) {
-    return Object.keys(obj).reduce(
-      (result, key) => ({
-        ...result,
-        [key.replace(/_([a-z])/g, (g) => g[1].toUpperCase())]: toCamelCase(obj[key]),
-      }),
-      {},
-    );
+    const result: Record<string, any> = {};
+    for (const key of Object.keys(obj)) {
+      result[snakeToCamel(key)] = toCamelCase(obj[key]);
+    }
+    return result;
   }
   return obj;
 };
 
+const serverCamelCased = (headers: any) =>
+  String(headers?.vary ?? '').toLowerCase().includes(KEY_CASE_HEADER.toLowerCase());
+
 api.interceptors.response.use(
   (response) => {
-    if (response.data) {
+    if (response.data && !serverCamelCased(response.headers)) {
       response.data = toCamelCase(response.data);
     }
     return response;
@@ -55,6 +63,47 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// crypto.randomUUID only exists in secure contexts (https, localhost)
+const newIdempotencyKey = (): string => {
+  if (typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function') {
+    return crypto.randomUUID();
+  }
+  const bytes = new Uint8Array(16);
+  if (typeof crypto !== 'undefined' && typeof crypto.getRandomValues === 'function') {
+    crypto.getRandomValues(bytes);
+  } else {
+    for (let i = 0; i < bytes.length; i++) bytes[i] = Math.floor(Math.random() * 256);
+  }
+  return Array.from(bytes, (b) => b.toString(16).padStart(2, '0')).join('');
+};
+
+// Idempotency-Key per user action (method, path and body), kept until the
+// server gives a final answer: a retry after a dropped connection, a 5xx or a
+// 409 reuses it, so the backend replays the first response instead of creating
+// a duplicate order/bid/deal/payment. Only the endpoints that need it send one;
+// every keyed request costs the backend an extra write.
+const pendingKeys = new Map<string, string>();
+
+const idempotent = async (method: 'post' | 'put' | 'patch' | 'delete', url: string, data?: any) => {
+  const action = `${method} ${url} ${JSON.stringify(data ?? null)}`;
+  let key = pendingKeys.get(action);
+  if (!key) {
+    key = newIdempotencyKey();
+    pendingKeys.set(action, key);
+  }
+  try {
+    const response = await api.request({ method, url, data, headers: { 'Idempotency-Key': key } });
+    pendingKeys.delete(action);
+    return response;
+  } catch (error: any) {
+    const status = error.response?.status;
+    if (status && status < 500 && status !== 409) {
+      pendingKeys.delete(action);
+    }
+    throw error;
+  }
+};
+
 // --- Services ---
 
 export const authService = {
@@ -91,25 +140,65 @@ export const authService = {
 
 export const orderService = {
   getOrders: async (filters?: any) => (await api.get('/orders', { params: filters })).data,
+  getOrdersPage: async (filters?: any, cursor?: string) => {
+    const response = await api.get('/orders', { params: { ...filters, cursor } });
+    return { items: response.data, nextCursor: response.headers['x-next-cursor'] ?? null };
+  },
   getMyOrders: async () => (await api.get('/orders/my')).data, // Ensure backend endpoint matches
-  createOrder: async (data: any) => (await api.post('/orders', data)).data,
+  createOrder: async (data: any) => (await idempotent('post', '/orders', data)).data,
   getOrderById: async (id: string) => (await api.get(`/orders/${id}`)).data,
   stopBidding: async (id: string) => (await api.post(`/orders/${id}/stop`)).data 
 };
 
 export const bidService = {
-  placeBid: async (orderId: string, amount: number) => (await api.post(`/orders/${orderId}/bids`, { amount })).data,
-  getBidsForOrder: async (orderId: string) => (await api.get(`/orders/${orderId}/bids`)).data,
-  getMyBids: async () => (await api.get('/bids/my')).data,
+  placeBid: async (orderId: string, amount: number) => (await idempotent('post', `/orders/${orderId}/bids`, { amount })).data,
+  // Auto-bid up to maxAmount, one increment over whoever outbids you
+  setProxyBid: async (orderId: string, maxAmount: number) => (await api.put(`/orders/${orderId}/proxy-bid`, { max_amount: maxAmount })).data,
+  cancelProxyBid: async (orderId: string) => (await api.delete(`/orders/${orderId}/proxy-bid`)).data,
+  // Highest bids first, one page at a time; pass nextCursor to get the next page
+  getBidsForOrder: async (orderId: string, limit?: number) => (await api.get(`/orders/${orderId}/bids`, { params: { limit } })).data,
+  getBidsPage: async (orderId: string, cursor?: string, limit?: number) =>
+    (await api.get(`/orders/${orderId}/bids`, { params: { cursor, limit, summary: true } })).data,
+  // Newest first, each with its order summary and isWinning
+  getMyBids: async (cursor?: string) => (await api.get('/bids/my', { params: { cursor } })).data,
+};
+
+// Live order updates pushed by the backend (replaces polling an order's bids).
+// Events: { type: 'order' | 'bid', orderId, version, status, currentHighBid, bidsCount, bid?, dealId? }
+export const subscribeToOrder = (orderId: string, onEvent: (event: any) => void): (() => void) => {
+  let socket: WebSocket | null = null;
+  let retry = 0;
+  let closed = false;
+  let timer: ReturnType<typeof setTimeout> | undefined;
+
+  const connect = () => {
+    const token = localStorage.getItem('token') ?? '';
+    const url = `${API_URL.replace(/^http/, 'ws')}/ws/orders/${orderId}?token=${encodeURIComponent(token)}&key_case=camel`;
+    socket = new WebSocket(url);
+    socket.onopen = () => { retry = 0; };
+    socket.onmessage = (message) => onEvent(JSON.parse(message.data));
+    socket.onclose = () => {
+      if (closed) return;
+      // Back off up to 30s; the first event after reconnecting is the full state
+      timer = setTimeout(connect, Math.min(30000, 1000 * 2 ** retry++));
+    };
+  };
+  connect();
+
+  return () => {
+    closed = true;
+    clearTimeout(timer);
+    socket?.close();
+  };
 };
 
 export const dealService = {
     getDeals: async () => (await api.get('/deals')).data,
     getDealById: async (id: string) => (await api.get(`/deals/${id}`)).data,
-    acceptBid: async (orderId: string, bidId: string) => (await api.post(`/orders/${orderId}/accept-bid`, { bidId: Number(bidId) })).data,
+    acceptBid: async (orderId: string, bidId: string) => (await idempotent('post', `/orders/${orderId}/accept-bid`, { bidId: Number(bidId) })).data,
     finalizeDealMode: async (dealId: string, mode: 'KISAN_SETU' | 'DIRECT_DEAL') => (await api.post(`/deals/${dealId}/finalize`, { mode })).data,
-    initiatePayment: async (dealId: string, amount: number) => (await api.post(`/deals/${dealId}/pay/initiate`, { amount })).data,
-    verifyPayment: async (dealId: string, paymentData: any) => (await api.post(`/deals/${dealId}/pay/verify`, paymentData)).data,
+    initiatePayment: async (dealId: string, amount: number) => (await idempotent('post', `/deals/${dealId}/pay/initiate`, { amount })).data,
+    verifyPayment: async (dealId: string, paymentData: any) => (await idempotent('post', `/deals/${dealId}/pay/verify`, paymentData)).data,
     markDelivered: async (dealId: string) => (await api.patch(`/deals/${dealId}/status`, { status: 'DELIVERED' })).data,
     submitReview: async (dealId: string, rating: number, comment: string) => (await api.post(`/deals/${dealId}/review`, { rating, comment })).data
 };
@@ -119,7 +208,11 @@ export const adminService = {
     verifyUser: async (userId: string, status: 'APPROVED' | 'REJECTED') => (await api.post(`/admin/users/${userId}/verify`, { status })).data,
     blockUser: async (userId: string, isBlocked: boolean) => (await api.post(`/admin/users/${userId}/block`, { isBlocked })).data,
     getAllTransactions: async () => (await api.get('/admin/transactions')).data,
-    getAllBids: async () => (await api.get('/admin/bids')).data
+    getAllBids: async () => (await api.get('/admin/bids')).data,
+    // Field-agent onboarding: one result per row, in order ("created" with id, or "rejected" with detail).
+    // Up to 5000 users per call; every password is hashed, so a big village takes minutes.
+    bulkRegister: async (users: Array<{ phone: string; password: string; name: string; role: string; location: string }>) =>
+        (await api.post('/admin/users/bulk', { users })).data
 };
 
 export const utilService = {
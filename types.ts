@@ -24,7 +24,8 @@ export enum OrderStatus {
   TRANSIT = 'TRANSIT', // Using KisanSetu Transport
   DIRECT_DEAL = 'DIRECT_DEAL', // Numbers exchanged
   DELIVERED = 'DELIVERED',
-  CANCELLED = 'CANCELLED'
+  CANCELLED = 'CANCELLED',
+  EXPIRED = 'EXPIRED' // Closed without an accepted bid
 }
 
 export interface Subscription {